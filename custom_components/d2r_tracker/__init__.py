@@ -2,39 +2,94 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Mapping
 from datetime import timedelta
+from functools import partial
 import logging
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, CoreState, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
 
-from custom_components.d2r_tracker.providers import ProviderBase, ProviderResponse
+from custom_components.d2r_tracker.providers import (
+    PartStatus,
+    ProviderResponse,
+)
 from custom_components.d2r_tracker.providers.cached import CachedProvider
-from custom_components.d2r_tracker.providers.d2runewizard import D2RuneWizardProvider
-from custom_components.d2r_tracker.providers.diablo2io import Diablo2IOProvider
+from custom_components.d2r_tracker.providers.history import DCloneHistory
+from custom_components.d2r_tracker.providers.registry import (
+    get_provider_spec,
+    load_entry_points,
+)
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneTimeline,
+)
 
 from .const import (
+    CONF_CACHE_MAX_KIB,
     CONF_CONTACT_EMAIL,
+    CONF_DCLONE_CACHE_TTL,
     CONF_ORIGIN,
+    CONF_RECORD_TRAFFIC,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SHARED_CACHE_PATH,
+    CONF_TERROR_ZONE_BURST_WINDOW,
+    CONF_TERROR_ZONE_FETCH_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+    DATA_FETCH_PIPELINE,
+    DATA_PROBES,
     DOMAIN,
-    ORIGIN_D2RUNEWIZARD,
-    ORIGIN_DIABLO2IO,
 )
+from .events import async_setup_events
+from .options import get_options
+from .refresh import async_refresh
+from .stagger import refresh_phase, slot_delay
+from .values import (
+    EMPTY_SNAPSHOT,
+    ChangeSet,
+    ValuePlan,
+    ValueSnapshot,
+    plan_values,
+    publish_part,
+)
+
+if TYPE_CHECKING:
+    from custom_components.d2r_tracker.providers.pipeline import FetchPipeline
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+_T = TypeVar("_T")
+
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
+
+STORAGE_VERSION = 1
+# Progress transitions and rotations are rare, so batch writes to disk.
+STORAGE_SAVE_DELAY_SECONDS = 60
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Diablo 2 Resurrected from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    coordinator = D2RDataUpdateCoordinator(hass, entry, interval=60)
+    await hass.async_add_executor_job(load_entry_points)
+    coordinator = D2RDataUpdateCoordinator(hass, entry)
+    entry.async_on_unload(coordinator.async_shutdown)
 
-    await coordinator.async_config_entry_first_refresh()
+    if hass.state is CoreState.not_running:
+        # Entries set up together on startup would all fetch at once. Instead,
+        # this one first fetches in its slot, once its entities listen.
+        await coordinator.async_load_history()
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(async_setup_events(hass, coordinator))
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
@@ -42,9 +97,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator, without a reload."""
+    coordinator: D2RDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][
+        "coordinator"
+    ]
+    coordinator.apply_options(get_options(entry))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
@@ -53,21 +118,33 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data for a config entry."""
+    await _make_store(hass, entry).async_remove()
+
+
+def _make_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def _fetch_pipeline(hass: HomeAssistant) -> FetchPipeline:
+    """The pipeline running provider I/O for every config entry."""
+    if DATA_FETCH_PIPELINE not in hass.data:
+        from custom_components.d2r_tracker.providers.pipeline import FetchPipeline
+
+        hass.data[DATA_FETCH_PIPELINE] = FetchPipeline()
+    return hass.data[DATA_FETCH_PIPELINE]
+
+
 def cached_provider_factory(
     origin: str, api_key: str | None, contact_email: str
 ) -> CachedProvider:
-    """Return provider based on origin."""
-
-    def make_raw_provider() -> ProviderBase:
-        if origin == ORIGIN_DIABLO2IO:
-            return Diablo2IOProvider(api_key, contact_email)
-        elif origin == ORIGIN_D2RUNEWIZARD:
-            if not api_key:
-                raise ValueError(f"API key is required for {origin}")
-            return D2RuneWizardProvider(api_key, contact_email)
-        raise ValueError(f"Invalid origin: {origin}")
+    """Return provider based on origin.
 
-    return CachedProvider(make_raw_provider())
+    Provider modules (and `requests` with them) are imported lazily by the
+    registry, so only the origin a config entry actually uses gets loaded.
+    """
+    return CachedProvider(get_provider_spec(origin).create(api_key, contact_email))
 
 
 class D2RDataUpdateCoordinator(DataUpdateCoordinator[ProviderResponse]):
@@ -79,28 +156,278 @@ class D2RDataUpdateCoordinator(DataUpdateCoordinator[ProviderResponse]):
         self,
         hass: HomeAssistant,
         config_entry: ConfigEntry,
-        interval: int,
     ) -> None:
         """Initialize."""
+        options = get_options(config_entry)
         super().__init__(
             hass,
             _LOGGER,
             name=f"d2r-{config_entry.entry_id}",
-            update_interval=timedelta(seconds=interval),
+            update_interval=timedelta(seconds=options[CONF_UPDATE_INTERVAL]),
         )
         self.hass = hass
         self.config_entry = config_entry
         self.data = ProviderResponse(terror_zone=None, dclone_progress=None)
+        # Value key -> value, rebuilt once per refresh and read by each entity,
+        # and what the last refresh changed.
+        self.snapshot: ValueSnapshot = EMPTY_SNAPSHOT
+        self.changes = ChangeSet(0, MappingProxyType({}))
+        self._change_listeners: list[Callable[[ChangeSet], None]] = []
+        self.provider_spec = get_provider_spec(config_entry.data[CONF_ORIGIN])
         self.cached_provider: CachedProvider = cached_provider_factory(
             config_entry.data[CONF_ORIGIN],
             config_entry.data.get(CONF_API_KEY),
             config_entry.data[CONF_CONTACT_EMAIL],
         )
+        # What the last refresh fetched, based on the subscribed entities.
+        self.plan = ValuePlan.everything(self.cached_provider.CAPABILITIES)
+        # Provider I/O runs on the origin's lane of the shared pipeline.
+        self.pipeline: FetchPipeline | None = _fetch_pipeline(hass)
+        self.pipeline.acquire(self.provider_spec.name)
+        self.refresh_phase = refresh_phase(config_entry.entry_id)
+        self.history = DCloneHistory()
+        self.terror_zone_timeline = TerrorZoneTimeline()
+        self.apply_options(options)
+        # Serve what the config flow just fetched, rather than fetching it
+        # again right away against the provider's rate limit.
+        probe = hass.data.get(DATA_PROBES, {}).pop(self.provider_spec.name, None)
+        if probe is not None and probe.fetched_at is not None:
+            self.cached_provider.seed(probe.data_type, probe.value, probe.fetched_at)
+        self._store = _make_store(hass, config_entry)
+
+    def apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply tunables; they take effect from the next refresh."""
+        from custom_components.d2r_tracker.providers.pipeline import (
+            FETCH_TIMEOUT_MARGIN_SECONDS,
+        )
+
+        min_interval = self.provider_spec.min_request_interval
+        # How long a fetch may take on the pipeline, queueing included.
+        self.fetch_timeout = (
+            options[CONF_REQUEST_TIMEOUT] + FETCH_TIMEOUT_MARGIN_SECONDS
+        )
+        self.update_interval = timedelta(
+            seconds=max(options[CONF_UPDATE_INTERVAL], min_interval)
+        )
+        self.cached_provider.configure(
+            dclone_ttl=max(options[CONF_DCLONE_CACHE_TTL], min_interval),
+            terror_zone_interval_minutes=options[CONF_TERROR_ZONE_FETCH_INTERVAL],
+            terror_zone_burst_minutes=options[CONF_TERROR_ZONE_BURST_WINDOW],
+            request_timeout=options[CONF_REQUEST_TIMEOUT],
+            cache_max_bytes=options[CONF_CACHE_MAX_KIB] * 1024,
+        )
+        self.terror_zone_timeline.rotation_minutes = options[
+            CONF_TERROR_ZONE_FETCH_INTERVAL
+        ]
+        self.cached_provider.provider.recorder = None
+        if options[CONF_RECORD_TRAFFIC]:
+            from custom_components.d2r_tracker.providers.recording import (
+                TrafficRecorder,
+            )
+
+            self.cached_provider.provider.recorder = TrafficRecorder(
+                self.hass.config.path(self.traffic_recording_name)
+            )
+        self._apply_shared_cache(
+            options[CONF_SHARED_CACHE_PATH], options[CONF_REQUEST_TIMEOUT]
+        )
+
+    def _apply_shared_cache(self, path: str, request_timeout: float) -> None:
+        shared = self.cached_provider.shared
+        if shared is not None and shared.path != path:
+            # Closing waits for a lane thread still using it.
+            self.hass.async_add_executor_job(shared.close)
+            self.cached_provider.shared = shared = None
+        if path and shared is None:
+            from custom_components.d2r_tracker.providers.shared_cache import (
+                SharedCache,
+            )
+
+            self.cached_provider.shared = shared = SharedCache(path)
+        if shared is not None:
+            shared.set_request_timeout(request_timeout)
+
+    @property
+    def traffic_recording_name(self) -> str:
+        """File name, in the config directory, of the traffic recording."""
+        return f"{DOMAIN}.{self.config_entry.entry_id}.traffic.jsonl"
+
+    async def async_shutdown(self) -> None:
+        """Cancel refreshes and release the threads running provider I/O."""
+        await super().async_shutdown()
+        if self.pipeline is not None:
+            self.pipeline.release(self.provider_spec.name)
+            self.pipeline = None
+        if (shared := self.cached_provider.shared) is not None:
+            self.cached_provider.shared = None
+            await self.hass.async_add_executor_job(shared.close)
+
+    async def _async_setup(self) -> None:
+        """Restore history before the first refresh."""
+        await self.async_load_history()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh in this entry's slot of the interval.
+
+        Refreshes start `refresh_phase` of an interval into each interval,
+        rather than an interval after the previous one ended, so entries
+        fetching from the same origin stay spread out.
+        """
+        interval = self.update_interval
+        if interval is None:
+            super()._schedule_refresh()
+            return
+        self.update_interval = timedelta(
+            seconds=slot_delay(
+                dt_util.utcnow().timestamp(),
+                interval.total_seconds(),
+                self.refresh_phase,
+            )
+        )
+        try:
+            super()._schedule_refresh()
+        finally:
+            self.update_interval = interval
+
+    async def _async_run_io(self, func: Callable[..., _T], *args: Any) -> _T:
+        from custom_components.d2r_tracker.providers.worker import (
+            WorkerBusyError,
+            WorkerShutDownError,
+        )
+
+        if self.pipeline is None:
+            raise UpdateFailed("Coordinator is shut down")
+        try:
+            return await self.pipeline.run(
+                self.provider_spec.name,
+                self.fetch_timeout,
+                func,
+                *args,
+            )
+        except (WorkerBusyError, WorkerShutDownError) as e:
+            raise UpdateFailed(str(e)) from e
+
+    async def _async_fetch_part(
+        self, data_type: str, plan: ValuePlan
+    ) -> ProviderResponse:
+        """Fetch one data type, as a failed part if it takes too long."""
+        try:
+            return await self._async_run_io(
+                self.cached_provider.collate_responses, [data_type], plan.dclone_keys
+            )
+        except TimeoutError:
+            _LOGGER.warning(
+                f"Fetching {data_type} from provider {self.provider_spec.name} timed out"
+            )
+            return ProviderResponse(
+                terror_zone=None,
+                dclone_progress=None,
+                status={
+                    data_type: PartStatus(
+                        self.cached_provider.fetched_at.get(data_type), "Timed out"
+                    )
+                },
+            )
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, refreshing if the listener needs new data.
+
+        E.g. an entity enabled at runtime subscribes to data the previous
+        refreshes skipped.
+        """
+        remove_listener = super().async_add_listener(update_callback, context)
+        if context is not None and not self.plan.covers(context):
+            self.hass.async_create_task(self.async_request_refresh())
+        return remove_listener
+
+    @property
+    def values(self) -> Mapping[str, Any]:
+        return self.snapshot.values
+
+    @callback
+    def async_add_change_listener(
+        self, change_callback: Callable[[ChangeSet], None]
+    ) -> Callable[[], None]:
+        """Call `change_callback` with each non-empty change set.
+
+        Unlike regular listeners, these do not keep the coordinator polling.
+        """
+        self._change_listeners.append(change_callback)
+        return lambda: self._change_listeners.remove(change_callback)
+
+    async def async_load_history(self) -> None:
+        """Restore DClone and terror zone history persisted by a previous run."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self.history = DCloneHistory.from_dict(stored["dclone_history"])
+        if "terror_zone_timeline" in stored:
+            self.terror_zone_timeline = TerrorZoneTimeline.from_dict(
+                stored["terror_zone_timeline"],
+                self.terror_zone_timeline.rotation_minutes,
+            )
+
+    def _data_to_store(self) -> dict:
+        return {
+            "dclone_history": self.history.as_dict(),
+            "terror_zone_timeline": self.terror_zone_timeline.as_dict(),
+        }
+
+    @callback
+    def _async_publish(
+        self,
+        plan: ValuePlan,
+        part: ProviderResponse,
+        response: ProviderResponse,
+        remaining: int,
+    ) -> None:
+        """Record a freshly fetched part and publish the merged `response`."""
+        self.snapshot, self.changes, changed = publish_part(
+            part,
+            response,
+            plan,
+            self.history,
+            self.terror_zone_timeline,
+            self.snapshot,
+            dt_util.utcnow().timestamp(),
+        )
+        if changed:
+            self._store.async_delay_save(
+                self._data_to_store, STORAGE_SAVE_DELAY_SECONDS
+            )
+        if self.changes:
+            for change_callback in list(self._change_listeners):
+                change_callback(self.changes)
+        # The coordinator notifies listeners of the last part on return.
+        if remaining:
+            self.data = response
+            self.async_update_listeners()
 
     async def _async_update_data(self) -> ProviderResponse:
-        return await self.hass.async_add_executor_job(
-            self.cached_provider.collate_responses
+        # A failed refresh changes nothing but availability.
+        self.changes = ChangeSet(self.snapshot.version, MappingProxyType({}))
+        # Only fetch and materialize what enabled entities consume.
+        plan = plan_values(self.async_contexts(), self.cached_provider.CAPABILITIES)
+        self.plan = plan
+        response = await async_refresh(
+            self.data,
+            plan,
+            partial(self._async_fetch_part, plan=plan),
+            partial(self._async_publish, plan),
         )
+        if plan.data_types and not any(
+            response.part_ok(data_type) for data_type in plan.data_types
+        ):
+            raise UpdateFailed(
+                "; ".join(
+                    f"{data_type}: {status.error}"
+                    for data_type, status in sorted(response.status.items())
+                )
+            )
+        return response
 
     @property
     def device_info(self) -> DeviceInfo:
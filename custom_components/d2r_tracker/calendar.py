@@ -0,0 +1,93 @@
+"""D2R calendar integration."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from custom_components.d2r_tracker.providers import DATA_TERROR_ZONE
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneRotation,
+)
+
+from . import D2RDataUpdateCoordinator
+from .const import DOMAIN
+from .values import TERROR_ZONE_CONTEXT
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up calendars."""
+    device_id = config_entry.unique_id
+    coordinator: D2RDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id][
+        "coordinator"
+    ]
+
+    assert device_id is not None
+
+    if coordinator.cached_provider.CAPABILITIES.supports(DATA_TERROR_ZONE):
+        async_add_entities([D2RTerrorZoneCalendar(coordinator, device_id)])
+
+
+def _to_event(rotation: TerrorZoneRotation, forecast: bool = False) -> CalendarEvent:
+    return CalendarEvent(
+        start=rotation.start,
+        end=rotation.end,
+        summary=rotation.zone,
+        description="Forecast" if forecast else None,
+    )
+
+
+class D2RTerrorZoneCalendar(
+    CoordinatorEntity[D2RDataUpdateCoordinator], CalendarEntity
+):
+    """Observed and upcoming terror zone rotations."""
+
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(
+        self,
+        coordinator: D2RDataUpdateCoordinator,
+        device_id: str,
+    ) -> None:
+        """Initialize a new D2RTerrorZoneCalendar."""
+        super().__init__(coordinator, TERROR_ZONE_CONTEXT)
+        self._attr_name = "Terror Zones"
+        self._attr_unique_id = f"Terror Zones-{device_id}"
+
+    @property
+    def device_info(self):
+        """Device info."""
+        return self.coordinator.device_info
+
+    def _events(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        timeline = self.coordinator.terror_zone_timeline
+        events = [_to_event(rotation) for rotation in timeline.rotations(start, end)]
+        forecast = timeline.forecast()
+        if forecast is not None and forecast.end > start and forecast.start < end:
+            events.append(_to_event(forecast, forecast=True))
+        return events
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current rotation."""
+        now = dt_util.utcnow()
+        for event in self._events(now, now + timedelta(seconds=1)):
+            if event.start <= now < event.end:
+                return event
+        return None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return rotations between start_date and end_date."""
+        return self._events(start_date, end_date)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -9,45 +10,114 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_API_KEY
-from homeassistant.core import HomeAssistant
-from homeassistant.config_entries import ConfigFlowResult
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.selector import selector
 
-from .const import (
-    CONF_CONTACT_EMAIL,
-    CONF_ORIGIN,
-    DOMAIN,
-    ORIGIN_D2RUNEWIZARD,
-    ORIGIN_DIABLO2IO,
+from custom_components.d2r_tracker.providers.probe import (
+    PROBE_INVALID_AUTH,
+    ProbeResult,
+    probe_provider,
+    recommend_provider,
 )
+from custom_components.d2r_tracker.providers.registry import (
+    get_provider_spec,
+    load_entry_points,
+    provider_specs,
+)
+
+from .const import CONF_CONTACT_EMAIL, CONF_ORIGIN, DATA_PROBES, DOMAIN
+from .options import OPTIONS_SCHEMA, get_options, validate_options
 
 _LOGGER = logging.getLogger(__name__)
 
-STEP_USER_DATA_SCHEMA = vol.Schema(
-    {
-        CONF_ORIGIN: selector(
-            {"select": {"options": [ORIGIN_DIABLO2IO, ORIGIN_D2RUNEWIZARD]}}
-        ),
-        vol.Required(CONF_CONTACT_EMAIL): str,
-        vol.Optional(CONF_API_KEY): str,
-    }
-)
+# HTTP timeout of probes, shorter than the providers' own so the form is not
+# held up for long.
+PROBE_TIMEOUT_SECONDS = 10
 
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+def user_data_schema() -> vol.Schema:
+    """Return the user step schema, offering every registered provider."""
+    return vol.Schema(
+        {
+            CONF_ORIGIN: selector(
+                {"select": {"options": [spec.name for spec in provider_specs()]}}
+            ),
+            vol.Required(CONF_CONTACT_EMAIL): str,
+            vol.Optional(CONF_API_KEY): str,
+        }
+    )
+
+
+async def async_probe_providers(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> dict[str, ProbeResult]:
+    """Probe the chosen provider, or every registered one concurrently if none.
+
+    Only the chosen provider is probed as the others' results would go unused,
+    costing a request against their rate limits.
+    """
+    if origin := data.get(CONF_ORIGIN):
+        try:
+            specs = [get_provider_spec(origin)]
+        except ValueError:
+            return {}
+    else:
+        specs = list(provider_specs())
+    results = await asyncio.gather(
+        *(
+            hass.async_add_executor_job(
+                probe_provider,
+                spec,
+                data.get(CONF_API_KEY),
+                data[CONF_CONTACT_EMAIL],
+                PROBE_TIMEOUT_SECONDS,
+            )
+            for spec in specs
+        )
+    )
+    return {result.name: result for result in results}
+
+
+def format_probe_results(results: dict[str, ProbeResult]) -> str:
+    """Return a one line summary of probe results for the form description."""
+    return ", ".join(
+        f"{name}: {round(result.latency * 1000)} ms"
+        if result.latency is not None
+        else f"{name}: {result.error}"
+        for name, result in results.items()
+    )
+
+
+async def validate_input(
+    hass: HomeAssistant, data: dict[str, Any], probe_results: dict[str, ProbeResult]
+) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
-    Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    Data has the keys from user_data_schema() with values provided by the user.
+    If no origin was picked, the fastest healthy one is used.
     """
-    if CONF_ORIGIN not in data:
-        raise InvalidOrigin
-    elif data[CONF_ORIGIN] == ORIGIN_D2RUNEWIZARD and not data.get(CONF_API_KEY):
+    origin = data.get(CONF_ORIGIN) or recommend_provider(probe_results.values())
+    if origin is None:
+        raise CannotConnect
+    try:
+        spec = get_provider_spec(origin)
+    except ValueError as e:
+        raise InvalidOrigin from e
+    if spec.requires_api_key and not data.get(CONF_API_KEY):
         raise MissingAPIKey
 
+    error = probe_results[origin].error
+    if error == PROBE_INVALID_AUTH:
+        raise InvalidAuth
+    elif error is not None:
+        raise CannotConnect
+
     return {
-        "title": f"{data[CONF_ORIGIN]}",
-        "unique_id": f"d2r-{data[CONF_ORIGIN]}",
+        "title": f"{origin}",
+        "unique_id": f"d2r-{origin}",
+        "origin": origin,
     }
 
 
@@ -56,25 +126,82 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlowHandler:
+        """Return the options flow."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
+        probe_summary = ""
+        await self.hass.async_add_executor_job(load_entry_points)
+        schema = user_data_schema()
         if user_input is not None:
+            probe_results = await async_probe_providers(self.hass, user_input)
+            probe_summary = format_probe_results(probe_results)
             try:
-                info = await validate_input(self.hass, user_input)
+                info = await validate_input(self.hass, user_input, probe_results)
             except InvalidOrigin:
                 errors["base"] = "invalid_auth"
+            except InvalidAuth:
+                errors[CONF_API_KEY] = "invalid_auth"
+            except MissingAPIKey:
+                errors[CONF_API_KEY] = "missing_api_key"
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
             except Exception as e:  # pylint: disable=broad-except
                 _LOGGER.exception(f"Unexpected exception {e}")
                 errors["base"] = "unknown"
             else:
+                # Setup serves what the probe fetched rather than fetching it
+                # again right away, which the provider's rate limit may forbid.
+                self.hass.data.setdefault(DATA_PROBES, {})[info["origin"]] = (
+                    probe_results[info["origin"]]
+                )
                 await self.async_set_unique_id(info["unique_id"])
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"],
+                    data={**user_input, CONF_ORIGIN: info["origin"]},
+                )
+            # Pre-select the fastest healthy origin when asking again.
+            suggested = dict(user_input)
+            if recommended := recommend_provider(probe_results.values()):
+                suggested[CONF_ORIGIN] = recommended
+            schema = self.add_suggested_values_to_schema(schema, suggested)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="user",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"probe": probe_summary},
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle runtime tuning of intervals, TTLs and timeouts."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            await self.hass.async_add_executor_job(load_entry_points)
+            spec = get_provider_spec(self.config_entry.data[CONF_ORIGIN])
+            errors = validate_options(user_input, spec)
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, user_input or get_options(self.config_entry)
+            ),
+            errors=errors,
         )
 
 
@@ -84,3 +211,11 @@ class InvalidOrigin(HomeAssistantError):
 
 class MissingAPIKey(HomeAssistantError):
     """Error to indicate the API key is missing"""
+
+
+class InvalidAuth(HomeAssistantError):
+    """Error to indicate the provider rejected the API key."""
+
+
+class CannotConnect(HomeAssistantError):
+    """Error to indicate the provider could not be reached or parsed."""
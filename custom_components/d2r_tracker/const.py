@@ -6,3 +6,34 @@ ORIGIN_D2RUNEWIZARD = "d2runewizard.com"
 ORIGIN_DIABLO2IO = "diablo2.io"
 CONF_CONTACT_EMAIL = "Contact Email"
 CONF_ORIGIN = "Origin"
+
+# hass.data key of the FetchPipeline shared by all config entries.
+DATA_FETCH_PIPELINE = f"{DOMAIN}_fetch_pipeline"
+# hass.data key of the config flow's latest probe result, by origin.
+DATA_PROBES = f"{DOMAIN}_probes"
+# hass.data key of the value contexts events are wanted for, by entry ID.
+DATA_EVENT_SUBSCRIPTIONS = f"{DOMAIN}_event_subscriptions"
+
+# Options.
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_DCLONE_CACHE_TTL = "dclone_cache_ttl"
+# Also the rotation length the terror zone timeline and calendar assume.
+CONF_TERROR_ZONE_FETCH_INTERVAL = "terror_zone_fetch_interval"
+CONF_TERROR_ZONE_BURST_WINDOW = "terror_zone_burst_window"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_CACHE_MAX_KIB = "cache_max_kib"
+CONF_SHARED_CACHE_PATH = "shared_cache_path"
+
+# Events, fired on transitions only.
+EVENT_DCLONE_PROGRESS = "d2r_tracker_dclone_progress"
+EVENT_DCLONE_THRESHOLD = "d2r_tracker_dclone_threshold"
+EVENT_TERROR_ZONE_CHANGED = "d2r_tracker_terror_zone_changed"
+ATTR_REGION = "region"
+ATTR_LADDER = "ladder"
+ATTR_HARDCORE = "hardcore"
+ATTR_PROGRESS = "progress"
+ATTR_PREVIOUS = "previous"
+ATTR_THRESHOLD = "threshold"
+ATTR_ZONE = "zone"
+ATTR_ZONE_ID = "zone_id"
@@ -0,0 +1,172 @@
+"""Device triggers for D2R DClone progress and terror zone events."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.device_automation import (
+    DEVICE_TRIGGER_BASE_SCHEMA,
+    DeviceNotFound,
+)
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_EVENT,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    HC,
+    LADDER,
+    REGIONS,
+    ProviderCapabilities,
+)
+from custom_components.d2r_tracker.providers.history import MAX_PROGRESS
+
+from .const import (
+    ATTR_HARDCORE,
+    ATTR_LADDER,
+    ATTR_REGION,
+    ATTR_THRESHOLD,
+    DOMAIN,
+    EVENT_DCLONE_PROGRESS,
+    EVENT_DCLONE_THRESHOLD,
+    EVENT_TERROR_ZONE_CHANGED,
+)
+from .events import async_subscribe_events
+from .values import TERROR_ZONE_CONTEXT, ValueContext, dclone_context
+
+TRIGGER_DCLONE_PROGRESS = "dclone_progress"
+TRIGGER_DCLONE_THRESHOLD = "dclone_threshold"
+TRIGGER_TERROR_ZONE_CHANGED = "terror_zone_changed"
+
+# Trigger type -> (event type, data type the provider must support).
+TRIGGER_EVENTS = {
+    TRIGGER_DCLONE_PROGRESS: (EVENT_DCLONE_PROGRESS, DATA_DCLONE_PROGRESS),
+    TRIGGER_DCLONE_THRESHOLD: (EVENT_DCLONE_THRESHOLD, DATA_DCLONE_PROGRESS),
+    TRIGGER_TERROR_ZONE_CHANGED: (EVENT_TERROR_ZONE_CHANGED, DATA_TERROR_ZONE),
+}
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {
+        vol.Required(CONF_TYPE): vol.In(TRIGGER_EVENTS),
+        vol.Optional(ATTR_REGION): vol.In(REGIONS),
+        vol.Optional(ATTR_LADDER): vol.In(LADDER),
+        vol.Optional(ATTR_HARDCORE): vol.In(HC),
+        vol.Optional(ATTR_THRESHOLD): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROGRESS)
+        ),
+    }
+)
+
+
+def _capabilities(hass: HomeAssistant, device_id: str) -> ProviderCapabilities:
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        raise DeviceNotFound(f"Device ID {device_id} is not valid")
+    for entry_id in device.config_entries:
+        if entry_data := hass.data.get(DOMAIN, {}).get(entry_id):
+            return entry_data["coordinator"].cached_provider.CAPABILITIES
+    # Not loaded; offer everything rather than nothing.
+    return ProviderCapabilities()
+
+
+async def async_get_triggers(
+    hass: HomeAssistant, device_id: str
+) -> list[dict[str, Any]]:
+    """List the triggers the device's provider can fire."""
+    capabilities = _capabilities(hass, device_id)
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: trigger_type,
+        }
+        for trigger_type, (_, data_type) in TRIGGER_EVENTS.items()
+        if capabilities.supports(data_type)
+    ]
+
+
+async def async_get_trigger_capabilities(
+    hass: HomeAssistant, config: ConfigType
+) -> dict[str, vol.Schema]:
+    """Let DClone triggers narrow down to a region, ladder, hardcore or level."""
+    if config[CONF_TYPE] == TRIGGER_TERROR_ZONE_CHANGED:
+        return {}
+    capabilities = _capabilities(hass, config[CONF_DEVICE_ID])
+    fields: dict[Any, Any] = {
+        vol.Optional(ATTR_REGION): vol.In(capabilities.regions),
+        vol.Optional(ATTR_LADDER): vol.In(capabilities.ladder),
+        vol.Optional(ATTR_HARDCORE): vol.In(capabilities.hardcore),
+    }
+    if config[CONF_TYPE] == TRIGGER_DCLONE_THRESHOLD:
+        fields[vol.Required(ATTR_THRESHOLD)] = vol.In(range(1, MAX_PROGRESS + 1))
+    return {"extra_fields": vol.Schema(fields)}
+
+
+def _trigger_contexts(
+    config: ConfigType, capabilities: ProviderCapabilities
+) -> list[ValueContext]:
+    """The data a trigger needs fetched, whether or not a sensor shows it."""
+    if config[CONF_TYPE] == TRIGGER_TERROR_ZONE_CHANGED:
+        return [TERROR_ZONE_CONTEXT]
+    return [
+        dclone_context(key)
+        for key in capabilities.dclone_keys()
+        if all(
+            config.get(attr, part) == part
+            for attr, part in zip((ATTR_REGION, ATTR_LADDER, ATTR_HARDCORE), key)
+        )
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Attach a trigger, as an event trigger filtered on the event data."""
+    event_type, _ = TRIGGER_EVENTS[config[CONF_TYPE]]
+    event_data = {CONF_DEVICE_ID: config[CONF_DEVICE_ID]}
+    for attr in (ATTR_REGION, ATTR_LADDER, ATTR_HARDCORE, ATTR_THRESHOLD):
+        if attr in config:
+            event_data[attr] = config[attr]
+    event_config = event_trigger.TRIGGER_SCHEMA(
+        {
+            event_trigger.CONF_PLATFORM: CONF_EVENT,
+            event_trigger.CONF_EVENT_TYPE: event_type,
+            event_trigger.CONF_EVENT_DATA: event_data,
+        }
+    )
+    remove_trigger = await event_trigger.async_attach_trigger(
+        hass, event_config, action, trigger_info, platform_type="device"
+    )
+    unsubscribes = []
+    if device := dr.async_get(hass).async_get(config[CONF_DEVICE_ID]):
+        contexts = _trigger_contexts(
+            config, _capabilities(hass, config[CONF_DEVICE_ID])
+        )
+        unsubscribes = [
+            async_subscribe_events(hass, entry_id, contexts)
+            for entry_id in device.config_entries
+        ]
+
+    @callback
+    def _async_remove() -> None:
+        remove_trigger()
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+
+    return _async_remove
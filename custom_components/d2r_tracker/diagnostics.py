@@ -0,0 +1,67 @@
+"""Diagnostics support for the Diablo 2 Resurrected integration."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from . import D2RDataUpdateCoordinator
+from .const import CONF_CONTACT_EMAIL, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_CONTACT_EMAIL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: D2RDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id][
+        "coordinator"
+    ]
+    cached_provider = coordinator.cached_provider
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "snapshot_version": coordinator.snapshot.version,
+        "plan": {
+            "data_types": sorted(coordinator.plan.data_types),
+            "dclone_keys": [list(key) for key in coordinator.plan.dclone_keys],
+        },
+        "cache": asdict(cached_provider.cache.stats),
+        "cache_hits": dict(cached_provider.hits),
+        "cache_misses": dict(cached_provider.misses),
+        "fetch_errors": dict(cached_provider.errors),
+        "shared_cache_hits": dict(cached_provider.shared_hits),
+        "validation_failures": dict(cached_provider.validation_failures),
+        "invalid_payloads": {
+            key: {
+                "error": str(invalid.error),
+                "failures": invalid.failures,
+                "retry_after": invalid.retry_after.isoformat(),
+            }
+            for key, invalid in cached_provider.invalid.items()
+        },
+        "parts": {
+            data_type: {
+                "error": status.error,
+                "held": status.held,
+                "age_seconds": status.age(dt_util.utcnow()),
+            }
+            for data_type, status in coordinator.data.status.items()
+        },
+        "pipeline": (
+            {
+                origin: asdict(metrics)
+                for origin, metrics in coordinator.pipeline.metrics.items()
+            }
+            if coordinator.pipeline is not None
+            else None
+        ),
+    }
@@ -0,0 +1,176 @@
+"""Events fired on DClone progress and terror zone transitions."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
+
+from custom_components.d2r_tracker.providers import DCloneKey
+from custom_components.d2r_tracker.providers.zones import lookup_zone
+
+from .const import (
+    ATTR_HARDCORE,
+    ATTR_LADDER,
+    ATTR_PREVIOUS,
+    ATTR_PROGRESS,
+    ATTR_REGION,
+    ATTR_THRESHOLD,
+    ATTR_ZONE,
+    ATTR_ZONE_ID,
+    DATA_EVENT_SUBSCRIPTIONS,
+    DOMAIN,
+    EVENT_DCLONE_PROGRESS,
+    EVENT_DCLONE_THRESHOLD,
+    EVENT_TERROR_ZONE_CHANGED,
+)
+from .values import VALUE_TERROR_ZONE, ChangeSet, ValueContext, dclone_value_key
+
+if TYPE_CHECKING:
+    from . import D2RDataUpdateCoordinator
+
+
+def changes_to_events(
+    changes: ChangeSet, dclone_keys: Iterable[DCloneKey]
+) -> list[tuple[str, dict[str, Any]]]:
+    """Map a change set to (event type, event data) pairs.
+
+    Values appearing or disappearing, e.g. on startup or when a sensor is
+    enabled, are not transitions and fire nothing.
+    """
+    events: list[tuple[str, dict[str, Any]]] = []
+    for key in dclone_keys:
+        change = changes.changes.get(dclone_value_key(key))
+        if change is None or None in change:
+            continue
+        previous, progress = change
+        region, ladder, hardcore = key
+        data = {
+            ATTR_REGION: region,
+            ATTR_LADDER: ladder,
+            ATTR_HARDCORE: hardcore,
+            ATTR_PREVIOUS: previous,
+            ATTR_PROGRESS: progress,
+        }
+        events.append((EVENT_DCLONE_PROGRESS, data))
+        for threshold in range(previous + 1, progress + 1):
+            events.append((EVENT_DCLONE_THRESHOLD, {**data, ATTR_THRESHOLD: threshold}))
+
+    change = changes.changes.get(VALUE_TERROR_ZONE)
+    if change is not None and None not in change:
+        previous_zone, zone = change
+        events.append(
+            (
+                EVENT_TERROR_ZONE_CHANGED,
+                {
+                    ATTR_PREVIOUS: previous_zone,
+                    ATTR_ZONE: zone,
+                    ATTR_ZONE_ID: lookup_zone(zone).id,
+                },
+            )
+        )
+    return events
+
+
+def _subscriptions_signal(entry_id: str) -> str:
+    return f"{DATA_EVENT_SUBSCRIPTIONS}_{entry_id}"
+
+
+@callback
+def async_subscribe_events(
+    hass: HomeAssistant, entry_id: str, contexts: Iterable[ValueContext]
+) -> Callable[[], None]:
+    """Have the entry fetch `contexts`, so that their events fire, until the
+    returned callback is called.
+
+    E.g. for a device trigger on a combo whose sensor is disabled. Kept apart
+    from the coordinator, so subscriptions outlive a reload of the entry.
+    """
+    contexts = tuple(contexts)
+    subscriptions: dict[str, Counter[ValueContext]] = hass.data.setdefault(
+        DATA_EVENT_SUBSCRIPTIONS, {}
+    )
+    subscriptions.setdefault(entry_id, Counter()).update(contexts)
+    async_dispatcher_send(hass, _subscriptions_signal(entry_id))
+
+    @callback
+    def _async_unsubscribe() -> None:
+        counts = subscriptions[entry_id]
+        counts.subtract(contexts)
+        for context in contexts:
+            if counts[context] <= 0:
+                del counts[context]
+        async_dispatcher_send(hass, _subscriptions_signal(entry_id))
+
+    return _async_unsubscribe
+
+
+@callback
+def async_setup_events(
+    hass: HomeAssistant, coordinator: D2RDataUpdateCoordinator
+) -> Callable[[], None]:
+    """Fire events for the coordinator's changes. Returns a callback to stop.
+
+    Events cover the data the coordinator fetches: what enabled entities
+    consume, and what was subscribed to with async_subscribe_events. The
+    latter are registered as coordinator listeners, so that they are fetched,
+    and polled for, like an entity's.
+    """
+    dclone_keys = coordinator.cached_provider.CAPABILITIES.dclone_keys()
+    entry = coordinator.config_entry
+    # Context -> callback removing its coordinator listener.
+    listeners: dict[ValueContext, Callable[[], None]] = {}
+
+    @callback
+    def _async_fire(changes: ChangeSet) -> None:
+        events = changes_to_events(changes, dclone_keys)
+        if not events:
+            return
+        device = dr.async_get(hass).async_get_device(
+            identifiers={(DOMAIN, str(entry.unique_id))}
+        )
+        base = {
+            ATTR_DEVICE_ID: device.id if device is not None else None,
+            "entry_id": entry.entry_id,
+        }
+        for event_type, data in events:
+            hass.bus.async_fire(event_type, {**base, **data})
+
+    @callback
+    def _async_refreshed() -> None:
+        """Events fire from change sets rather than on each refresh."""
+
+    @callback
+    def _async_update_subscriptions() -> None:
+        wanted = hass.data.get(DATA_EVENT_SUBSCRIPTIONS, {}).get(entry.entry_id, {})
+        for context in [context for context in listeners if context not in wanted]:
+            listeners.pop(context)()
+        for context in wanted:
+            if context not in listeners:
+                listeners[context] = coordinator.async_add_listener(
+                    _async_refreshed, context
+                )
+
+    remove_change_listener = coordinator.async_add_change_listener(_async_fire)
+    remove_dispatcher = async_dispatcher_connect(
+        hass, _subscriptions_signal(entry.entry_id), _async_update_subscriptions
+    )
+    _async_update_subscriptions()
+
+    @callback
+    def _async_stop() -> None:
+        remove_change_listener()
+        remove_dispatcher()
+        for remove_listener in listeners.values():
+            remove_listener()
+        listeners.clear()
+
+    return _async_stop
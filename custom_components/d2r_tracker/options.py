@@ -0,0 +1,89 @@
+"""Runtime tunables for the Diablo 2 Resurrected integration."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import os
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+
+from custom_components.d2r_tracker.providers import REQUEST_TIMEOUT_SECONDS
+from custom_components.d2r_tracker.providers.cache import CACHE_MAX_BYTES
+from custom_components.d2r_tracker.providers.cached import (
+    DCLONE_CACHE_TTL_SECONDS,
+    TERRORZONE_BURST_MINUTES,
+    TERRORZONE_FETCH_INTERVAL_MINUTES,
+)
+from custom_components.d2r_tracker.providers.registry import ProviderSpec
+
+from .const import (
+    CONF_CACHE_MAX_KIB,
+    CONF_DCLONE_CACHE_TTL,
+    CONF_RECORD_TRAFFIC,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SHARED_CACHE_PATH,
+    CONF_TERROR_ZONE_BURST_WINDOW,
+    CONF_TERROR_ZONE_FETCH_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+)
+
+DEFAULT_UPDATE_INTERVAL_SECONDS = 60
+
+DEFAULT_OPTIONS: Mapping[str, Any] = {
+    CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL_SECONDS,
+    CONF_DCLONE_CACHE_TTL: DCLONE_CACHE_TTL_SECONDS,
+    CONF_TERROR_ZONE_FETCH_INTERVAL: TERRORZONE_FETCH_INTERVAL_MINUTES,
+    CONF_TERROR_ZONE_BURST_WINDOW: TERRORZONE_BURST_MINUTES,
+    CONF_REQUEST_TIMEOUT: REQUEST_TIMEOUT_SECONDS,
+    CONF_RECORD_TRAFFIC: False,
+    CONF_CACHE_MAX_KIB: CACHE_MAX_BYTES // 1024,
+    # Empty to not share responses with other instances.
+    CONF_SHARED_CACHE_PATH: "",
+}
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_UPDATE_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(CONF_DCLONE_CACHE_TTL): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(CONF_TERROR_ZONE_FETCH_INTERVAL): vol.All(
+            vol.Coerce(int), vol.In([5, 10, 15, 20, 30, 60])
+        ),
+        vol.Required(CONF_TERROR_ZONE_BURST_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=59)
+        ),
+        vol.Required(CONF_REQUEST_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=120)
+        ),
+        vol.Required(CONF_RECORD_TRAFFIC): bool,
+        vol.Required(CONF_CACHE_MAX_KIB): vol.All(
+            vol.Coerce(int), vol.Range(min=16, max=64 * 1024)
+        ),
+        vol.Optional(CONF_SHARED_CACHE_PATH): str,
+    }
+)
+
+
+def get_options(entry: ConfigEntry) -> dict[str, Any]:
+    """Return the entry's options, with defaults for anything unset."""
+    return {**DEFAULT_OPTIONS, **entry.options}
+
+
+def validate_options(options: Mapping[str, Any], spec: ProviderSpec) -> dict[str, str]:
+    """Return field -> error for options that break the provider's rate limits."""
+    errors: dict[str, str] = {}
+    if options[CONF_UPDATE_INTERVAL] < spec.min_request_interval:
+        errors[CONF_UPDATE_INTERVAL] = "below_rate_limit"
+    if options[CONF_DCLONE_CACHE_TTL] < spec.min_request_interval:
+        errors[CONF_DCLONE_CACHE_TTL] = "below_rate_limit"
+    if (
+        options[CONF_TERROR_ZONE_BURST_WINDOW]
+        >= options[CONF_TERROR_ZONE_FETCH_INTERVAL]
+    ):
+        errors[CONF_TERROR_ZONE_BURST_WINDOW] = "burst_too_long"
+    shared_cache_path = options.get(CONF_SHARED_CACHE_PATH, "")
+    if shared_cache_path and not os.path.isabs(shared_cache_path):
+        errors[CONF_SHARED_CACHE_PATH] = "path_not_absolute"
+    return errors
@@ -1,13 +1,28 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import ClassVar, NewType, Optional
+from typing import TYPE_CHECKING, ClassVar, Iterable, Mapping, NewType, Optional
+
+from custom_components.d2r_tracker.providers.zones import TerrorZone, lookup_zone
+
+if TYPE_CHECKING:
+    from custom_components.d2r_tracker.providers.recording import TrafficRecorder
 
 
 @dataclass
 class TerrorZoneResponse:
+    # Zone names as upstream reports them.
     current: str
     next: Optional[str]
     updated_at: datetime
+    # Catalog entries of the zones, resolved once per response.
+    current_zone: Optional[TerrorZone] = field(default=None, compare=False, repr=False)
+    next_zone: Optional[TerrorZone] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.current_zone is None:
+            self.current_zone = lookup_zone(self.current)
+        if self.next_zone is None and self.next:
+            self.next_zone = lookup_zone(self.next)
 
 
 Progress = NewType("Progress", int)
@@ -34,8 +49,52 @@ class DCloneProgress:
     China: Optional[DCloneLadderProgress]
 
 
+REGIONS = list(DCloneProgress.__dataclass_fields__.keys())
+
+LADDER = list(DCloneLadderProgress.__dataclass_fields__.keys())
+
+HC = list(DCloneCoreProgress.__dataclass_fields__.keys())
+
+# (region, ladder, hardcore), e.g. ("Europe", "L", "SC").
+DCloneKey = tuple[str, str, str]
+
+DATA_DCLONE_PROGRESS = "dclone_progress"
+DATA_TERROR_ZONE = "terror_zone"
+
+
+@dataclass(frozen=True)
+class ProviderCapabilities:
+    """What a provider can return. Unsupported data is never requested."""
+
+    data_types: frozenset[str] = frozenset({DATA_DCLONE_PROGRESS, DATA_TERROR_ZONE})
+    regions: tuple[str, ...] = tuple(REGIONS)
+    ladder: tuple[str, ...] = tuple(LADDER)
+    hardcore: tuple[str, ...] = tuple(HC)
+
+    def supports(self, data_type: str) -> bool:
+        return data_type in self.data_types
+
+    def dclone_keys(self) -> tuple[DCloneKey, ...]:
+        if not self.supports(DATA_DCLONE_PROGRESS):
+            return ()
+        return tuple(
+            (region, ladder, hardcore)
+            for region in self.regions
+            for ladder in self.ladder
+            for hardcore in self.hardcore
+        )
+
+
+REQUEST_TIMEOUT_SECONDS = 60
+
+
 class ProviderBase:
     NAME: ClassVar[str]
+    CAPABILITIES: ClassVar[ProviderCapabilities] = ProviderCapabilities()
+    # HTTP timeout, in seconds.
+    timeout: float = REQUEST_TIMEOUT_SECONDS
+    # Set to capture raw upstream payloads, e.g. to replay them later.
+    recorder: Optional["TrafficRecorder"] = None
 
     def get_terror_zone(self) -> TerrorZoneResponse:
         raise NotImplementedError
@@ -43,18 +102,103 @@ class ProviderBase:
     def get_dclone_progress(self) -> DCloneProgress:
         raise NotImplementedError
 
+    def get_dclone_values(
+        self, keys: Iterable[DCloneKey]
+    ) -> dict[DCloneKey, Optional[Progress]]:
+        """Return the progress for each of `keys`, in one call.
+
+        None for regions the provider does not report. Providers with filtered
+        endpoints override this to fetch only what is asked for.
+        """
+        progress = self.get_dclone_progress()
+        return {key: get_progress(progress, key) for key in keys}
+
+    def fetches_all_dclone_progress(self, keys: frozenset[DCloneKey]) -> bool:
+        """Whether get_dclone_values(keys) fetches the full progress anyway.
+
+        Such queries are cached as the full progress. Providers overriding
+        get_dclone_values override this to match.
+        """
+        return True
+
     def get_attribution(self) -> str:
         raise NotImplementedError
 
 
-@dataclass
-class ProviderResponse:
-    terror_zone: Optional[TerrorZoneResponse]
-    dclone_progress: Optional[DCloneProgress]
+# Errors a fetch may raise: requests' exceptions are OSErrors, and malformed
+# payloads raise while parsing.
+FETCH_ERRORS = (OSError, ValueError, KeyError, TypeError)
 
 
-REGIONS = list(DCloneProgress.__dataclass_fields__.keys())
+@dataclass(frozen=True)
+class PartStatus:
+    """How one data type of a response was obtained."""
 
-LADDER = list(DCloneLadderProgress.__dataclass_fields__.keys())
+    # When the data was last fetched from upstream, possibly by an earlier
+    # refresh if it came from the cache. None if never.
+    fetched_at: Optional[datetime]
+    # Set if fetching failed, in which case the part is None, or in a merged
+    # response, still the last value fetched.
+    error: Optional[str] = None
+    # Set while upstream sends invalid payloads and the part is the last good
+    # one, which is still ok to show.
+    held: Optional[str] = None
 
-HC = list(DCloneCoreProgress.__dataclass_fields__.keys())
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def age(self, now: datetime) -> Optional[float]:
+        """Seconds since the data was fetched from upstream."""
+        if self.fetched_at is None:
+            return None
+        return (now - self.fetched_at).total_seconds()
+
+
+@dataclass
+class ProviderResponse:
+    terror_zone: Optional[TerrorZoneResponse]
+    dclone_progress: Optional[DCloneProgress]
+    # Set instead of `dclone_progress` when only some keys were queried.
+    dclone_values: Optional[Mapping[DCloneKey, Optional[Progress]]] = None
+    # Data type -> status, for each data type that was requested.
+    status: dict[str, PartStatus] = field(default_factory=dict)
+
+    def part_ok(self, data_type: str) -> bool:
+        """Whether `data_type` was requested and fetched successfully."""
+        status = self.status.get(data_type)
+        return status is not None and status.ok
+
+    def merge(self, other: "ProviderResponse") -> "ProviderResponse":
+        """Overlay the statuses of `other`, and the parts it fetched.
+
+        A part `other` failed to fetch keeps its previous value, so a failed
+        fetch only shows in the status, rather than as the value going away
+        and coming back.
+        """
+        merged = replace(self, status={**self.status, **other.status})
+        if other.part_ok(DATA_TERROR_ZONE):
+            merged.terror_zone = other.terror_zone
+        if other.part_ok(DATA_DCLONE_PROGRESS):
+            merged.dclone_progress = other.dclone_progress
+            merged.dclone_values = other.dclone_values
+        return merged
+
+    def dclone_progress_for(
+        self, keys: Iterable[DCloneKey]
+    ) -> dict[DCloneKey, Optional[Progress]]:
+        """Progress for each of `keys`, whichever way DClone data was fetched."""
+        if self.dclone_values is not None:
+            return {key: self.dclone_values.get(key) for key in keys}
+        if self.dclone_progress is not None:
+            return {key: get_progress(self.dclone_progress, key) for key in keys}
+        return {}
+
+
+def get_progress(progress: DCloneProgress, key: DCloneKey) -> Optional[Progress]:
+    """Return the progress for `key`, or None if the region is not present."""
+    region, ladder, hardcore = key
+    ladder_progress = getattr(progress, region)
+    if ladder_progress is None:
+        return None
+    return getattr(getattr(ladder_progress, ladder), hardcore)
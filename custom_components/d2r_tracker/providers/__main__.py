@@ -0,0 +1,5 @@
+import sys
+
+from custom_components.d2r_tracker.providers.bench import main
+
+sys.exit(main())
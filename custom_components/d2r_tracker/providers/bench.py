@@ -0,0 +1,437 @@
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import cProfile
+from functools import partial
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    FETCH_ERRORS,
+    DCloneKey,
+    ProviderBase,
+)
+from custom_components.d2r_tracker.providers import d2runewizard
+from custom_components.d2r_tracker.providers.cache import CacheStats
+from custom_components.d2r_tracker.providers.cached import CachedProvider
+from custom_components.d2r_tracker.providers.recording import (
+    RecordedResponse,
+    TrafficRecorder,
+    read_recording,
+)
+from custom_components.d2r_tracker.providers.registry import (
+    get_provider_spec,
+    load_entry_points,
+    provider_specs,
+)
+from custom_components.d2r_tracker.providers.replay import (
+    Distribution,
+    ReplayProvider,
+    recorded_parser,
+)
+
+STUB_ORIGIN = "stub"
+
+# Data type -> provider method fetching it.
+FETCHERS = {
+    DATA_TERROR_ZONE: "get_terror_zone",
+    DATA_DCLONE_PROGRESS: "get_dclone_progress",
+}
+
+# Allocation sites listed in a report.
+TOP_ALLOCATION_SITES = 5
+# Leave out what the benchmark itself allocates.
+_HARNESS_FILTERS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, threading.__file__),
+    tracemalloc.Filter(False, "*/concurrent/futures/*"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+)
+
+
+def stub_recording(timestamp: float) -> list[RecordedResponse]:
+    """Canned upstream payloads, in d2runewizard.com's format."""
+    servers = [
+        {"region": region, "ladder": ladder, "hardcore": hardcore, "progress": 3}
+        for region in ("Americas", "Europe", "Asia")
+        for ladder in (True, False)
+        for hardcore in (True, False)
+    ]
+    terror_zone = {
+        "currentTerrorZone": {"zone": "Chaos Sanctuary"},
+        "nextTerrorZone": {"zone": "Tristram"},
+    }
+    return [
+        RecordedResponse(
+            timestamp, STUB_ORIGIN, d2runewizard.TERROR_ZONE_URL, terror_zone
+        ),
+        RecordedResponse(
+            timestamp,
+            STUB_ORIGIN,
+            d2runewizard.DCLONE_PROGRESS_URL,
+            {"servers": servers},
+        ),
+    ]
+
+
+def replay_provider(recording: Iterable[RecordedResponse]) -> ReplayProvider:
+    """Serve the latest payload of each data type in `recording`."""
+    recording = [r for r in recording if recorded_parser(r.url) is not None]
+    if not recording:
+        raise ValueError("Nothing to replay")
+    # A second later, as datetimes round timestamps to the microsecond.
+    after = datetime.fromtimestamp(
+        max(r.timestamp for r in recording) + 1, timezone.utc
+    )
+    return ReplayProvider(recording, lambda: after)
+
+
+class PayloadCollector(TrafficRecorder):
+    """Keeps the latest payload per URL in memory, to time parsing them."""
+
+    def __init__(self) -> None:
+        self.payloads: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def record(self, origin: str, url: str, payload: Any) -> None:
+        with self._lock:
+            self.payloads[url] = payload
+
+
+class StackProfiler:
+    """Deterministic profiler, accumulating self time per call stack.
+
+    Writes "folded" stacks, one "outer;inner;leaf microseconds" line per stack,
+    as read by flamegraph.pl, inferno or speedscope. Only follows threads
+    started while enabled.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        # One counter per thread, merged when written.
+        self._counters: list[Counter[str]] = []
+        self._lock = threading.Lock()
+
+    def _profile(self, frame: Any, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+        local = self._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.since = now
+            local.counter = Counter()
+            with self._lock:
+                self._counters.append(local.counter)
+        if local.stack:
+            local.counter[";".join(local.stack)] += now - local.since
+        if event == "call":
+            code = frame.f_code
+            local.stack.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        elif event == "c_call":
+            local.stack.append(getattr(arg, "__qualname__", repr(arg)))
+        elif local.stack:
+            # Returns, including from frames entered before profiling started.
+            local.stack.pop()
+        local.since = time.perf_counter()
+
+    def enable(self) -> None:
+        threading.setprofile(self._profile)
+
+    def disable(self) -> None:
+        threading.setprofile(None)
+
+    def write(self, path: str | os.PathLike) -> None:
+        total: Counter[str] = Counter()
+        with self._lock:
+            for counter in self._counters:
+                total.update(counter)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(total.items()):
+                if (microseconds := round(seconds * 1_000_000)) > 0:
+                    f.write(f"{stack} {microseconds}\n")
+
+
+@dataclass(frozen=True)
+class AllocationStats:
+    # Highest traced memory during the run, in bytes.
+    peak_bytes: int
+    # Memory blocks still allocated after the run, compared to before it.
+    retained_blocks: int
+    retained_bytes: int
+    # The sites retaining the most, as "file:line: blocks, bytes".
+    top_sites: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class BenchReport:
+    provider: str
+    # Per data type.
+    calls: int
+    concurrency: int
+    # Per data type, in seconds, of successful calls.
+    latency: dict[str, Distribution]
+    errors: dict[str, int]
+    # Per data type, in seconds to parse one upstream payload.
+    parse_time: dict[str, Distribution]
+    # None if calls bypassed the cache.
+    cache: Optional[CacheStats]
+    cache_hits: dict[str, int]
+    cache_misses: dict[str, int]
+    # None unless allocations were traced.
+    allocations: Optional[AllocationStats]
+
+
+def _time_parsing(payloads: dict[str, Any], repeat: int) -> dict[str, Distribution]:
+    now = datetime.now(timezone.utc)
+    samples: dict[str, list[float]] = {}
+    for url, payload in payloads.items():
+        parser = recorded_parser(url)
+        if parser is None:
+            continue
+        data_type, parse = parser
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(payload, now)
+            samples.setdefault(data_type, []).append(time.perf_counter() - start)
+    return {data_type: Distribution.of(s) for data_type, s in samples.items()}
+
+
+def _allocation_stats(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int
+) -> AllocationStats:
+    diff = after.filter_traces(_HARNESS_FILTERS).compare_to(
+        before.filter_traces(_HARNESS_FILTERS), "lineno"
+    )
+    top = sorted(diff, key=lambda stat: stat.size_diff, reverse=True)
+    return AllocationStats(
+        peak_bytes=peak,
+        retained_blocks=sum(stat.count_diff for stat in diff),
+        retained_bytes=sum(stat.size_diff for stat in diff),
+        top_sites=tuple(
+            f"{stat.traceback[0]}: {stat.count_diff} blocks, {stat.size_diff} bytes"
+            for stat in top[:TOP_ALLOCATION_SITES]
+            if stat.size_diff > 0
+        ),
+    )
+
+
+def bench(
+    provider: ProviderBase,
+    data_types: Optional[Iterable[str]] = None,
+    calls: int = 10,
+    concurrency: int = 1,
+    cached: bool = True,
+    trace_allocations: bool = False,
+    profile_path: Optional[str | os.PathLike] = None,
+    flamegraph_path: Optional[str | os.PathLike] = None,
+    dclone_keys: Optional[Iterable[DCloneKey]] = None,
+) -> BenchReport:
+    """Call the provider `calls` times per data type, `concurrency` at a time.
+
+    Calls go through a CachedProvider unless `cached` is False. The first call
+    of each data type runs alone, so concurrent calls do not all miss an empty
+    cache. `profile_path` receives cProfile stats, which only follow one
+    thread; `flamegraph_path` receives folded stacks. Both slow calls down, as
+    does tracing allocations. With `dclone_keys`, DClone progress is queried
+    for those keys only, as a partial subscription does.
+    """
+    if profile_path is not None and concurrency > 1:
+        raise ValueError("cProfile only follows one thread, use a concurrency of 1")
+    data_types = sorted(
+        provider.CAPABILITIES.data_types if data_types is None else data_types
+    )
+    for data_type in data_types:
+        if not provider.CAPABILITIES.supports(data_type):
+            raise ValueError(f"{provider.NAME} does not provide {data_type}")
+    collector = PayloadCollector()
+    provider.recorder = collector
+    target: ProviderBase = CachedProvider(provider) if cached else provider
+    profile = cProfile.Profile() if profile_path is not None else None
+    stacks = StackProfiler() if flamegraph_path is not None else None
+    latencies: dict[str, list[float]] = {data_type: [] for data_type in data_types}
+    errors: Counter[str] = Counter()
+    errors_lock = threading.Lock()
+
+    def call(data_type: str, fetch: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.runcall(fetch)
+            else:
+                fetch()
+        except FETCH_ERRORS:
+            with errors_lock:
+                errors[data_type] += 1
+            return
+        latencies[data_type].append(time.perf_counter() - start)
+
+    if trace_allocations:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+    if stacks is not None:
+        stacks.enable()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for data_type in data_types:
+                fetch = getattr(target, FETCHERS[data_type])
+                if data_type == DATA_DCLONE_PROGRESS and dclone_keys is not None:
+                    fetch = partial(target.get_dclone_values, tuple(dclone_keys))
+                executor.submit(call, data_type, fetch).result()
+                for future in [
+                    executor.submit(call, data_type, fetch) for _ in range(calls - 1)
+                ]:
+                    future.result()
+    finally:
+        if stacks is not None:
+            stacks.disable()
+    allocations = None
+    if trace_allocations:
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = _allocation_stats(before, tracemalloc.take_snapshot(), peak)
+        tracemalloc.stop()
+
+    if profile is not None:
+        profile.dump_stats(profile_path)
+    if stacks is not None:
+        stacks.write(flamegraph_path)  # type: ignore[arg-type]
+
+    return BenchReport(
+        provider=provider.NAME,
+        calls=calls,
+        concurrency=concurrency,
+        latency={
+            data_type: Distribution.of(samples)
+            for data_type, samples in latencies.items()
+        },
+        errors=dict(errors),
+        parse_time=_time_parsing(collector.payloads, calls),
+        cache=target.cache.stats if isinstance(target, CachedProvider) else None,
+        cache_hits=dict(target.hits) if isinstance(target, CachedProvider) else {},
+        cache_misses=dict(target.misses) if isinstance(target, CachedProvider) else {},
+        allocations=allocations,
+    )
+
+
+def _milliseconds(distribution: Distribution) -> str:
+    return (
+        f"n={distribution.count} mean={distribution.mean * 1000:.3f}ms"
+        f" p50={distribution.p50 * 1000:.3f}ms p90={distribution.p90 * 1000:.3f}ms"
+        f" p99={distribution.p99 * 1000:.3f}ms max={distribution.max * 1000:.3f}ms"
+    )
+
+
+def format_report(report: BenchReport) -> str:
+    lines = [
+        f"{report.provider}: {report.calls} calls per data type,"
+        f" {report.concurrency} at a time"
+    ]
+    for data_type, latency in report.latency.items():
+        lines.append(f"{data_type}:")
+        lines.append(f"  latency  {_milliseconds(latency)}")
+        if data_type in report.parse_time:
+            lines.append(f"  parse    {_milliseconds(report.parse_time[data_type])}")
+        if report.errors.get(data_type):
+            lines.append(f"  errors   {report.errors[data_type]}")
+        if report.cache is not None:
+            lines.append(
+                f"  cache    hits={report.cache_hits.get(data_type, 0)}"
+                f" misses={report.cache_misses.get(data_type, 0)}"
+            )
+    if report.cache is not None:
+        cache = report.cache
+        lines.append(
+            f"cache: {cache.entries} entries, {cache.bytes}/{cache.max_bytes} bytes,"
+            f" {cache.evictions} evictions, {cache.expirations} expirations"
+        )
+    if report.allocations is not None:
+        allocations = report.allocations
+        lines.append(
+            f"allocations: peak {allocations.peak_bytes} bytes,"
+            f" retained {allocations.retained_blocks} blocks"
+            f" ({allocations.retained_bytes} bytes)"
+        )
+        lines.extend(f"  {site}" for site in allocations.top_sites)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    load_entry_points()
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.d2r_tracker.providers",
+        description="Exercise and profile a provider outside Home Assistant.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--origin",
+        choices=[spec.name for spec in provider_specs()],
+        help="fetch from this provider's API",
+    )
+    source.add_argument(
+        "--stub", action="store_true", help="serve canned payloads, offline"
+    )
+    source.add_argument(
+        "--recording", metavar="PATH", help="replay a recorded traffic file"
+    )
+    parser.add_argument("--api-key")
+    parser.add_argument("--contact-email", default="")
+    parser.add_argument(
+        "--data-type",
+        action="append",
+        choices=sorted(FETCHERS),
+        help="repeat for several; defaults to all the provider supports",
+    )
+    parser.add_argument(
+        "-n", "--calls", type=int, default=10, help="calls per data type"
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="call the provider directly"
+    )
+    parser.add_argument("--allocations", action="store_true", help="trace allocations")
+    parser.add_argument("--profile", metavar="PATH", help="write cProfile stats")
+    parser.add_argument("--flamegraph", metavar="PATH", help="write folded stacks")
+    args = parser.parse_args(argv)
+    if args.calls < 1 or args.concurrency < 1:
+        parser.error("--calls and --concurrency must be at least 1")
+
+    dclone_keys = None
+    try:
+        if args.origin is not None:
+            spec = get_provider_spec(args.origin)
+            if args.no_cache and args.calls > 1:
+                # Uncached calls would all hit the API at once.
+                parser.error(
+                    f"{spec.name} allows one request per {spec.min_request_interval}"
+                    " seconds, --no-cache needs --calls 1"
+                )
+            provider: ProviderBase = spec.create(args.api_key, args.contact_email)
+        elif args.stub:
+            provider = replay_provider(stub_recording(time.time()))
+        else:
+            provider = replay_provider(read_recording(args.recording))
+            dclone_keys = provider.subscribed_keys
+        report = bench(
+            provider,
+            args.data_type,
+            calls=args.calls,
+            concurrency=args.concurrency,
+            cached=not args.no_cache,
+            trace_allocations=args.allocations,
+            profile_path=args.profile,
+            flamegraph_path=args.flamegraph,
+            dclone_keys=dclone_keys,
+        )
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(format_report(report))
+    return 0
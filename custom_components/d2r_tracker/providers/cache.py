@@ -0,0 +1,172 @@
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date, datetime, timedelta
+import math
+import sys
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+CACHE_MAX_BYTES = 512 * 1024
+
+
+def estimate_size(obj: Any) -> int:
+    """Deep size of `obj` in bytes, counting shared objects once.
+
+    Covers what providers cache: dataclasses, containers, arrays and scalars.
+    Interned singletons (None, bools, small ints) are free.
+    """
+    seen: set[int] = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if item is None or isinstance(item, bool) or id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, array, datetime, date, timedelta)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif is_dataclass(item):
+            stack.extend(getattr(item, f.name) for f in fields(item))
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return size
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    # Entries dropped to stay under max_bytes, and entries past their TTL.
+    evictions: int
+    expirations: int
+    # Values larger than max_bytes on their own, hence never cached.
+    rejected: int
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """A byte-bounded LRU cache with per-entry TTLs.
+
+    Expired entries are dropped first, then the least recently used ones, until
+    the accounted size fits `max_bytes`. Thread safe, as providers run in
+    executor threads.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_MAX_BYTES,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.timer = timer
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+
+    def _drop(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def _purge_expired(self, now: float) -> None:
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._drop(key)
+            self._expirations += 1
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, raising KeyError if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self.timer():
+                self._drop(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the value if cached, without touching recency or stats."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self.timer():
+                return None
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache `value` for `ttl` seconds, or until evicted if None."""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                self._rejected += 1
+                return
+            now = self.timer()
+            expires_at = math.inf if ttl is None else now + ttl
+            self._entries[key] = _Entry(value, size, expires_at)
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._purge_expired(now)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def cap_ttl(self, predicate: Callable[[Hashable], bool], ttl: float) -> None:
+        """Expire entries whose key satisfies `predicate` within `ttl` seconds,
+        unless they expire sooner."""
+        with self._lock:
+            expires_at = self.timer() + ttl
+            for key, entry in self._entries.items():
+                if predicate(key):
+                    entry.expires_at = min(entry.expires_at, expires_at)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._purge_expired(self.timer())
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                rejected=self._rejected,
+            )
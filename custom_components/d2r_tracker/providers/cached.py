@@ -1,90 +1,437 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import time
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Optional
 
-from cachetools import TTLCache, cached
 from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    FETCH_ERRORS,
+    DCloneKey,
     DCloneProgress,
+    Progress,
     ProviderBase,
+    PartStatus,
+    ProviderCapabilities,
     ProviderResponse,
     TerrorZoneResponse,
+    get_progress,
+)
+from custom_components.d2r_tracker.providers.cache import (
+    CACHE_MAX_BYTES,
+    ResponseCache,
+)
+from custom_components.d2r_tracker.providers.schema import SchemaError
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    ROTATION_MINUTES,
 )
 
 from homeassistant.util import dt
 import logging
 
+if TYPE_CHECKING:
+    from custom_components.d2r_tracker.providers.shared_cache import SharedCache
+
 _LOGGER = logging.getLogger(__name__)
 
-TERRORZONE_FETCH_INTERVAL_MINUTES = 30
+# Fetch once per rotation, right after it starts.
+TERRORZONE_FETCH_INTERVAL_MINUTES = ROTATION_MINUTES
+# Right after a rotation, upstream may still report the previous zone, so fetch
+# every minute for this long.
+TERRORZONE_BURST_MINUTES = 5
+DCLONE_CACHE_TTL_SECONDS = 60
+# After a payload fails validation, the last good data is served and upstream
+# is only retried after this long, doubling on each failure up to the maximum.
+INVALID_PAYLOAD_RETRY_SECONDS = 300
+INVALID_PAYLOAD_RETRY_MAX_SECONDS = 3600
+
+
+def _is_dclone_entry(key: Hashable) -> bool:
+    # The full progress, or the values of a query for some keys.
+    return key == DATA_DCLONE_PROGRESS or (
+        isinstance(key, tuple) and key[0] == DATA_DCLONE_PROGRESS
+    )
+
+
+@dataclass(frozen=True)
+class InvalidPayload:
+    error: SchemaError
+    # Consecutive payloads that failed validation.
+    failures: int
+    retry_after: datetime
 
 
 class CachedProvider(ProviderBase):
-    def __init__(self, provider: ProviderBase):
-        """Initialize cached provider."""
+    def __init__(
+        self,
+        provider: ProviderBase,
+        dclone_ttl: float = DCLONE_CACHE_TTL_SECONDS,
+        terror_zone_interval_minutes: int = TERRORZONE_FETCH_INTERVAL_MINUTES,
+        terror_zone_burst_minutes: int = TERRORZONE_BURST_MINUTES,
+        clock: Optional[Callable[[], datetime]] = None,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        """Initialize cached provider.
+
+        `clock` replaces the wall clock, e.g. to replay recorded traffic.
+        """
         self.provider = provider
+        self.clock = clock
+
+        self.dclone_ttl = dclone_ttl
+        self.cache = ResponseCache(
+            cache_max_bytes,
+            timer=(lambda: clock().timestamp())
+            if clock is not None
+            else time.monotonic,
+        )
+        self.terror_zone_interval_minutes = terror_zone_interval_minutes
+        self.terror_zone_burst_minutes = terror_zone_burst_minutes
 
-        self.last_terror_zone_response: Optional[TerrorZoneResponse] = None
         self.next_terror_zone_update_after: Optional[datetime] = None
 
+        # Per data type.
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        # When each data type was last fetched from upstream.
+        self.fetched_at: dict[str, datetime] = {}
+        # Set to share fetches with other processes on this host.
+        self.shared: Optional["SharedCache"] = None
+        # Local misses answered by another process' fetch, per data type.
+        self.shared_hits: Counter[str] = Counter()
+        # Payloads that failed validation, per data type.
+        self.validation_failures: Counter[str] = Counter()
+        # Upstream key -> why and until when it is not retried.
+        self.invalid: dict[str, InvalidPayload] = {}
+        # Upstream key -> last value that passed validation, and when fetched.
+        self._last_good: dict[str, tuple[Any, datetime]] = {}
+        # Data type -> validation error, while its last good value is served.
+        self.holding: dict[str, SchemaError] = {}
+
+    def _now(self) -> datetime:
+        return self.clock() if self.clock is not None else dt.now()
+
+    @property
+    def last_terror_zone_response(self) -> Optional[TerrorZoneResponse]:
+        return self.cache.peek(DATA_TERROR_ZONE)
+
+    def configure(
+        self,
+        dclone_ttl: Optional[float] = None,
+        terror_zone_interval_minutes: Optional[int] = None,
+        terror_zone_burst_minutes: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+        cache_max_bytes: Optional[int] = None,
+    ) -> None:
+        """Update tunables on a live provider. None leaves a setting unchanged.
+
+        Cached data is kept, and only expires sooner if a setting now calls for
+        it, so saving options never fetches ahead of the provider's schedule.
+        """
+        if dclone_ttl is not None and dclone_ttl != self.dclone_ttl:
+            if dclone_ttl < self.dclone_ttl and (
+                fetched_at := self.fetched_at.get(DATA_DCLONE_PROGRESS)
+            ):
+                age = (self._now() - fetched_at).total_seconds()
+                self.cache.cap_ttl(_is_dclone_entry, max(0.0, dclone_ttl - age))
+            self.dclone_ttl = dclone_ttl
+        if cache_max_bytes is not None and cache_max_bytes != self.cache.max_bytes:
+            self.cache.resize(cache_max_bytes)
+        if request_timeout is not None:
+            self.provider.timeout = request_timeout
+        schedule = (self.terror_zone_interval_minutes, self.terror_zone_burst_minutes)
+        if terror_zone_interval_minutes is not None:
+            self.terror_zone_interval_minutes = terror_zone_interval_minutes
+        if terror_zone_burst_minutes is not None:
+            self.terror_zone_burst_minutes = terror_zone_burst_minutes
+        if schedule != (
+            self.terror_zone_interval_minutes,
+            self.terror_zone_burst_minutes,
+        ) and (fetched_at := self.fetched_at.get(DATA_TERROR_ZONE)):
+            # As if the last fetch had been made with the new settings.
+            self._schedule_terror_zone_update(fetched_at)
+
     @property
     def NAME(self) -> str:
         return self.provider.NAME
 
+    @property
+    def CAPABILITIES(self) -> ProviderCapabilities:
+        return self.provider.CAPABILITIES
+
     def get_attribution(self) -> str:
         return self.provider.get_attribution()
 
-    # Regular 60s TTL'd cache.
-    @cached(cache=TTLCache(maxsize=1, ttl=60))
+    def _fetch_upstream(
+        self,
+        data_type: str,
+        shared_key: str,
+        codec_name: str,
+        not_before: datetime,
+        fetch: Callable[[], Any],
+    ) -> tuple[Any, float]:
+        """Fetch a value, falling back to the last good one on invalid payloads.
+
+        Returns the value and its age in seconds. After a payload fails
+        validation, upstream is not asked again until the retry time, and the
+        last good value is returned meanwhile; without one, the error is raised.
+        """
+        invalid = self.invalid.get(shared_key)
+        if invalid is not None and self._now() < invalid.retry_after:
+            return self._hold_last_good(data_type, shared_key, invalid.error)
+        try:
+            value, age = self._fetch_from(
+                data_type, shared_key, codec_name, not_before, fetch
+            )
+        except SchemaError as e:
+            self.validation_failures[data_type] += 1
+            failures = invalid.failures + 1 if invalid is not None else 1
+            retry = min(
+                INVALID_PAYLOAD_RETRY_SECONDS * 2 ** min(failures - 1, 16),
+                INVALID_PAYLOAD_RETRY_MAX_SECONDS,
+            )
+            self.invalid[shared_key] = InvalidPayload(
+                e, failures, self._now() + timedelta(seconds=retry)
+            )
+            _LOGGER.warning(
+                f"Invalid payload from provider {self.provider.NAME}, keeping the last good {data_type} and retrying in {retry} seconds: {e}"
+            )
+            return self._hold_last_good(data_type, shared_key, e)
+        self.invalid.pop(shared_key, None)
+        self.holding.pop(data_type, None)
+        self._last_good[shared_key] = (value, self.fetched_at[data_type])
+        return value, age
+
+    def _hold_last_good(
+        self, data_type: str, shared_key: str, error: SchemaError
+    ) -> tuple[Any, float]:
+        if shared_key not in self._last_good:
+            raise error
+        self.holding[data_type] = error
+        value, fetched_at = self._last_good[shared_key]
+        return value, max(0.0, (self._now() - fetched_at).total_seconds())
+
+    def _fetch_from(
+        self,
+        data_type: str,
+        shared_key: str,
+        codec_name: str,
+        not_before: datetime,
+        fetch: Callable[[], Any],
+    ) -> tuple[Any, float]:
+        """Fetch from the provider, unless another process sharing the cache
+        has since `not_before`."""
+        if self.shared is None:
+            value = fetch()
+            self.fetched_at[data_type] = self._now()
+            return value, 0.0
+        value, fetched_at, fetched = self.shared.get_or_fetch(
+            f"{self.provider.NAME}/{shared_key}",
+            not_before.timestamp(),
+            fetch,
+            codec_name,
+        )
+        if not fetched:
+            self.shared_hits[data_type] += 1
+        self.fetched_at[data_type] = datetime.fromtimestamp(fetched_at, timezone.utc)
+        return value, max(0.0, self.shared.timer() - fetched_at)
+
+    # Regular TTL'd cache.
     def get_dclone_progress(self) -> DCloneProgress:
+        try:
+            progress = self.cache.get(DATA_DCLONE_PROGRESS)
+            self.hits[DATA_DCLONE_PROGRESS] += 1
+            return progress
+        except KeyError:
+            self.misses[DATA_DCLONE_PROGRESS] += 1
         _LOGGER.debug(
             f"Cache miss for dclone progress, fetching from provider {self.provider.NAME}"
         )
-        return self.provider.get_dclone_progress()
+        progress, age = self._fetch_upstream(
+            DATA_DCLONE_PROGRESS,
+            DATA_DCLONE_PROGRESS,
+            "dclone_progress",
+            self._now() - timedelta(seconds=self.dclone_ttl),
+            self.provider.get_dclone_progress,
+        )
+        self.cache.set(DATA_DCLONE_PROGRESS, progress, ttl=self.dclone_ttl - age)
+        return progress
+
+    def get_dclone_values(
+        self, keys: Iterable[DCloneKey]
+    ) -> dict[DCloneKey, Optional[Progress]]:
+        """Answer from the full progress if cached, else query only `keys`.
+
+        Queries are cached per set of keys with the same TTL as the full
+        progress. Queries the provider cannot filter, e.g. for every key it
+        supports, are full fetches, and cached as the full progress.
+        """
+        keys = tuple(keys)
+        if not keys:
+            return {}
+        wanted = frozenset(keys)
+        if wanted.issuperset(
+            self.CAPABILITIES.dclone_keys()
+        ) or self.provider.fetches_all_dclone_progress(wanted):
+            progress = self.get_dclone_progress()
+            return {key: get_progress(progress, key) for key in keys}
+
+        progress = self.cache.peek(DATA_DCLONE_PROGRESS)
+        if progress is not None:
+            self.hits[DATA_DCLONE_PROGRESS] += 1
+            return {key: get_progress(progress, key) for key in keys}
+        cache_key = (DATA_DCLONE_PROGRESS, wanted)
+        try:
+            values = self.cache.get(cache_key)
+            self.hits[DATA_DCLONE_PROGRESS] += 1
+            return dict(values)
+        except KeyError:
+            self.misses[DATA_DCLONE_PROGRESS] += 1
+        _LOGGER.debug(
+            f"Cache miss for {len(keys)} dclone keys, fetching from provider {self.provider.NAME}"
+        )
+        values, age = self._fetch_upstream(
+            DATA_DCLONE_PROGRESS,
+            f"{DATA_DCLONE_PROGRESS}/"
+            + ",".join(sorted("/".join(key) for key in wanted)),
+            "dclone_values",
+            self._now() - timedelta(seconds=self.dclone_ttl),
+            lambda: self.provider.get_dclone_values(keys),
+        )
+        self.cache.set(cache_key, values, ttl=self.dclone_ttl - age)
+        return values
 
+    # Cached until the next scheduled update, unless evicted.
     def get_terror_zone(self) -> TerrorZoneResponse:
         if (
             self.next_terror_zone_update_after is not None
-            and self.last_terror_zone_response is not None
-            and dt.now() < self.next_terror_zone_update_after
+            and self._now() < self.next_terror_zone_update_after
         ):
-            return self.last_terror_zone_response
+            try:
+                response = self.cache.get(DATA_TERROR_ZONE)
+                self.hits[DATA_TERROR_ZONE] += 1
+                return response
+            except KeyError:
+                pass
+        self.misses[DATA_TERROR_ZONE] += 1
 
         _LOGGER.debug(
             f"Cache miss for terror zone, fetching from provider {self.provider.NAME}"
         )
 
-        self.last_terror_zone_response = self.provider.get_terror_zone()
-        now = dt.now()
+        now = self._now()
+        previous = self.cache.peek(DATA_TERROR_ZONE)
+        # Another process' fetch will do if made since this one was due, or
+        # failing a schedule, in the current minute.
+        response, _ = self._fetch_upstream(
+            DATA_TERROR_ZONE,
+            DATA_TERROR_ZONE,
+            "terror_zone",
+            self.next_terror_zone_update_after or now.replace(second=0, microsecond=0),
+            self.provider.get_terror_zone,
+        )
+        if previous is not None and (previous.current, previous.next) == (
+            response.current,
+            response.next,
+        ):
+            # Nothing changed upstream: keep when it last did, rather than
+            # when it was fetched, so the published values stay the same.
+            response = previous
+        self.cache.set(DATA_TERROR_ZONE, response)
+        self._schedule_terror_zone_update(self._now())
+        return response
 
-        # In the first 5 minutes, fetch every minute.
-        if (now.minute % TERRORZONE_FETCH_INTERVAL_MINUTES) < 5:
+    def _schedule_terror_zone_update(self, now: datetime) -> None:
+        interval = self.terror_zone_interval_minutes
+        minutes_into_interval = now.minute % interval
+        # In the first few minutes, fetch every minute.
+        if minutes_into_interval < self.terror_zone_burst_minutes:
             self.next_terror_zone_update_after = now.replace(
                 second=1, microsecond=0
             ) + timedelta(minutes=1)
-        # Otherwise, schedule fetch for the next whole half hour.
+        # Otherwise, schedule fetch for the start of the next interval.
         else:
             self.next_terror_zone_update_after = now.replace(
-                minute=0, second=1, microsecond=0
-            ) + timedelta(minutes=TERRORZONE_FETCH_INTERVAL_MINUTES)
+                minute=now.minute - minutes_into_interval, second=1, microsecond=0
+            ) + timedelta(minutes=interval)
 
         _LOGGER.debug(
             f"Next terror zone update scheduled at {self.next_terror_zone_update_after.isoformat()}"
         )
 
-        return self.last_terror_zone_response
+    def seed(self, data_type: str, value: Any, fetched_at: datetime) -> None:
+        """Cache a value fetched elsewhere, e.g. by the config flow's probe.
 
-    def collate_responses(self) -> ProviderResponse:
-        terror_zone = None
-        try:
-            terror_zone = self.get_terror_zone()
-        except NotImplementedError:
-            _LOGGER.debug(f"Terror zone fetching not implemented for: {self.NAME}")
-            pass
-        dclone_progress = None
+        It is served like one fetched here, so that upstream is not asked
+        again right away.
+        """
+        if data_type == DATA_DCLONE_PROGRESS:
+            ttl = self.dclone_ttl - (self._now() - fetched_at).total_seconds()
+            if ttl <= 0:
+                return
+            self.cache.set(DATA_DCLONE_PROGRESS, value, ttl=ttl)
+        elif data_type == DATA_TERROR_ZONE:
+            self.cache.set(DATA_TERROR_ZONE, value)
+            self._schedule_terror_zone_update(fetched_at)
+        else:
+            return
+        self.fetched_at[data_type] = fetched_at
+
+    def _fetch_part(
+        self, data_type: str, fetch: Callable[[], Any], status: dict[str, PartStatus]
+    ) -> Any:
+        """Fetch one data type, recording its status rather than raising."""
         try:
-            dclone_progress = self.get_dclone_progress()
-        except NotImplementedError:
-            _LOGGER.debug(f"DClone progress fetching not implemented for: {self.NAME}")
-            pass
+            value = fetch()
+        except FETCH_ERRORS as e:
+            self.errors[data_type] += 1
+            _LOGGER.warning(
+                f"Unable to fetch {data_type} from provider {self.provider.NAME}: {e!r}"
+            )
+            status[data_type] = PartStatus(self.fetched_at.get(data_type), repr(e))
+            return None
+        # Held data is only as recent as its status says.
+        held = self.holding.get(data_type)
+        status[data_type] = PartStatus(
+            self.fetched_at.get(data_type), held=None if held is None else str(held)
+        )
+        return value
+
+    def collate_responses(
+        self,
+        data_types: Optional[Iterable[str]] = None,
+        dclone_keys: Optional[Iterable[DCloneKey]] = None,
+    ) -> ProviderResponse:
+        """Fetch the given data types, or everything the provider supports.
+
+        With `dclone_keys`, only their DClone progress is queried, and returned
+        as `dclone_values` rather than `dclone_progress`. A data type failing to
+        fetch is None, with the error in its status; the others are unaffected.
+        """
+        supported = self.CAPABILITIES.data_types
+        wanted = supported if data_types is None else supported.intersection(data_types)
+        status: dict[str, PartStatus] = {}
+        terror_zone = None
+        if DATA_TERROR_ZONE in wanted:
+            terror_zone = self._fetch_part(
+                DATA_TERROR_ZONE, self.get_terror_zone, status
+            )
+        dclone_progress = dclone_values = None
+        if DATA_DCLONE_PROGRESS in wanted:
+            if dclone_keys is None:
+                dclone_progress = self._fetch_part(
+                    DATA_DCLONE_PROGRESS, self.get_dclone_progress, status
+                )
+            else:
+                keys = tuple(dclone_keys)
+                dclone_values = self._fetch_part(
+                    DATA_DCLONE_PROGRESS, lambda: self.get_dclone_values(keys), status
+                )
         return ProviderResponse(
-            terror_zone=terror_zone, dclone_progress=dclone_progress
+            terror_zone=terror_zone,
+            dclone_progress=dclone_progress,
+            dclone_values=dclone_values,
+            status=status,
         )
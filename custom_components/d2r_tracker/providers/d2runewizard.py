@@ -1,24 +1,47 @@
 from custom_components.d2r_tracker.const import ORIGIN_D2RUNEWIZARD
 from custom_components.d2r_tracker.providers import (
-    DCloneCoreProgress,
-    DCloneLadderProgress,
-    Progress,
     DCloneProgress,
+    REQUEST_TIMEOUT_SECONDS,
     ProviderBase,
+    ProviderCapabilities,
     TerrorZoneResponse,
 )
 
+from custom_components.d2r_tracker.providers.normalize import (
+    RowSchema,
+    normalize_dclone_rows,
+    table_to_progress,
+)
+from custom_components.d2r_tracker.providers.schema import (
+    compile_schema,
+    is_type,
+    list_of,
+    nullable,
+    obj,
+)
+
 import requests
-from collections import defaultdict
+from datetime import datetime
 from homeassistant.util import dt
 import logging
+import sys
+from typing import TYPE_CHECKING, Optional
 
+if TYPE_CHECKING:
+    from custom_components.d2r_tracker.providers.recording import TrafficRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
+TERROR_ZONE_URL = "https://d2runewizard.com/api/terror-zone"
+DCLONE_PROGRESS_URL = "https://d2runewizard.com/api/diablo-clone-progress/all"
+
 
 def get_d2runewizard_api_response(
-    url: str, api_key: str | None, contact_email: str
+    url: str,
+    api_key: str | None,
+    contact_email: str,
+    timeout: float = REQUEST_TIMEOUT_SECONDS,
+    recorder: Optional["TrafficRecorder"] = None,
 ) -> dict:
     """Return API response."""
     # https://d2runewizard.com/integration
@@ -30,62 +53,65 @@ def get_d2runewizard_api_response(
     params = {
         "token": api_key,
     }
-    response = requests.get(url, timeout=60, headers=headers, params=params)
+    response = requests.get(url, timeout=timeout, headers=headers, params=params)
     response.raise_for_status()
-    return response.json()
+    payload = response.json()
+    if recorder is not None:
+        recorder.record(ORIGIN_D2RUNEWIZARD, url, payload)
+    return payload
+
+
+validate_terror_zone = compile_schema(
+    "d2runewizard.com terror zone",
+    obj(
+        currentTerrorZone=obj(zone=is_type(str)),
+        nextTerrorZone=obj(zone=nullable(is_type(str))),
+    ),
+)
+# Rows are read by DCLONE_ROW_SCHEMA, which skips malformed ones.
+validate_dclone = compile_schema(
+    "d2runewizard.com DClone progress", obj(servers=list_of(is_type(object)))
+)
 
 
-def ensure_bool(val: bool | str) -> bool:
-    if isinstance(val, bool):
-        return val
-    elif isinstance(val, str):
-        match val.lower():
-            case "true":
-                return True
-            case "false":
-                return False
-    raise ValueError(f"Invalid value for bool: {val}")
+def parse_terror_zone_response(response: dict, now: datetime) -> TerrorZoneResponse:
+    """Parse the response, with the zones resolved against the catalog."""
+    validate_terror_zone(response)
+    next_zone = response["nextTerrorZone"]["zone"]
+    return TerrorZoneResponse(
+        current=sys.intern(response["currentTerrorZone"]["zone"]),
+        next=sys.intern(next_zone) if next_zone else None,
+        updated_at=now,
+    )
 
 
-def group_dclone_response(response: dict) -> DCloneProgress:
-    entries = defaultdict(lambda: defaultdict(dict))
-    for entry in response["servers"]:
-        entries[entry["region"]][ensure_bool(entry["ladder"])][
-            ensure_bool(entry["hardcore"])
-        ] = {
-            "progress": entry["progress"],
-            "last_update_timestamp": entry.get("lastUpdate", dict()).get("seconds", 0),
-        }
-
-    def get_progress(region, ladder, hardcore):
-        return Progress(
-            entries[region][ladder].get(
-                hardcore, {"progress": 0, "last_update_timestamp": 0}
-            )["progress"]
-        )
+DCLONE_ROW_SCHEMA = RowSchema(
+    region_field="region",
+    ladder_field="ladder",
+    hardcore_field="hardcore",
+    progress_field="progress",
+    regions={"Americas": "Americas", "Europe": "Europe", "Asia": "Asia"},
+    # Booleans, or their string representation.
+    ladder={True: "L", "true": "L", False: "NL", "false": "NL"},
+    hardcore={True: "HC", "true": "HC", False: "SC", "false": "SC"},
+    case_insensitive=True,
+)
 
-    def make_core(region, ladder):
-        return DCloneCoreProgress(
-            SC=get_progress(region, ladder, False),
-            HC=get_progress(region, ladder, True),
-        )
 
-    def make_ladder(region):
-        return DCloneLadderProgress(
-            L=make_core(region, True),
-            NL=make_core(region, False),
-        )
-
-    return DCloneProgress(
-        Americas=make_ladder("Americas"),
-        Europe=make_ladder("Europe"),
-        Asia=make_ladder("Asia"),
-        China=None,  # Not provided by d2runewizard as of writing.
+def group_dclone_response(response: dict) -> DCloneProgress:
+    rows = validate_dclone(response)["servers"]
+    normalized = normalize_dclone_rows(rows, DCLONE_ROW_SCHEMA)
+    for error in normalized.errors:
+        _LOGGER.warning(f"Skipping DClone progress from d2runewizard.com: {error}")
+    # Combos not reported are assumed not to have progressed.
+    return table_to_progress(
+        normalized.table, D2RuneWizardProvider.CAPABILITIES.regions
     )
 
 
 class D2RuneWizardProvider(ProviderBase):
     NAME = ORIGIN_D2RUNEWIZARD
+    CAPABILITIES = ProviderCapabilities(regions=("Americas", "Europe", "Asia"))
 
     def __init__(self, api_key: str, contact_email: str):
         self.api_key = api_key
@@ -93,20 +119,22 @@ class D2RuneWizardProvider(ProviderBase):
 
     def get_terror_zone(self) -> TerrorZoneResponse:
         res = get_d2runewizard_api_response(
-            "https://d2runewizard.com/api/terror-zone", self.api_key, self.contact_email
-        )
-        return TerrorZoneResponse(
-            current=res["currentTerrorZone"]["zone"],
-            next=res["nextTerrorZone"]["zone"],
-            updated_at=dt.now(),
+            TERROR_ZONE_URL,
+            self.api_key,
+            self.contact_email,
+            timeout=self.timeout,
+            recorder=self.recorder,
         )
+        return parse_terror_zone_response(res, dt.now())
 
     def get_dclone_progress(self) -> DCloneProgress:
         grouped_response = group_dclone_response(
             get_d2runewizard_api_response(
-                "https://d2runewizard.com/api/diablo-clone-progress/all",
+                DCLONE_PROGRESS_URL,
                 self.api_key,
                 self.contact_email,
+                timeout=self.timeout,
+                recorder=self.recorder,
             )
         )
         return grouped_response
@@ -1,25 +1,55 @@
 from custom_components.d2r_tracker.const import ORIGIN_DIABLO2IO
 from custom_components.d2r_tracker.providers import (
-    DCloneCoreProgress,
-    DCloneLadderProgress,
-    Progress,
+    DATA_DCLONE_PROGRESS,
+    DCloneKey,
     DCloneProgress,
+    Progress,
+    REQUEST_TIMEOUT_SECONDS,
     ProviderBase,
+    ProviderCapabilities,
     TerrorZoneResponse,
 )
 
+from custom_components.d2r_tracker.providers.normalize import (
+    DCLONE_INDEX,
+    RowSchema,
+    normalize_dclone_rows,
+    is_complete,
+    table_progress,
+    table_to_progress,
+)
+from custom_components.d2r_tracker.providers.schema import (
+    compile_schema,
+    is_type,
+    list_of,
+)
+
 import requests
-from collections import defaultdict
 import logging
+from typing import TYPE_CHECKING, Iterable, Optional
+from urllib.parse import urlencode
 
+if TYPE_CHECKING:
+    from custom_components.d2r_tracker.providers.recording import TrafficRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
+DCLONE_PROGRESS_URL = "https://diablo2.io/dclone_api.php"
+
 
-def get_diablo2io_api_response(api_key: str | None, contact_email: str) -> dict:
-    """Return API response as a dictionary."""
+def get_diablo2io_api_response(
+    api_key: str | None,
+    contact_email: str,
+    timeout: float = REQUEST_TIMEOUT_SECONDS,
+    recorder: Optional["TrafficRecorder"] = None,
+    params: Optional[dict[str, str]] = None,
+) -> dict:
+    """Return API response as a dictionary.
+
+    `params` filter the rows, e.g. {"region": "1"} for the Americas only.
+    """
     response = requests.get(
-        "https://diablo2.io/dclone_api.php",
+        DCLONE_PROGRESS_URL,
         # As per https://diablo2.io/forums/public-api-for-diablo-clone-uber-diablo-tracker-t906872.html
         # No API key is required as of writing.
         # > Timings between API requests from your app should never be less than 60 seconds apart.
@@ -28,62 +58,79 @@ def get_diablo2io_api_response(api_key: str | None, contact_email: str) -> dict:
             "From": "Home Assistant integration github.com/rbaron/d2r-tracker-ha-custom-component",
             "Contact-Email": contact_email,
         },
-        timeout=60,
+        params=params,
+        timeout=timeout,
     )
     response.raise_for_status()
-    return response.json()
-
-
-def group_diablo2io_response(response: dict) -> DCloneProgress:
-    entries = defaultdict(lambda: defaultdict(dict))
-
-    bool_map = {
-        "1": True,
-        "2": False,
-    }
-
-    def get_region(region: str) -> str:
-        region_map = {
-            "1": "Americas",
-            "2": "Europe",
-            "3": "Asia",
-        }
-        return region_map[region]
-
-    for entry in response:
-        region: str = get_region(entry["region"])
-        ladder: bool = bool_map[entry["ladder"]]
-        hardcore: bool = bool_map[entry["hc"]]
-        entries[region][ladder][hardcore] = {  # type: ignore[index]
-            "progress": int(entry["progress"]),
-            "last_update_timestamp": entry["timestamped"],
-        }
-
-    def get_progress(region: str, ladder: bool, hardcore: bool) -> Progress:
-        return entries[region][ladder][hardcore]["progress"]
-
-    def make_core(region: str, ladder: bool) -> DCloneCoreProgress:
-        return DCloneCoreProgress(
-            HC=Progress(get_progress(region, ladder, True)),
-            SC=Progress(get_progress(region, ladder, False)),
-        )
+    payload = response.json()
+    if recorder is not None:
+        # Filtered payloads are recorded under their own URL, as they are not
+        # a full progress report.
+        url = DCLONE_PROGRESS_URL
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        recorder.record(ORIGIN_DIABLO2IO, url, payload)
+    return payload
+
+
+DCLONE_ROW_SCHEMA = RowSchema(
+    region_field="region",
+    ladder_field="ladder",
+    hardcore_field="hc",
+    progress_field="progress",
+    regions={"1": "Americas", "2": "Europe", "3": "Asia"},
+    ladder={"1": "L", "2": "NL"},
+    hardcore={"1": "HC", "2": "SC"},
+)
 
-    def make_region(region: str) -> DCloneLadderProgress:
-        return DCloneLadderProgress(
-            L=make_core(region, True),
-            NL=make_core(region, False),
-        )
 
-    return DCloneProgress(
-        Americas=make_region("Americas"),
-        Europe=make_region("Europe"),
-        Asia=make_region("Asia"),
-        China=None,  # Not available from diablo2.io.
-    )
+# Query parameter -> our name -> raw value, to filter rows upstream.
+DCLONE_QUERY_PARAMS: dict[str, dict[str, str]] = {
+    "region": {name: raw for raw, name in DCLONE_ROW_SCHEMA.regions.items()},
+    "ladder": {name: raw for raw, name in DCLONE_ROW_SCHEMA.ladder.items()},
+    "hc": {name: raw for raw, name in DCLONE_ROW_SCHEMA.hardcore.items()},
+}
+
+
+def dclone_query_params(keys: Iterable[DCloneKey]) -> dict[str, str]:
+    """Filter on each of region, ladder and hardcore that all `keys` share."""
+    params = {}
+    for i, (param, raw_values) in enumerate(DCLONE_QUERY_PARAMS.items()):
+        names = {key[i] for key in keys}
+        if len(names) == 1:
+            params[param] = raw_values[names.pop()]
+    return params
+
+
+# Rows are read by DCLONE_ROW_SCHEMA, which skips malformed ones.
+validate_dclone = compile_schema("diablo2.io DClone progress", list_of(is_type(object)))
+
+
+def group_diablo2io_response(response: list) -> DCloneProgress:
+    normalized = normalize_dclone_rows(validate_dclone(response), DCLONE_ROW_SCHEMA)
+    for error in normalized.errors:
+        _LOGGER.warning(f"Skipping DClone progress from diablo2.io: {error}")
+    regions = Diablo2IOProvider.CAPABILITIES.regions
+    if not is_complete(normalized.table, regions):
+        raise ValueError("diablo2.io did not report progress for every server")
+    return table_to_progress(normalized.table, regions)
+
+
+def parse_diablo2io_values(response: list) -> dict[DCloneKey, Progress]:
+    """Progress of each server a payload reports, filtered or not."""
+    normalized = normalize_dclone_rows(validate_dclone(response), DCLONE_ROW_SCHEMA)
+    for error in normalized.errors:
+        _LOGGER.warning(f"Skipping DClone progress from diablo2.io: {error}")
+    values = {key: table_progress(normalized.table, key) for key in DCLONE_INDEX}
+    return {key: progress for key, progress in values.items() if progress is not None}
 
 
 class Diablo2IOProvider(ProviderBase):
     NAME = ORIGIN_DIABLO2IO
+    CAPABILITIES = ProviderCapabilities(
+        data_types=frozenset({DATA_DCLONE_PROGRESS}),
+        regions=("Americas", "Europe", "Asia"),
+    )
 
     def __init__(self, api_key: str | None, contact_email: str):
         self.api_key = api_key
@@ -97,8 +144,35 @@ class Diablo2IOProvider(ProviderBase):
             get_diablo2io_api_response(
                 self.api_key,
                 self.contact_email,
+                timeout=self.timeout,
+                recorder=self.recorder,
             )
         )
 
+    def get_dclone_values(
+        self, keys: Iterable[DCloneKey]
+    ) -> dict[DCloneKey, Optional[Progress]]:
+        keys = tuple(keys)
+        supported = [key for key in keys if key[0] in self.CAPABILITIES.regions]
+        if not supported:
+            return dict.fromkeys(keys)
+        payload = get_diablo2io_api_response(
+            self.api_key,
+            self.contact_email,
+            timeout=self.timeout,
+            recorder=self.recorder,
+            params=dclone_query_params(supported),
+        )
+        reported = parse_diablo2io_values(payload)
+        values = {key: reported.get(key) for key in keys}
+        if any(values[key] is None for key in supported):
+            raise ValueError("diablo2.io did not report progress for every server")
+        return values
+
+    def fetches_all_dclone_progress(self, keys: frozenset[DCloneKey]) -> bool:
+        # Keys sharing no region, ladder or hardcore are not filtered on.
+        supported = [key for key in keys if key[0] in self.CAPABILITIES.regions]
+        return bool(supported) and not dclone_query_params(supported)
+
     def get_attribution(self) -> str:
         return "Data courtesy of diablo2.io"
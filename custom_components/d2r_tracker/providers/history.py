@@ -0,0 +1,187 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Mapping, Optional
+
+from custom_components.d2r_tracker.providers import (
+    HC,
+    LADDER,
+    REGIONS,
+    DCloneKey,
+    DCloneProgress,
+    Progress,
+    get_progress,
+)
+
+# DClone walks the earth once progress reaches this value.
+MAX_PROGRESS = 6
+
+DEFAULT_CAPACITY = 64
+
+
+class ProgressRingBuffer:
+    """Fixed capacity ring buffer of (timestamp, progress) transitions.
+
+    Timestamps and progress values are kept in two parallel arrays, so each
+    entry costs 9 bytes regardless of how many are stored. The number of
+    upward steps between the entries currently in the buffer is maintained
+    incrementally on append/evict.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 2:
+            raise ValueError(f"Capacity must be at least 2, got {capacity}")
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._progress = array("B", [0]) * capacity
+        self._start = 0
+        self._size = 0
+        self.steps = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _index(self, i: int) -> int:
+        return (self._start + i) % self.capacity
+
+    def __iter__(self) -> Iterator[tuple[float, int]]:
+        for i in range(self._size):
+            idx = self._index(i)
+            yield self._timestamps[idx], self._progress[idx]
+
+    def __getitem__(self, i: int) -> tuple[float, int]:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        idx = self._index(i)
+        return self._timestamps[idx], self._progress[idx]
+
+    def append(self, timestamp: float, progress: int) -> None:
+        if self._size:
+            self.steps += max(0, progress - self[-1][1])
+        if self._size == self.capacity:
+            # Evict the oldest entry, and the step it led into.
+            self.steps -= max(0, self[1][1] - self[0][1])
+            self._start = self._index(1)
+            self._size -= 1
+        idx = self._index(self._size)
+        self._timestamps[idx] = timestamp
+        self._progress[idx] = progress
+        self._size += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "timestamps": [ts for ts, _ in self],
+            "progress": [progress for _, progress in self],
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, capacity: int = DEFAULT_CAPACITY
+    ) -> "ProgressRingBuffer":
+        buffer = cls(capacity)
+        for timestamp, progress in zip(data["timestamps"], data["progress"]):
+            buffer.append(timestamp, progress)
+        return buffer
+
+
+@dataclass(frozen=True)
+class ProgressStats:
+    # When the progress last changed (or was first observed).
+    last_change: datetime
+    # Average upward steps per hour over the buffered window, if known.
+    step_rate: Optional[float]
+    # Estimated time at which progress reaches MAX_PROGRESS, if known.
+    eta: Optional[datetime]
+
+
+def compute_stats(buffer: ProgressRingBuffer) -> ProgressStats:
+    first_ts, _ = buffer[0]
+    last_ts, last_progress = buffer[-1]
+    last_change = datetime.fromtimestamp(last_ts, tz=timezone.utc)
+
+    span_hours = (last_ts - first_ts) / 3600
+    if span_hours <= 0 or buffer.steps == 0:
+        return ProgressStats(last_change=last_change, step_rate=None, eta=None)
+
+    step_rate = buffer.steps / span_hours
+    remaining = MAX_PROGRESS - last_progress
+    eta = None
+    if remaining > 0:
+        eta = datetime.fromtimestamp(
+            last_ts + remaining / step_rate * 3600, tz=timezone.utc
+        )
+    return ProgressStats(last_change=last_change, step_rate=step_rate, eta=eta)
+
+
+class DCloneHistory:
+    """Recent DClone progress transitions, per (region, ladder, hardcore)."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers: dict[DCloneKey, ProgressRingBuffer] = {}
+        self._stats: dict[DCloneKey, ProgressStats] = {}
+
+    def observe(self, progress: DCloneProgress, timestamp: float) -> bool:
+        """Record transitions in `progress`. Returns True if anything changed."""
+        return self.observe_values(
+            {
+                key: get_progress(progress, key)
+                for key in (
+                    (region, ladder, hardcore)
+                    for region in REGIONS
+                    for ladder in LADDER
+                    for hardcore in HC
+                )
+            },
+            timestamp,
+        )
+
+    def observe_values(
+        self, values: Mapping[DCloneKey, Optional[Progress]], timestamp: float
+    ) -> bool:
+        """Record transitions for the given keys only; None values are skipped."""
+        changed = False
+        for key, value in values.items():
+            if value is None:
+                continue
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = ProgressRingBuffer(self.capacity)
+            elif buffer[-1][1] == value:
+                continue
+            buffer.append(timestamp, value)
+            self._stats[key] = compute_stats(buffer)
+            changed = True
+        return changed
+
+    def transitions(self, key: DCloneKey) -> list[tuple[float, Progress]]:
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return []
+        return [(ts, Progress(progress)) for ts, progress in buffer]
+
+    def stats(self, key: DCloneKey) -> Optional[ProgressStats]:
+        return self._stats.get(key)
+
+    def as_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "series": {
+                "/".join(key): buffer.as_dict() for key, buffer in self._buffers.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DCloneHistory":
+        history = cls(data.get("capacity", DEFAULT_CAPACITY))
+        for key_str, series in data.get("series", {}).items():
+            region, ladder, hardcore = key_str.split("/")
+            key = (region, ladder, hardcore)
+            buffer = ProgressRingBuffer.from_dict(series, history.capacity)
+            if not len(buffer):
+                continue
+            history._buffers[key] = buffer
+            history._stats[key] = compute_stats(buffer)
+        return history
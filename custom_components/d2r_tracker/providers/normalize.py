@@ -0,0 +1,186 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Optional
+
+from custom_components.d2r_tracker.providers import (
+    HC,
+    LADDER,
+    REGIONS,
+    DCloneCoreProgress,
+    DCloneKey,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+)
+
+# DClone progress for every (region, ladder, hardcore) combo, laid out
+# region-major in REGIONS x LADDER x HC order. MISSING marks combos the payload
+# did not report.
+DCloneTable = array
+MISSING = -1
+TABLE_SIZE = len(REGIONS) * len(LADDER) * len(HC)
+
+MIN_PROGRESS = 0
+MAX_PROGRESS = 6
+
+DCLONE_INDEX: dict[DCloneKey, int] = {
+    (region, ladder, hardcore): (r * len(LADDER) + l) * len(HC) + h
+    for r, region in enumerate(REGIONS)
+    for l, ladder in enumerate(LADDER)  # noqa: E741
+    for h, hardcore in enumerate(HC)
+}
+
+
+def empty_table() -> DCloneTable:
+    return array("b", [MISSING]) * TABLE_SIZE
+
+
+# Raw progress value -> progress, for both numeric and string payloads.
+PROGRESS_LOOKUP: dict[Any, int] = {
+    **{value: value for value in range(MIN_PROGRESS, MAX_PROGRESS + 1)},
+    **{str(value): value for value in range(MIN_PROGRESS, MAX_PROGRESS + 1)},
+}
+
+
+class RowSchema:
+    """How to read a provider's rows.
+
+    `regions`, `ladder` and `hardcore` map raw values to our names. Every
+    combination of them is precomputed into a single lookup, so well formed
+    rows resolve to their table index with one dict access.
+    """
+
+    def __init__(
+        self,
+        region_field: str,
+        ladder_field: str,
+        hardcore_field: str,
+        progress_field: str,
+        regions: Mapping[Any, str],
+        ladder: Mapping[Any, str],
+        hardcore: Mapping[Any, str],
+        case_insensitive: bool = False,
+    ) -> None:
+        self.fields = (region_field, ladder_field, hardcore_field, progress_field)
+        self.regions = regions
+        self.ladder = ladder
+        self.hardcore = hardcore
+        # Retry with the lowercased value when a string is not found as is.
+        self.case_insensitive = case_insensitive
+        self.index: dict[tuple[Any, Any, Any], int] = {
+            (raw_region, raw_ladder, raw_hardcore): DCLONE_INDEX[
+                (region_name, ladder_name, hardcore_name)
+            ]
+            for raw_region, region_name in regions.items()
+            for raw_ladder, ladder_name in ladder.items()
+            for raw_hardcore, hardcore_name in hardcore.items()
+        }
+
+    def _get(self, lookup: Mapping[Any, str], raw: Any) -> Optional[str]:
+        name = lookup.get(raw)
+        if name is None and self.case_insensitive and isinstance(raw, str):
+            name = lookup.get(raw.lower())
+        return name
+
+    def resolve(self, raw_region: Any, raw_ladder: Any, raw_hardcore: Any) -> int:
+        """Slow path for rows the precomputed index misses.
+
+        Returns the table index, or raises ValueError naming the bad field.
+        """
+        region = self._get(self.regions, raw_region)
+        if region is None:
+            raise ValueError(f"unknown region {raw_region!r}")
+        ladder = self._get(self.ladder, raw_ladder)
+        if ladder is None:
+            raise ValueError(f"invalid ladder value {raw_ladder!r}")
+        hardcore = self._get(self.hardcore, raw_hardcore)
+        if hardcore is None:
+            raise ValueError(f"invalid hardcore value {raw_hardcore!r}")
+        return DCLONE_INDEX[(region, ladder, hardcore)]
+
+
+@dataclass
+class NormalizedDClone:
+    table: DCloneTable
+    # One message per rejected row, e.g. "row 3: unknown region 'Mars'".
+    errors: list[str] = field(default_factory=list)
+
+
+def normalize_dclone_rows(
+    rows: Iterable[Mapping[str, Any]], schema: RowSchema
+) -> NormalizedDClone:
+    """Map raw rows into a DCloneTable in a single pass.
+
+    Rows with missing fields, unknown values or out of range progress are
+    skipped and reported rather than raising.
+    """
+    table = empty_table()
+    errors: list[str] = []
+    region_field, ladder_field, hardcore_field, progress_field = schema.fields
+    index_lookup = schema.index.get
+    progress_lookup = PROGRESS_LOOKUP.get
+
+    for i, row in enumerate(rows):
+        try:
+            raw_region = row[region_field]
+            raw_ladder = row[ladder_field]
+            raw_hardcore = row[hardcore_field]
+            raw_progress = row[progress_field]
+        except (KeyError, TypeError) as e:
+            errors.append(f"row {i}: missing field {e}")
+            continue
+        try:
+            index = index_lookup((raw_region, raw_ladder, raw_hardcore))
+            progress = progress_lookup(raw_progress)
+        except TypeError:
+            # Unhashable, e.g. a nested object where a scalar was expected.
+            errors.append(f"row {i}: invalid row {row!r}")
+            continue
+        if index is None:
+            try:
+                index = schema.resolve(raw_region, raw_ladder, raw_hardcore)
+            except ValueError as e:
+                errors.append(f"row {i}: {e}")
+                continue
+        if progress is None:
+            errors.append(f"row {i}: invalid progress {raw_progress!r}")
+            continue
+        table[index] = progress
+
+    return NormalizedDClone(table, errors)
+
+
+def table_progress(table: DCloneTable, key: DCloneKey) -> Optional[Progress]:
+    progress = table[DCLONE_INDEX[key]]
+    return None if progress == MISSING else Progress(progress)
+
+
+# Each region's combos are contiguous in the table: L HC, L SC, NL HC, NL SC.
+_REGION_SLICES = {
+    region: slice(
+        DCLONE_INDEX[(region, "L", "HC")], DCLONE_INDEX[(region, "NL", "SC")] + 1
+    )
+    for region in REGIONS
+}
+
+
+def is_complete(table: DCloneTable, regions: Iterable[str]) -> bool:
+    """Whether every combo of `regions` was reported."""
+    return not any(MISSING in table[_REGION_SLICES[region]] for region in regions)
+
+
+def table_to_progress(
+    table: DCloneTable, regions: Iterable[str], default: Progress = Progress(0)
+) -> DCloneProgress:
+    """Build a DCloneProgress for `regions`; other regions are None.
+
+    Combos missing from the table get `default`.
+    """
+    values = [default if value == MISSING else value for value in table]
+    ladders: dict[str, Optional[DCloneLadderProgress]] = dict.fromkeys(REGIONS)
+    for region in regions:
+        l_hc, l_sc, nl_hc, nl_sc = values[_REGION_SLICES[region]]
+        ladders[region] = DCloneLadderProgress(
+            DCloneCoreProgress(l_hc, l_sc), DCloneCoreProgress(nl_hc, nl_sc)
+        )
+    return DCloneProgress(**ladders)  # type: ignore[arg-type]
@@ -0,0 +1,70 @@
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from custom_components.d2r_tracker.providers.worker import (
+    WORKER_MAX_PENDING,
+    WORKER_THREADS,
+    ProviderWorker,
+    WorkerMetrics,
+    WorkerShutDownError,
+)
+
+_T = TypeVar("_T")
+
+# Time a fetch may take beyond the request timeout before it is given up on:
+# connecting and reading are timed separately, and it may queue behind another.
+FETCH_TIMEOUT_MARGIN_SECONDS = 10
+
+
+class FetchPipeline:
+    """Runs the provider I/O of every config entry, in one lane per origin.
+
+    A lane is a ProviderWorker, with threads of its own, so an origin hanging
+    until its timeout only holds up the entries fetching from it, and a FIFO
+    queue, so entries sharing an origin take turns. Lanes are created on first
+    use and shut down once no entry uses them. Only used from the event loop.
+    """
+
+    def __init__(
+        self, threads: int = WORKER_THREADS, max_pending: int = WORKER_MAX_PENDING
+    ) -> None:
+        self.threads = threads
+        self.max_pending = max_pending
+        self._lanes: dict[str, ProviderWorker] = {}
+        self._users: Counter[str] = Counter()
+
+    def acquire(self, origin: str) -> None:
+        """Register an entry fetching from `origin`."""
+        if origin not in self._lanes:
+            self._lanes[origin] = ProviderWorker(origin, self.threads)
+        self._users[origin] += 1
+        # Room for each entry's refresh, so entries do not reject each other.
+        self._lanes[origin].max_pending = self.max_pending * self._users[origin]
+
+    def release(self, origin: str) -> None:
+        self._users[origin] -= 1
+        if self._users[origin] > 0:
+            self._lanes[origin].max_pending = self.max_pending * self._users[origin]
+            return
+        del self._users[origin]
+        self._lanes.pop(origin).shutdown()
+
+    async def run(
+        self, origin: str, timeout: float, func: Callable[..., _T], *args: Any
+    ) -> _T:
+        """Run `func(*args)` on the origin's lane.
+
+        Raises TimeoutError if it has not completed within `timeout` seconds,
+        queueing included, WorkerBusyError if the lane's queue is full, and
+        WorkerShutDownError if no entry uses the lane any more.
+        """
+        if (lane := self._lanes.get(origin)) is None:
+            raise WorkerShutDownError(f"No lane for provider {origin}")
+        async with asyncio.timeout(timeout):
+            return await lane.run(func, *args)
+
+    @property
+    def metrics(self) -> dict[str, WorkerMetrics]:
+        return {origin: lane.metrics for origin, lane in self._lanes.items()}
@@ -0,0 +1,88 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import logging
+import time
+from typing import Any, Iterable, Optional
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    REQUEST_TIMEOUT_SECONDS,
+)
+from custom_components.d2r_tracker.providers.registry import ProviderSpec
+
+_LOGGER = logging.getLogger(__name__)
+
+# Probe errors, named after the config flow errors they map to.
+PROBE_CANNOT_CONNECT = "cannot_connect"
+PROBE_INVALID_AUTH = "invalid_auth"
+PROBE_INVALID_RESPONSE = "invalid_response"
+PROBE_MISSING_API_KEY = "missing_api_key"
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    name: str
+    # Round trip time in seconds, including parsing. None if the probe failed.
+    latency: Optional[float]
+    error: Optional[str] = None
+    # What was fetched, so it need not be fetched again right away.
+    data_type: Optional[str] = None
+    value: Any = field(default=None, compare=False, repr=False)
+    fetched_at: Optional[datetime] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.error is None
+
+
+def probe_provider(
+    spec: ProviderSpec,
+    api_key: str | None,
+    contact_email: str,
+    timeout: float = REQUEST_TIMEOUT_SECONDS,
+) -> ProbeResult:
+    """Fetch and parse one payload from the provider, timing the round trip.
+
+    `timeout` is the HTTP timeout, which bounds the probe's thread as well.
+    """
+    try:
+        provider = spec.create(api_key, contact_email)
+    except ValueError:
+        return ProbeResult(spec.name, None, PROBE_MISSING_API_KEY)
+    provider.timeout = timeout
+
+    start = time.monotonic()
+    try:
+        if provider.CAPABILITIES.supports(DATA_DCLONE_PROGRESS):
+            data_type = DATA_DCLONE_PROGRESS
+            value = provider.get_dclone_progress()
+        else:
+            data_type = DATA_TERROR_ZONE
+            value = provider.get_terror_zone()
+    # Checked first, as requests' JSON decoding errors are also OSErrors.
+    except (KeyError, TypeError, ValueError) as e:
+        _LOGGER.debug(f"Probe of {spec.name} returned an invalid payload: {e}")
+        return ProbeResult(spec.name, None, PROBE_INVALID_RESPONSE)
+    # requests' exceptions are OSErrors.
+    except OSError as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        _LOGGER.debug(f"Probe of {spec.name} failed: {e}")
+        if status in (401, 403):
+            return ProbeResult(spec.name, None, PROBE_INVALID_AUTH)
+        return ProbeResult(spec.name, None, PROBE_CANNOT_CONNECT)
+    return ProbeResult(
+        spec.name,
+        time.monotonic() - start,
+        data_type=data_type,
+        value=value,
+        fetched_at=datetime.now(timezone.utc),
+    )
+
+
+def recommend_provider(results: Iterable[ProbeResult]) -> Optional[str]:
+    """Return the name of the fastest healthy provider, if any."""
+    healthy = [result for result in results if result.healthy]
+    if not healthy:
+        return None
+    return min(healthy, key=lambda result: result.latency or 0).name
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RecordedResponse:
+    # Unix timestamp at which the payload was received.
+    timestamp: float
+    origin: str
+    url: str
+    payload: Any
+
+
+class TrafficRecorder:
+    """Append raw upstream payloads to a JSON lines file.
+
+    One compact line per response, so a recording can be tailed, truncated or
+    concatenated with standard tools, and a crash loses at most one line.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, origin: str, url: str, payload: Any) -> None:
+        line = json.dumps(
+            {"t": round(time.time(), 3), "o": origin, "u": url, "p": payload},
+            separators=(",", ":"),
+        )
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            # Recording is a debugging aid, never fail a fetch over it.
+            _LOGGER.warning(f"Unable to record response to {self.path}: {e}")
+
+
+def read_recording(path: str | os.PathLike) -> Iterator[RecordedResponse]:
+    """Yield the responses in a recording, skipping truncated lines."""
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            try:
+                entry = json.loads(line)
+                yield RecordedResponse(entry["t"], entry["o"], entry["u"], entry["p"])
+            except (ValueError, KeyError, TypeError):
+                _LOGGER.warning(f"Skipping invalid line {n} of {path}")
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from importlib import import_module
+from importlib.metadata import entry_points
+import logging
+
+from custom_components.d2r_tracker.const import ORIGIN_D2RUNEWIZARD, ORIGIN_DIABLO2IO
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    ProviderBase,
+    ProviderCapabilities,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Third party packages can expose additional providers by declaring entry points
+# in this group, each resolving to a ProviderSpec.
+ENTRY_POINT_GROUP = "d2r_tracker.providers"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A provider's fair use policy."""
+
+    # Minimum seconds between requests to the same endpoint. Update intervals
+    # and cache TTLs are never shorter.
+    min_request_interval: int = 60
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """What the integration knows about a provider without importing it."""
+
+    name: str
+    # "package.module:ClassName". The module is only imported when a provider
+    # is created, so registering and describing a provider is free.
+    target: str
+    requires_api_key: bool = False
+    # The same as the class declares, which it is checked against in tests.
+    capabilities: ProviderCapabilities = ProviderCapabilities()
+    rate_limit: RateLimit = RateLimit()
+
+    @property
+    def min_request_interval(self) -> int:
+        return self.rate_limit.min_request_interval
+
+    def load(self) -> type[ProviderBase]:
+        module_name, _, class_name = self.target.partition(":")
+        return getattr(import_module(module_name), class_name)
+
+    def create(self, api_key: str | None, contact_email: str) -> ProviderBase:
+        if self.requires_api_key and not api_key:
+            raise ValueError(f"API key is required for {self.name}")
+        return self.load()(api_key, contact_email)  # type: ignore[call-arg]
+
+
+_REGISTRY: dict[str, ProviderSpec] = {}
+
+
+def register_provider(spec: ProviderSpec) -> ProviderSpec:
+    if spec.name in _REGISTRY:
+        raise ValueError(f"Provider already registered: {spec.name}")
+    _REGISTRY[spec.name] = spec
+    return spec
+
+
+def get_provider_spec(name: str) -> ProviderSpec:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Invalid origin: {name}") from None
+
+
+def provider_specs() -> list[ProviderSpec]:
+    return list(_REGISTRY.values())
+
+
+def load_entry_points() -> None:
+    """Register providers declared by installed packages.
+
+    Reads package metadata from disk, so run it in an executor.
+    """
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            spec = entry_point.load()
+            if not isinstance(spec, ProviderSpec):
+                raise TypeError(f"Expected a ProviderSpec, got {spec!r}")
+            if _REGISTRY.get(spec.name) is spec:
+                continue
+            register_provider(spec)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(f"Unable to load provider entry point {entry_point}")
+
+
+register_provider(
+    ProviderSpec(
+        name=ORIGIN_DIABLO2IO,
+        target="custom_components.d2r_tracker.providers.diablo2io:Diablo2IOProvider",
+        capabilities=ProviderCapabilities(
+            data_types=frozenset({DATA_DCLONE_PROGRESS}),
+            regions=("Americas", "Europe", "Asia"),
+        ),
+    )
+)
+register_provider(
+    ProviderSpec(
+        name=ORIGIN_D2RUNEWIZARD,
+        target="custom_components.d2r_tracker.providers.d2runewizard:D2RuneWizardProvider",
+        requires_api_key=True,
+        capabilities=ProviderCapabilities(regions=("Americas", "Europe", "Asia")),
+    )
+)
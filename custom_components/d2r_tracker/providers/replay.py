@@ -0,0 +1,223 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import math
+import time
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    DCloneKey,
+    DCloneProgress,
+    Progress,
+    ProviderBase,
+    ProviderCapabilities,
+    TerrorZoneResponse,
+    get_progress,
+)
+from custom_components.d2r_tracker.providers import d2runewizard, diablo2io
+from custom_components.d2r_tracker.providers.normalize import DCLONE_INDEX
+from custom_components.d2r_tracker.providers.recording import RecordedResponse
+
+# Recorded URL -> (data type, parser taking the payload and the replay time).
+PARSERS: dict[str, tuple[str, Callable[[Any, datetime], Any]]] = {
+    d2runewizard.TERROR_ZONE_URL: (
+        DATA_TERROR_ZONE,
+        d2runewizard.parse_terror_zone_response,
+    ),
+    d2runewizard.DCLONE_PROGRESS_URL: (
+        DATA_DCLONE_PROGRESS,
+        lambda payload, _: d2runewizard.group_dclone_response(payload),
+    ),
+    diablo2io.DCLONE_PROGRESS_URL: (
+        DATA_DCLONE_PROGRESS,
+        lambda payload, _: diablo2io.group_diablo2io_response(payload),
+    ),
+}
+
+# Recorded URL of filtered queries, without the query string -> (data type,
+# parser returning the DClone values the payload reports).
+FILTERED_PARSERS: dict[str, tuple[str, Callable[[Any, datetime], Any]]] = {
+    diablo2io.DCLONE_PROGRESS_URL: (
+        DATA_DCLONE_PROGRESS,
+        lambda payload, _: diablo2io.parse_diablo2io_values(payload),
+    ),
+}
+
+
+def recorded_parser(
+    url: str,
+) -> Optional[tuple[str, Callable[[Any, datetime], Any]]]:
+    """The data type and parser of a recorded URL, None if it is not replayed."""
+    base, _, query = url.partition("?")
+    return (FILTERED_PARSERS if query else PARSERS).get(base)
+
+
+class ReplayClock:
+    """Replay time, starting at `start`.
+
+    With a `speed`, advancing also sleeps for the advanced time divided by the
+    speed, e.g. 1 for real time or 60 for a minute per second. Without one,
+    time only moves when advanced, as fast as the code under test runs.
+    """
+
+    def __init__(self, start: datetime, speed: Optional[float] = None) -> None:
+        self._now = start
+        self.speed = speed
+
+    def __call__(self) -> datetime:
+        return self._now
+
+    def advance(self, delta: timedelta) -> None:
+        if self.speed is not None:
+            time.sleep(delta.total_seconds() / self.speed)
+        self._now += delta
+
+
+class ReplayProvider(ProviderBase):
+    """Serves the latest recorded payload as of the replay clock.
+
+    DClone values come from the latest payload reporting each key, filtered
+    or not, so recordings of a partial subscription replay too.
+    """
+
+    def __init__(
+        self, recording: Iterable[RecordedResponse], clock: Callable[[], datetime]
+    ) -> None:
+        self.clock = clock
+        self.requests: dict[str, int] = defaultdict(int)
+        # Data type -> sorted timestamps and the matching (url, payload).
+        timestamps: dict[str, list[float]] = defaultdict(list)
+        payloads: dict[str, list[tuple[str, Any]]] = defaultdict(list)
+        # Filtered DClone queries, with the values each reports.
+        self._filtered_timestamps: list[float] = []
+        self._filtered: list[tuple[str, Any, dict[DCloneKey, Progress]]] = []
+        origins = set()
+        for response in sorted(recording, key=lambda r: r.timestamp):
+            parser = recorded_parser(response.url)
+            if parser is None:
+                continue
+            data_type, parse = parser
+            origins.add(response.origin)
+            if "?" in response.url:
+                recorded_at = datetime.fromtimestamp(response.timestamp, timezone.utc)
+                self._filtered_timestamps.append(response.timestamp)
+                self._filtered.append(
+                    (
+                        response.url,
+                        response.payload,
+                        parse(response.payload, recorded_at),
+                    )
+                )
+                continue
+            timestamps[data_type].append(response.timestamp)
+            payloads[data_type].append((response.url, response.payload))
+        self._timestamps = dict(timestamps)
+        self._payloads = dict(payloads)
+        # The keys of a partial subscription, None if none was recorded.
+        self.subscribed_keys: Optional[tuple[DCloneKey, ...]] = None
+        if self._filtered:
+            reported = {key for _, _, values in self._filtered for key in values}
+            self.subscribed_keys = tuple(key for key in DCLONE_INDEX if key in reported)
+        data_types = set(self._timestamps)
+        if self._filtered:
+            data_types.add(DATA_DCLONE_PROGRESS)
+        self.NAME = "replay of " + ", ".join(sorted(origins))  # type: ignore[misc]
+        self.CAPABILITIES = ProviderCapabilities(  # type: ignore[misc]
+            data_types=frozenset(data_types)
+        )
+
+    def _replay(self, data_type: str) -> Any:
+        self.requests[data_type] += 1
+        now = self.clock()
+        i = bisect_right(self._timestamps.get(data_type, []), now.timestamp())
+        if i == 0:
+            raise OSError(f"Nothing recorded for {data_type} by {now.isoformat()}")
+        url, payload = self._payloads[data_type][i - 1]
+        if self.recorder is not None:
+            self.recorder.record(self.NAME, url, payload)
+        return PARSERS[url][1](payload, now)
+
+    def get_terror_zone(self) -> TerrorZoneResponse:
+        return self._replay(DATA_TERROR_ZONE)
+
+    def get_dclone_progress(self) -> DCloneProgress:
+        return self._replay(DATA_DCLONE_PROGRESS)
+
+    def get_dclone_values(
+        self, keys: Iterable[DCloneKey]
+    ) -> dict[DCloneKey, Optional[Progress]]:
+        if not self._filtered:
+            return super().get_dclone_values(keys)
+        now = self.clock().timestamp()
+        full = self._timestamps.get(DATA_DCLONE_PROGRESS, [])
+        full_index = bisect_right(full, now)
+        full_at = full[full_index - 1] if full_index else -math.inf
+        i = bisect_right(self._filtered_timestamps, now)
+        # Only filtered payloads newer than the full progress are ahead of it.
+        newer = bisect_right(self._filtered_timestamps, full_at)
+        if i == 0 and full_index == 0:
+            raise OSError(
+                f"Nothing recorded for {DATA_DCLONE_PROGRESS}"
+                f" by {self.clock().isoformat()}"
+            )
+        self.requests[DATA_DCLONE_PROGRESS] += 1
+        values: dict[DCloneKey, Optional[Progress]] = dict.fromkeys(keys)
+        missing = set(values)
+        for url, payload, reported in reversed(self._filtered[newer:i]):
+            found = missing & reported.keys()
+            if not found:
+                continue
+            if self.recorder is not None:
+                self.recorder.record(self.NAME, url, payload)
+            for key in found:
+                values[key] = reported[key]
+            missing -= found
+            if not missing:
+                return values
+        if missing and full_index:
+            url, payload = self._payloads[DATA_DCLONE_PROGRESS][full_index - 1]
+            if self.recorder is not None:
+                self.recorder.record(self.NAME, url, payload)
+            progress = PARSERS[url][1](payload, self.clock())
+            for key in missing:
+                values[key] = get_progress(progress, key)
+        return values
+
+    def fetches_all_dclone_progress(self, keys: frozenset[DCloneKey]) -> bool:
+        return not self._filtered
+
+    def get_attribution(self) -> str:
+        return f"Replayed {self.NAME}"
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """Summary of samples, in seconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+    @classmethod
+    def of(cls, samples: Sequence[float]) -> "Distribution":
+        if not samples:
+            return cls(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        ordered = sorted(samples)
+
+        def percentile(p: float) -> float:
+            return ordered[min(len(ordered) - 1, math.ceil(p * len(ordered)) - 1)]
+
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(0.5),
+            p90=percentile(0.9),
+            p99=percentile(0.99),
+            max=ordered[-1],
+        )
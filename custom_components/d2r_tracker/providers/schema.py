@@ -0,0 +1,105 @@
+from typing import Any, Callable
+
+# Raises _Invalid if the value does not match.
+Validator = Callable[[Any], None]
+
+
+class SchemaError(ValueError):
+    """An upstream payload not matching its schema.
+
+    Raised before parsing, so a format change surfaces as one message naming
+    the offending field rather than as an arbitrary parsing error.
+    """
+
+    def __init__(self, schema: str, path: str, message: str) -> None:
+        super().__init__(f"{schema}: {path}: {message}")
+        self.schema = schema
+        # Where in the payload, e.g. "$.servers[3]".
+        self.path = path
+        self.message = message
+
+
+class _Invalid(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+        # Innermost first, appended while unwinding, so that building a path
+        # only costs anything on failure.
+        self.segments: list[str] = []
+
+
+def _type_names(types: tuple[type, ...]) -> str:
+    return " or ".join("null" if t is type(None) else t.__name__ for t in types)
+
+
+def is_type(*types: type) -> Validator:
+    names = _type_names(types)
+
+    def validate(value: Any) -> None:
+        # bool is an int, but never where a number is expected.
+        if not isinstance(value, types) or (
+            isinstance(value, bool) and bool not in types
+        ):
+            raise _Invalid(f"expected {names}, got {type(value).__name__}")
+
+    return validate
+
+
+def nullable(validator: Validator) -> Validator:
+    def validate(value: Any) -> None:
+        if value is not None:
+            validator(value)
+
+    return validate
+
+
+def obj(**fields: Validator) -> Validator:
+    """An object with at least `fields`; others are ignored."""
+    items = tuple(fields.items())
+
+    def validate(value: Any) -> None:
+        if not isinstance(value, dict):
+            raise _Invalid(f"expected an object, got {type(value).__name__}")
+        for name, validator in items:
+            if name not in value:
+                raise _Invalid(f"missing field {name!r}")
+            try:
+                validator(value[name])
+            except _Invalid as e:
+                e.segments.append(f".{name}")
+                raise
+
+    return validate
+
+
+def list_of(item: Validator) -> Validator:
+    def validate(value: Any) -> None:
+        if not isinstance(value, list):
+            raise _Invalid(f"expected a list, got {type(value).__name__}")
+        for i, element in enumerate(value):
+            try:
+                item(element)
+            except _Invalid as e:
+                e.segments.append(f"[{i}]")
+                raise
+
+    return validate
+
+
+def compile_schema(name: str, validator: Validator) -> Callable[[Any], Any]:
+    """Turn a validator built from the functions above into a payload check.
+
+    The returned function returns the payload as is, or raises SchemaError.
+    Validators are closures built once, at import, so checking a payload runs
+    no schema interpretation.
+    """
+
+    def check(payload: Any) -> Any:
+        try:
+            validator(payload)
+        except _Invalid as e:
+            raise SchemaError(
+                name, "$" + "".join(reversed(e.segments)), e.message
+            ) from None
+        return payload
+
+    return check
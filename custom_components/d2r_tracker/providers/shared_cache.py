@@ -0,0 +1,261 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional, TypeVar
+
+from custom_components.d2r_tracker.providers import (
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+    TerrorZoneResponse,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# How long a lease outlives the request timeout, before others give up waiting.
+LEASE_MARGIN_SECONDS = 5
+POLL_INTERVAL_SECONDS = 0.25
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    " key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS leases ("
+    " key TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)",
+)
+
+
+@dataclass(frozen=True)
+class Codec:
+    """JSON (de)serialization of one kind of cached value.
+
+    JSON rather than pickle, as the file is writable by other processes.
+    """
+
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+
+
+def _decode_terror_zone(data: dict) -> TerrorZoneResponse:
+    return TerrorZoneResponse(
+        current=sys.intern(data["current"]),
+        next=sys.intern(data["next"]) if data["next"] else None,
+        updated_at=datetime.fromisoformat(data["updated_at"]),
+    )
+
+
+def _decode_dclone_progress(data: dict) -> DCloneProgress:
+    return DCloneProgress(
+        **{
+            region: None
+            if ladders is None
+            else DCloneLadderProgress(
+                **{
+                    ladder: DCloneCoreProgress(**core)
+                    for ladder, core in ladders.items()
+                }
+            )
+            for region, ladders in data.items()
+        }
+    )
+
+
+TERROR_ZONE_CODEC = Codec(
+    lambda response: {
+        "current": response.current,
+        "next": response.next,
+        "updated_at": response.updated_at.isoformat(),
+    },
+    _decode_terror_zone,
+)
+DCLONE_PROGRESS_CODEC = Codec(asdict, _decode_dclone_progress)
+DCLONE_VALUES_CODEC = Codec(
+    lambda values: [[*key, progress] for key, progress in values.items()],
+    lambda rows: {
+        (region, ladder, hardcore): None if progress is None else Progress(progress)
+        for region, ladder, hardcore, progress in rows
+    },
+)
+
+# Codec name -> codec, as passed to SharedCache.get_or_fetch.
+CODECS = {
+    "terror_zone": TERROR_ZONE_CODEC,
+    "dclone_progress": DCLONE_PROGRESS_CODEC,
+    "dclone_values": DCLONE_VALUES_CODEC,
+}
+
+
+class SharedCache:
+    """Provider responses shared by processes on one host, through SQLite.
+
+    The database runs in WAL mode, so readers never wait on a writer. Before
+    fetching, a process takes a lease on the key; the others wait for its
+    result rather than fetching too, and take over once the lease expires.
+    Any database error falls back to fetching directly.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        lease_seconds: float = 60 + LEASE_MARGIN_SECONDS,
+        timer: Callable[[], float] = time.time,
+        wait_seconds: float = 60,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        # How long a call waits on another process' lease. At most the caller's
+        # own time budget, which a fetch of its own after waiting would exceed.
+        self.wait_seconds = wait_seconds
+        self.timer = timer
+        # Identifies this process' leases.
+        self.holder = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._closed = False
+
+    def set_request_timeout(self, timeout: float) -> None:
+        """Let others wait for a fetch as long as it may take.
+
+        Waiting on others is bounded by the timeout too, which leaves the
+        caller's margin beyond it for queueing.
+        """
+        self.lease_seconds = timeout + LEASE_MARGIN_SECONDS
+        self.wait_seconds = timeout
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily, from the thread doing I/O.
+        if self._closed:
+            raise sqlite3.ProgrammingError("Shared cache is closed")
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=10, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        """Close the database; later calls fetch directly.
+
+        Blocks until a call in progress on another thread is done with it.
+        """
+        with self._lock:
+            self._closed = True
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _read(self, key: str, not_before: float) -> Optional[tuple[str, float]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT value, fetched_at FROM entries WHERE key = ?", (key,))
+                .fetchone()
+            )
+        if row is None or row[1] < not_before:
+            return None
+        return row
+
+    def _try_lease(self, key: str) -> bool:
+        with self._lock:
+            connection = self._connect()
+            now = self.timer()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT holder, expires_at FROM leases WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] != self.holder and row[1] > now:
+                    connection.execute("ROLLBACK")
+                    return False
+                connection.execute(
+                    "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                    (key, self.holder, now + self.lease_seconds),
+                )
+                connection.execute("COMMIT")
+                return True
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _release(self, key: str, value: Optional[str], fetched_at: float) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if value is not None:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                        (key, value, fetched_at),
+                    )
+                connection.execute(
+                    "DELETE FROM leases WHERE key = ? AND holder = ?",
+                    (key, self.holder),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def get_or_fetch(
+        self, key: str, not_before: float, fetch: Callable[[], _T], codec_name: str
+    ) -> tuple[_T, float, bool]:
+        """Return the value for `key` fetched no earlier than `not_before`.
+
+        Fetches it if no process has, or if the lease of the process that is
+        fetching it expires. Returns the value, when it was fetched (a Unix
+        timestamp) and whether this call fetched it. Raises TimeoutError if
+        another process is still fetching it after `wait_seconds`.
+        """
+        codec = CODECS[codec_name]
+        try:
+            deadline = None
+            while True:
+                if (row := self._read(key, not_before)) is not None:
+                    value, fetched_at = row
+                    return codec.decode(json.loads(value)), fetched_at, False
+                if self._try_lease(key):
+                    break
+                if deadline is None:
+                    deadline = self.timer() + self.wait_seconds
+                elif self.timer() >= deadline:
+                    raise TimeoutError(
+                        f"{key} still being fetched by another process after {self.wait_seconds} seconds"
+                    )
+                time.sleep(POLL_INTERVAL_SECONDS)
+        except (sqlite3.Error, ValueError, KeyError, TypeError) as e:
+            _LOGGER.warning(
+                f"Shared cache {self.path} unusable, fetching directly: {e}"
+            )
+            return fetch(), self.timer(), True
+
+        try:
+            result = fetch()
+        except BaseException:
+            self._release_quietly(key, None, 0)
+            raise
+        fetched_at = self.timer()
+        self._release_quietly(
+            key, json.dumps(codec.encode(result), separators=(",", ":")), fetched_at
+        )
+        return result, fetched_at, True
+
+    def _release_quietly(
+        self, key: str, value: Optional[str], fetched_at: float
+    ) -> None:
+        try:
+            self._release(key, value, fetched_at)
+        except sqlite3.Error as e:
+            _LOGGER.warning(f"Unable to write shared cache {self.path}: {e}")
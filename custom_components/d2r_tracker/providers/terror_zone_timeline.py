@@ -0,0 +1,204 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from custom_components.d2r_tracker.providers import TerrorZoneResponse
+
+# Terror zones rotate every half hour, unless configured otherwise.
+ROTATION_MINUTES = 30
+
+# Two weeks worth of half hour rotations.
+DEFAULT_CAPACITY = 14 * 24 * 60 // ROTATION_MINUTES
+
+
+@dataclass(frozen=True)
+class TerrorZoneRotation:
+    start: datetime
+    end: datetime
+    zone: str
+
+
+def _to_datetime(epoch_minutes: int) -> datetime:
+    return datetime.fromtimestamp(epoch_minutes * 60, tz=timezone.utc)
+
+
+def rotation_start(timestamp: float, rotation_minutes: int = ROTATION_MINUTES) -> int:
+    """Return the start of the rotation containing `timestamp`, in epoch minutes."""
+    epoch_minutes = int(timestamp // 60)
+    return epoch_minutes - epoch_minutes % rotation_minutes
+
+
+class TerrorZoneTimeline:
+    """Observed terror zone rotations.
+
+    Zone names are interned into a small table, and rotations are kept in a ring
+    buffer of (start in epoch minutes, zone id) held in two parallel arrays. An
+    index of zone id -> (last start, count) answers "when was zone X last
+    terrorized" without scanning.
+
+    Rotations start every `rotation_minutes` since the epoch. Changing it only
+    affects rotations observed from then on, and the forecast.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        rotation_minutes: int = ROTATION_MINUTES,
+    ):
+        self.capacity = capacity
+        self.rotation_minutes = rotation_minutes
+        self._zones: list[str] = []
+        self._zone_ids: dict[str, int] = {}
+        self._starts = array("I", [0]) * capacity
+        self._ids = array("H", [0]) * capacity
+        self._head = 0
+        self._size = 0
+        self._last_start: dict[int, int] = {}
+        self._counts: dict[int, int] = {}
+        # Latest forecast, not part of the history.
+        self.next_zone: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _index(self, i: int) -> int:
+        return (self._head + i) % self.capacity
+
+    def _zone_id(self, zone: str) -> int:
+        zone_id = self._zone_ids.get(zone)
+        if zone_id is None:
+            zone_id = self._zone_ids[zone] = len(self._zones)
+            self._zones.append(zone)
+        return zone_id
+
+    def _entries(self) -> Iterator[tuple[int, int]]:
+        for i in range(self._size):
+            idx = self._index(i)
+            yield self._starts[idx], self._ids[idx]
+
+    def _reindex(self, zone_id: int) -> None:
+        """Recompute the index entry for `zone_id` from the buffer."""
+        starts = [start for start, id_ in self._entries() if id_ == zone_id]
+        if starts:
+            self._last_start[zone_id] = starts[-1]
+            self._counts[zone_id] = len(starts)
+        else:
+            self._last_start.pop(zone_id, None)
+            self._counts.pop(zone_id, None)
+
+    def _append(self, start: int, zone_id: int) -> None:
+        if self._size == self.capacity:
+            evicted = self._ids[self._head]
+            self._head = self._index(1)
+            self._size -= 1
+            self._counts[evicted] -= 1
+            if not self._counts[evicted]:
+                del self._counts[evicted]
+                del self._last_start[evicted]
+        idx = self._index(self._size)
+        self._starts[idx] = start
+        self._ids[idx] = zone_id
+        self._size += 1
+        self._last_start[zone_id] = start
+        self._counts[zone_id] = self._counts.get(zone_id, 0) + 1
+
+    def observe(self, response: TerrorZoneResponse, timestamp: float) -> bool:
+        """Record the zone in `response`, observed at `timestamp`.
+
+        Returns True if the timeline changed.
+        """
+        self.next_zone = response.next
+        start = rotation_start(timestamp, self.rotation_minutes)
+        zone_id = self._zone_id(response.current)
+        if self._size:
+            last_idx = self._index(self._size - 1)
+            last_start, last_id = self._starts[last_idx], self._ids[last_idx]
+            if last_id == zone_id:
+                return False
+            if last_start == start:
+                # Upstream corrected the zone for the current rotation.
+                self._ids[last_idx] = zone_id
+                self._reindex(last_id)
+                self._last_start[zone_id] = start
+                self._counts[zone_id] = self._counts.get(zone_id, 0) + 1
+                return True
+        self._append(start, zone_id)
+        return True
+
+    def last_seen(self, zone: str) -> Optional[datetime]:
+        """Return when `zone` was last terrorized, if observed."""
+        zone_id = self._zone_ids.get(zone)
+        if zone_id is None or zone_id not in self._last_start:
+            return None
+        return _to_datetime(self._last_start[zone_id])
+
+    def count(self, zone: str) -> int:
+        """Return how many observed rotations terrorized `zone`."""
+        zone_id = self._zone_ids.get(zone)
+        if zone_id is None:
+            return 0
+        return self._counts.get(zone_id, 0)
+
+    def rotations(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> list[TerrorZoneRotation]:
+        """Return observed rotations overlapping [start, end), oldest first."""
+        rotations = []
+        for rotation in self._rotations(list(self._entries())):
+            if start is not None and rotation.end <= start:
+                continue
+            if end is not None and rotation.start >= end:
+                break
+            rotations.append(rotation)
+        return rotations
+
+    def latest(self, n: int) -> list[TerrorZoneRotation]:
+        """Return the `n` most recent observed rotations, oldest first."""
+        entries = list(self._entries())
+        return list(self._rotations(entries[-n:] if n else []))
+
+    def _rotations(
+        self, entries: list[tuple[int, int]]
+    ) -> Iterator[TerrorZoneRotation]:
+        for i, (start, zone_id) in enumerate(entries):
+            end = start + self.rotation_minutes
+            if i + 1 < len(entries):
+                end = min(end, entries[i + 1][0])
+            yield TerrorZoneRotation(
+                start=_to_datetime(start),
+                end=_to_datetime(end),
+                zone=self._zones[zone_id],
+            )
+
+    def forecast(self) -> Optional[TerrorZoneRotation]:
+        """Return the upcoming rotation, if the provider reported one."""
+        if self.next_zone is None or not self._size:
+            return None
+        start = self._starts[self._index(self._size - 1)] + self.rotation_minutes
+        return TerrorZoneRotation(
+            start=_to_datetime(start),
+            end=_to_datetime(start + self.rotation_minutes),
+            zone=self.next_zone,
+        )
+
+    def as_dict(self) -> dict:
+        entries = list(self._entries())
+        return {
+            "capacity": self.capacity,
+            "zones": self._zones,
+            "starts": [start for start, _ in entries],
+            "ids": [zone_id for _, zone_id in entries],
+            "next_zone": self.next_zone,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, rotation_minutes: int = ROTATION_MINUTES
+    ) -> "TerrorZoneTimeline":
+        timeline = cls(data.get("capacity", DEFAULT_CAPACITY), rotation_minutes)
+        zones = data.get("zones", [])
+        for start, zone_id in zip(data.get("starts", []), data.get("ids", [])):
+            timeline._append(start, timeline._zone_id(zones[zone_id]))
+        timeline.next_zone = data.get("next_zone")
+        return timeline
@@ -0,0 +1,136 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+WORKER_THREADS = 2
+# Refreshes are serialized by the coordinator, so anything deeper than this
+# means upstream is hanging and new requests would only pile up behind it.
+WORKER_MAX_PENDING = 4
+
+
+class WorkerBusyError(RuntimeError):
+    """The worker's queue is full."""
+
+
+class WorkerShutDownError(RuntimeError):
+    """The worker no longer accepts jobs."""
+
+
+@dataclass(frozen=True)
+class WorkerMetrics:
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    # Jobs queued or running right now, and the most ever seen at once.
+    queue_depth: int
+    max_queue_depth: int
+    # Seconds. Wait is submission to start, run is start to finish.
+    last_wait: float | None
+    last_run: float | None
+    avg_run: float | None
+
+
+class ProviderWorker:
+    """A small, bounded thread pool dedicated to provider I/O.
+
+    Keeps refresh latency independent of whatever else is queued on Home
+    Assistant's shared executor.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threads: int = WORKER_THREADS,
+        max_pending: int = WORKER_MAX_PENDING,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix=f"d2r_tracker_{name}"
+        )
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._depth = 0
+        self._max_depth = 0
+        self._last_wait: float | None = None
+        self._last_run: float | None = None
+        self._total_run = 0.0
+
+    def _run(self, submitted_at: float, func: Callable[..., _T], *args: Any) -> _T:
+        started_at = time.monotonic()
+        ok = False
+        try:
+            result = func(*args)
+            ok = True
+            return result
+        finally:
+            finished_at = time.monotonic()
+            with self._lock:
+                self._last_wait = started_at - submitted_at
+                self._last_run = finished_at - started_at
+                self._total_run += self._last_run
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    async def run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run `func(*args)` on the worker and await its result.
+
+        Raises WorkerBusyError if the queue is full, and WorkerShutDownError
+        once the worker is shut down.
+        """
+        with self._lock:
+            if self._depth >= self.max_pending:
+                self._rejected += 1
+                raise WorkerBusyError(
+                    f"{self._depth} provider requests already pending"
+                )
+            self._depth += 1
+            self._max_depth = max(self._max_depth, self._depth)
+            self._submitted += 1
+        try:
+            future = self._executor.submit(self._run, time.monotonic(), func, *args)
+        except RuntimeError as e:
+            self._job_done()
+            raise WorkerShutDownError("Provider worker is shut down") from e
+        # Also called when a queued job is cancelled, e.g. by a timeout, and so
+        # never runs.
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, future: Any = None) -> None:
+        with self._lock:
+            self._depth -= 1
+
+    @property
+    def metrics(self) -> WorkerMetrics:
+        with self._lock:
+            finished = self._completed + self._failed
+            return WorkerMetrics(
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                rejected=self._rejected,
+                queue_depth=self._depth,
+                max_queue_depth=self._max_depth,
+                last_wait=self._last_wait,
+                last_run=self._last_run,
+                avg_run=self._total_run / finished if finished else None,
+            )
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs. Running requests finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,216 @@
+from dataclasses import dataclass
+import re
+import sys
+import threading
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class TerrorZone:
+    """A terror zone, as a catalog entry.
+
+    Zones compare by value, so unknown zones no longer kept by lookup_zone()
+    still equal the entry looked up on the previous refresh.
+    """
+
+    # Stable identifier, e.g. "chaos_sanctuary".
+    id: str
+    # None for zones upstream reports that are not in the catalog.
+    act: Optional[int]
+    # Canonical English name, interned.
+    name: str
+    # The game areas terrorized together, in the order upstream lists them.
+    levels: tuple[str, ...]
+
+    def __repr__(self) -> str:
+        return f"TerrorZone({self.id!r})"
+
+
+# (id, act, name, levels)
+_ZONES = (
+    ("blood_moor", 1, "Blood Moor and Den of Evil", ("Blood Moor", "Den of Evil")),
+    ("cold_plains", 1, "Cold Plains and The Cave", ("Cold Plains", "The Cave")),
+    (
+        "burial_grounds",
+        1,
+        "Burial Grounds, The Crypt, and the Mausoleum",
+        ("Burial Grounds", "The Crypt", "The Mausoleum"),
+    ),
+    ("stony_field", 1, "Stony Field", ("Stony Field",)),
+    (
+        "dark_wood",
+        1,
+        "Dark Wood and Underground Passage",
+        ("Dark Wood", "Underground Passage"),
+    ),
+    ("black_marsh", 1, "Black Marsh and The Hole", ("Black Marsh", "The Hole")),
+    ("forgotten_tower", 1, "The Forgotten Tower", ("The Forgotten Tower",)),
+    ("jail", 1, "Jail and Barracks", ("Jail", "Barracks")),
+    ("cathedral", 1, "Cathedral and Catacombs", ("Cathedral", "Catacombs")),
+    ("the_pit", 1, "Tamoe Highland and The Pit", ("Tamoe Highland", "The Pit")),
+    ("tristram", 1, "Tristram", ("Tristram",)),
+    ("moo_moo_farm", 1, "Moo Moo Farm", ("Moo Moo Farm",)),
+    ("sewers", 2, "Lut Gholein Sewers", ("Lut Gholein Sewers",)),
+    (
+        "rocky_waste",
+        2,
+        "Rocky Waste and Stony Tomb",
+        ("Rocky Waste", "Stony Tomb"),
+    ),
+    (
+        "dry_hills",
+        2,
+        "Dry Hills and Halls of the Dead",
+        ("Dry Hills", "Halls of the Dead"),
+    ),
+    ("far_oasis", 2, "Far Oasis", ("Far Oasis",)),
+    (
+        "lost_city",
+        2,
+        "Lost City, Valley of Snakes, and Claw Viper Temple",
+        ("Lost City", "Valley of Snakes", "Claw Viper Temple"),
+    ),
+    ("ancient_tunnels", 2, "Ancient Tunnels", ("Ancient Tunnels",)),
+    ("arcane_sanctuary", 2, "Arcane Sanctuary", ("Arcane Sanctuary",)),
+    (
+        "tal_rashas_tombs",
+        2,
+        "Tal Rasha's Tombs and Tal Rasha's Chamber",
+        ("Tal Rasha's Tombs", "Tal Rasha's Chamber"),
+    ),
+    (
+        "spider_forest",
+        3,
+        "Spider Forest and Spider Cavern",
+        ("Spider Forest", "Spider Cavern"),
+    ),
+    ("great_marsh", 3, "Great Marsh", ("Great Marsh",)),
+    (
+        "flayer_jungle",
+        3,
+        "Flayer Jungle and Flayer Dungeon",
+        ("Flayer Jungle", "Flayer Dungeon"),
+    ),
+    (
+        "kurast_bazaar",
+        3,
+        "Kurast Bazaar, Ruined Temple, and Disused Fane",
+        ("Kurast Bazaar", "Ruined Temple", "Disused Fane"),
+    ),
+    ("travincal", 3, "Travincal", ("Travincal",)),
+    ("durance_of_hate", 3, "Durance of Hate", ("Durance of Hate",)),
+    (
+        "outer_steppes",
+        4,
+        "Outer Steppes and Plains of Despair",
+        ("Outer Steppes", "Plains of Despair"),
+    ),
+    (
+        "city_of_the_damned",
+        4,
+        "City of the Damned and River of Flame",
+        ("City of the Damned", "River of Flame"),
+    ),
+    ("chaos_sanctuary", 4, "Chaos Sanctuary", ("Chaos Sanctuary",)),
+    (
+        "bloody_foothills",
+        5,
+        "Bloody Foothills, Frigid Highlands and Abaddon",
+        ("Bloody Foothills", "Frigid Highlands", "Abaddon"),
+    ),
+    (
+        "arreat_plateau",
+        5,
+        "Arreat Plateau and Pit of Acheron",
+        ("Arreat Plateau", "Pit of Acheron"),
+    ),
+    (
+        "crystalline_passage",
+        5,
+        "Crystalline Passage and Frozen River",
+        ("Crystalline Passage", "Frozen River"),
+    ),
+    (
+        "glacial_trail",
+        5,
+        "Glacial Trail and Drifter Cavern",
+        ("Glacial Trail", "Drifter Cavern"),
+    ),
+    (
+        "frozen_tundra",
+        5,
+        "Frozen Tundra and Infernal Pit",
+        ("Frozen Tundra", "Infernal Pit"),
+    ),
+    (
+        "ancients_way",
+        5,
+        "Ancient's Way and Icy Cellar",
+        ("Ancient's Way", "Icy Cellar"),
+    ),
+    (
+        "nihlathaks_temple",
+        5,
+        "Nihlathak's Temple and Halls",
+        ("Nihlathak's Temple", "Halls of Anguish", "Halls of Pain", "Halls of Vaught"),
+    ),
+    (
+        "worldstone_keep",
+        5,
+        "The Worldstone Keep, Throne of Destruction, and Worldstone Chamber",
+        ("The Worldstone Keep", "Throne of Destruction", "Worldstone Chamber"),
+    ),
+)
+
+CATALOG: dict[str, TerrorZone] = {
+    zone_id: TerrorZone(
+        zone_id,
+        act,
+        sys.intern(name),
+        tuple(sys.intern(level) for level in levels),
+    )
+    for zone_id, act, name, levels in _ZONES
+}
+
+_FILLER_WORDS = frozenset({"and", "the", "of"})
+
+
+def zone_key(name: str) -> str:
+    """Spelling-insensitive key, e.g. "Tal Rasha's Tombs" -> "tal rashas tombs"."""
+    words = re.sub(r"[^a-z0-9 ]", "", name.lower().replace(",", " ")).split()
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+# Upstream names vary between trackers and patches: match on the full name and
+# on each level, so e.g. "The Pit" and "River of Flame" resolve too.
+_INDEX: dict[str, TerrorZone] = {}
+for _zone in CATALOG.values():
+    for _name in (_zone.name, *_zone.levels):
+        _INDEX.setdefault(zone_key(_name), _zone)
+
+_BY_NAME: dict[str, TerrorZone] = {zone.name: zone for zone in CATALOG.values()}
+
+# Zones not in the catalog, by raw name, so they are interned as well. Bounded,
+# in case upstream sends garbage.
+_unknown: dict[str, TerrorZone] = {}
+_unknown_lock = threading.Lock()
+MAX_UNKNOWN_ZONES = 64
+
+
+def lookup_zone(name: str) -> TerrorZone:
+    """Resolve an upstream zone name to its catalog entry.
+
+    Unknown names get an entry of their own, created once, with no act.
+    """
+    zone = _BY_NAME.get(name) or _INDEX.get(zone_key(name))
+    if zone is not None:
+        return zone
+    with _unknown_lock:
+        zone = _unknown.get(name)
+        if zone is None:
+            zone = TerrorZone(
+                zone_key(name).replace(" ", "_"), None, sys.intern(name), ()
+            )
+            if len(_unknown) < MAX_UNKNOWN_ZONES:
+                _unknown[name] = zone
+        return zone
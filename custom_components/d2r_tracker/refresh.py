@@ -0,0 +1,65 @@
+"""The refresh loop, shared by the coordinator and the simulation."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    ProviderResponse,
+)
+
+from .values import ValuePlan
+
+
+def carry_over(previous: ProviderResponse, plan: ValuePlan) -> ProviderResponse:
+    """The previous response, without the parts `plan` no longer fetches."""
+    keep_dclone = DATA_DCLONE_PROGRESS in plan.data_types
+    return ProviderResponse(
+        terror_zone=(
+            previous.terror_zone if DATA_TERROR_ZONE in plan.data_types else None
+        ),
+        dclone_progress=previous.dclone_progress if keep_dclone else None,
+        dclone_values=previous.dclone_values if keep_dclone else None,
+        status={
+            data_type: status
+            for data_type, status in previous.status.items()
+            if data_type in plan.data_types
+        },
+    )
+
+
+async def async_refresh(
+    previous: ProviderResponse,
+    plan: ValuePlan,
+    fetch_part: Callable[[str], Awaitable[ProviderResponse]],
+    publish: Callable[[ProviderResponse, ProviderResponse, int], None],
+) -> ProviderResponse:
+    """Fetch each data type of `plan` on its own, returning the merged response.
+
+    Each part is merged into the previous response as soon as it arrives, and
+    passed to `publish` with the merged response and how many parts are still
+    in flight, so a slow or failing endpoint holds up nothing else. Parts
+    still in flight, or failing, keep their previous values meanwhile.
+    """
+    response = carry_over(previous, plan)
+    fetches = [
+        asyncio.create_task(fetch_part(data_type))
+        for data_type in sorted(plan.data_types)
+    ]
+    remaining = len(fetches)
+    try:
+        for fetch in asyncio.as_completed(fetches):
+            part = await fetch
+            remaining -= 1
+            response = response.merge(part)
+            publish(part, response, remaining)
+    finally:
+        # If a part raised, rather than failing on its own, the refresh fails
+        # and the other parts are abandoned.
+        for fetch in fetches:
+            fetch.cancel()
+        await asyncio.gather(*fetches, return_exceptions=True)
+    return response
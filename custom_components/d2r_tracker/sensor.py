@@ -2,26 +2,64 @@
 
 from __future__ import annotations
 
-import itertools
 import logging
 
+from typing import Any
+
 from homeassistant.components.sensor import SensorEntity, const as sensor_const
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from custom_components.d2r_tracker.providers import (
-    HC,
-    LADDER,
-    REGIONS,
-)
+from custom_components.d2r_tracker.providers import DATA_TERROR_ZONE
+from custom_components.d2r_tracker.providers.zones import TerrorZone
 
 from . import D2RDataUpdateCoordinator
-from .const import CONF_ORIGIN, DOMAIN, ORIGIN_D2RUNEWIZARD
+from .const import ATTR_ZONE_ID, DOMAIN
+from .values import (
+    DCLONE_ETA,
+    DCLONE_LAST_CHANGE,
+    DCLONE_STEP_RATE,
+    VALUE_NEXT_TERROR_ZONE,
+    VALUE_NEXT_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE,
+    VALUE_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE_TIMELINE,
+    VALUE_TERROR_ZONE_UPDATED_AT,
+    TERROR_ZONE_CONTEXT,
+    dclone_context,
+    dclone_value_key,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+ATTR_TIMELINE = "timeline"
+# Why the data shown is the last good one, while upstream sends invalid data.
+ATTR_HELD = "held"
+ATTR_ACT = "act"
+ATTR_LEVELS = "levels"
+ATTR_LAST_CHANGE = "last_change"
+ATTR_STEP_RATE = "step_rate"
+ATTR_ETA = "eta"
+
+# DClone tracker attribute -> suffix of the value it shows.
+DCLONE_HISTORY_ATTRIBUTES = {
+    ATTR_LAST_CHANGE: DCLONE_LAST_CHANGE,
+    ATTR_STEP_RATE: DCLONE_STEP_RATE,
+    ATTR_ETA: DCLONE_ETA,
+}
+
+
+# Derived from the zone, hence from the state: recording them adds nothing.
+ZONE_ATTRIBUTES = frozenset({ATTR_ZONE_ID, ATTR_ACT, ATTR_LEVELS})
+
+
+def _zone_attributes(zone: TerrorZone | None) -> dict[str, Any]:
+    if zone is None:
+        return {}
+    return {ATTR_ZONE_ID: zone.id, ATTR_ACT: zone.act, ATTR_LEVELS: zone.levels}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -34,16 +72,16 @@ async def async_setup_entry(
         "coordinator"
     ]
 
-    origin = config_entry.data[CONF_ORIGIN]
-
     assert device_id is not None
 
+    capabilities = coordinator.cached_provider.CAPABILITIES
+
     entities: list[SensorEntity] = [
         D2RDiabloCloneTracker(coordinator, device_id, region, ladder, hardcore)
-        for (region, ladder, hardcore) in itertools.product(REGIONS, LADDER, HC)
+        for (region, ladder, hardcore) in capabilities.dclone_keys()
     ]
 
-    if origin == ORIGIN_D2RUNEWIZARD:
+    if capabilities.supports(DATA_TERROR_ZONE):
         entities.extend(
             [
                 D2RTerrorZoneTracker(coordinator, device_id),
@@ -56,17 +94,31 @@ async def async_setup_entry(
 
 
 class D2RSensorBase(CoordinatorEntity[D2RDataUpdateCoordinator], SensorEntity):
-    """Base D2R Sensor class."""
+    """Base D2R Sensor class.
+
+    The sensor type doubles as the key of this sensor's slot in the
+    coordinator's value map. The context tells the coordinator which data the
+    sensor consumes, so that data is only fetched while the sensor is enabled.
+    """
 
     def __init__(
         self,
         coordinator: D2RDataUpdateCoordinator,
         sensor_type: str,
         device_id: str,
+        context: Any = None,
     ) -> None:
         """Initialize a new D2R sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context)
         self._device_id = device_id
+        self._value_key = sensor_type
+        # Value keys this sensor's state and attributes are built from.
+        self._value_keys: tuple[str, ...] = (sensor_type,)
+        self._written_available: bool | None = None
+        self._written_held: str | None = None
+        # The data type this sensor shows, so it goes unavailable on its own
+        # when only that data type fails to fetch.
+        self._data_type: str | None = context[0] if isinstance(context, tuple) else None
         self._attr_name = f"{sensor_type}"
         self._attr_unique_id = f"{sensor_type}-{device_id}"
 
@@ -78,15 +130,62 @@ class D2RSensorBase(CoordinatorEntity[D2RDataUpdateCoordinator], SensorEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return (
-            self.coordinator.last_update_success and self.coordinator.data is not None
-        )
+        data = self.coordinator.data
+        if not self.coordinator.last_update_success or data is None:
+            return False
+        return self._data_type is None or data.part_ok(self._data_type)
+
+    @property
+    def extra_state_attributes(self):
+        """Return why the data is held, while it is."""
+        return self._held_attributes() or None
+
+    def _held(self) -> str | None:
+        data = self.coordinator.data
+        if self._data_type is None or data is None:
+            return None
+        status = data.status.get(self._data_type)
+        return None if status is None else status.held
+
+    def _held_attributes(self) -> dict[str, Any]:
+        held = self._held()
+        return {} if held is None else {ATTR_HELD: held}
+
+    @property
+    def native_value(self):
+        """Return sensor state."""
+        return self.coordinator.values.get(self._value_key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the refresh changed this sensor's values."""
+        available = self.available
+        held = self._held()
+        if (
+            available == self._written_available
+            and held == self._written_held
+            and not self.coordinator.changes.touches(self._value_keys)
+        ):
+            return
+        self._written_available = available
+        self._written_held = held
+        super()._handle_coordinator_update()
 
 
 class D2RDiabloCloneTracker(D2RSensorBase):
-    """D2R Diablo Clone Tracker for one region/ladder/hardcore config."""
+    """D2R Diablo Clone Tracker for one region/ladder/hardcore config.
+
+    Trends from the recent progress history are attributes: when the progress
+    last changed, the average steps per hour, and when DClone is expected to
+    walk at that rate.
+    """
 
     _attr_icon = "mdi:poll"
+    # A level from 1 to 6, without a unit; long-term statistics keep its
+    # hourly min/mean/max once short-term history is purged.
+    _attr_state_class = sensor_const.SensorStateClass.MEASUREMENT
+    # Derived from the recorded states.
+    _unrecorded_attributes = frozenset(DCLONE_HISTORY_ATTRIBUTES)
 
     def __init__(
         self,
@@ -99,67 +198,80 @@ class D2RDiabloCloneTracker(D2RSensorBase):
         """Initialize a new D2RDiabloCloneTracker sensor."""
         super().__init__(
             coordinator,
-            f"DClone {region} {ladder} {hardcore}",
+            dclone_value_key((region, ladder, hardcore)),
             device_id,
+            dclone_context((region, ladder, hardcore)),
         )
         self.region = region
         self.ladder = ladder
         self.hardcore = hardcore
+        key = (region, ladder, hardcore)
+        self._history_value_keys = {
+            attribute: dclone_value_key(key, suffix)
+            for attribute, suffix in DCLONE_HISTORY_ATTRIBUTES.items()
+        }
+        self._value_keys = (
+            dclone_value_key(key),
+            *self._history_value_keys.values(),
+        )
 
     @property
-    def native_value(self):
-        """Return sensor state."""
-        dclone_progress = self.coordinator.data.dclone_progress
-        if dclone_progress is None:
-            return None
-
-        try:
-            progress = getattr(
-                getattr(getattr(dclone_progress, self.region), self.ladder),
-                self.hardcore,
-            )
-            return progress
-        # Possibly provider does not have data for this region/ladder/hardcore combo.
-        except AttributeError:
-            _LOGGER.debug(
-                "AttributeError in %s: region: %s, ladder: %s, hardcore: %s",
-                dclone_progress,
-                self.region,
-                self.ladder,
-                self.hardcore,
-            )
+    def extra_state_attributes(self):
+        """Return the trends of the progress history."""
+        values = self.coordinator.values
+        return {
+            **{
+                attribute: values.get(value_key)
+                for attribute, value_key in self._history_value_keys.items()
+            },
+            **self._held_attributes(),
+        }
 
 
 class D2RTerrorZoneTracker(D2RSensorBase):
     """D2R Terror Zone tracker."""
 
     _attr_icon = "mdi:map"
+    # Names the zone_id attribute's states, i.e. localized zone names.
+    _attr_translation_key = "terror_zone"
+    # Rewritten on every rotation; the calendar entity keeps the full history.
+    _unrecorded_attributes = ZONE_ATTRIBUTES | {ATTR_TIMELINE}
 
     def __init__(
         self,
         coordinator: D2RDataUpdateCoordinator,
         device_id: str,
     ) -> None:
-        """Initialize a new D2RDiabloCloneTracker sensor."""
+        """Initialize a new D2RTerrorZoneTracker sensor."""
         super().__init__(
             coordinator,
-            "Terror Zone",
+            VALUE_TERROR_ZONE,
             device_id,
+            TERROR_ZONE_CONTEXT,
+        )
+        self._value_keys = (
+            VALUE_TERROR_ZONE,
+            VALUE_TERROR_ZONE_INFO,
+            VALUE_TERROR_ZONE_TIMELINE,
         )
 
     @property
-    def native_value(self):
-        """Return sensor state."""
-        terror_zone = self.coordinator.data.terror_zone
-        if terror_zone is None:
-            return None
-        return terror_zone.current
+    def extra_state_attributes(self):
+        """Return the zone's catalog entry and the most recent rotations."""
+        values = self.coordinator.values
+        return {
+            **_zone_attributes(values.get(VALUE_TERROR_ZONE_INFO)),
+            ATTR_TIMELINE: values.get(VALUE_TERROR_ZONE_TIMELINE),
+            **self._held_attributes(),
+        }
 
 
 class D2RNextTerrorZoneTracker(D2RSensorBase):
     """D2R Terror Zone tracker."""
 
     _attr_icon = "mdi:map"
+    _attr_translation_key = "next_terror_zone"
+    _unrecorded_attributes = ZONE_ATTRIBUTES
 
     def __init__(
         self,
@@ -169,17 +281,21 @@ class D2RNextTerrorZoneTracker(D2RSensorBase):
         """Initialize a new D2RNextTerrorZoneTracker sensor."""
         super().__init__(
             coordinator,
-            "Next Terror Zone",
+            VALUE_NEXT_TERROR_ZONE,
             device_id,
+            TERROR_ZONE_CONTEXT,
         )
+        self._value_keys = (VALUE_NEXT_TERROR_ZONE, VALUE_NEXT_TERROR_ZONE_INFO)
 
     @property
-    def native_value(self):
-        """Return sensor state."""
-        terror_zone = self.coordinator.data.terror_zone
-        if terror_zone is None:
-            return None
-        return terror_zone.next
+    def extra_state_attributes(self):
+        """Return the zone's catalog entry."""
+        return {
+            **_zone_attributes(
+                self.coordinator.values.get(VALUE_NEXT_TERROR_ZONE_INFO)
+            ),
+            **self._held_attributes(),
+        }
 
 
 class D2RTerrorZoneLastUpdatedSensor(D2RSensorBase):
@@ -193,17 +309,10 @@ class D2RTerrorZoneLastUpdatedSensor(D2RSensorBase):
         coordinator: D2RDataUpdateCoordinator,
         device_id: str,
     ) -> None:
-        """Initialize a new D2RDiabloCloneTracker sensor."""
+        """Initialize a new D2RTerrorZoneLastUpdatedSensor sensor."""
         super().__init__(
             coordinator,
-            "Terror Zone Last Updated",
+            VALUE_TERROR_ZONE_UPDATED_AT,
             device_id,
+            TERROR_ZONE_CONTEXT,
         )
-
-    @property
-    def native_value(self):
-        """Return sensor state."""
-        terror_zone = self.coordinator.data.terror_zone
-        if terror_zone is None:
-            return None
-        return terror_zone.updated_at
@@ -0,0 +1,488 @@
+"""Time-compressed simulation and replay of the coordinator's refreshes."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import json
+import math
+import os
+import random
+import sqlite3
+from typing import Any
+import zlib
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+    ProviderBase,
+    ProviderCapabilities,
+    ProviderResponse,
+    TerrorZoneResponse,
+)
+from custom_components.d2r_tracker.providers.cached import CachedProvider
+from custom_components.d2r_tracker.providers.history import DCloneHistory
+from custom_components.d2r_tracker.providers.recording import read_recording
+from custom_components.d2r_tracker.providers.replay import (
+    Distribution,
+    ReplayClock,
+    ReplayProvider,
+    recorded_parser,
+)
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    ROTATION_MINUTES,
+    TerrorZoneTimeline,
+)
+
+from .refresh import async_refresh
+from .values import (
+    DCLONE_ETA,
+    DCLONE_LAST_CHANGE,
+    DCLONE_STEP_RATE,
+    VALUE_NEXT_TERROR_ZONE,
+    VALUE_NEXT_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE,
+    VALUE_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE_TIMELINE,
+    EMPTY_SNAPSHOT,
+    ChangeSet,
+    ValuePlan,
+    dclone_value_key,
+    publish_part,
+)
+
+SIMULATION_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+SYNTHETIC_ZONES = (
+    "Blood Moor and Den of Evil",
+    "Tristram",
+    "The Pit",
+    "Lut Gholein Sewers",
+    "Arcane Sanctuary",
+    "Travincal",
+    "Durance of Hate",
+    "River of Flame",
+    "Chaos Sanctuary",
+    "The Worldstone Keep",
+)
+
+# The DClone combo whose staleness is sampled; all combos step together.
+SAMPLED_DCLONE_KEY = ("Americas", "L", "SC")
+
+# Values sensors show as attributes, by the value shown as their state.
+ATTRIBUTE_VALUES = {
+    VALUE_TERROR_ZONE_INFO: VALUE_TERROR_ZONE,
+    VALUE_TERROR_ZONE_TIMELINE: VALUE_TERROR_ZONE,
+    VALUE_NEXT_TERROR_ZONE_INFO: VALUE_NEXT_TERROR_ZONE,
+    **{
+        dclone_value_key(SAMPLED_DCLONE_KEY, suffix): dclone_value_key(
+            SAMPLED_DCLONE_KEY
+        )
+        for suffix in (DCLONE_LAST_CHANGE, DCLONE_STEP_RATE, DCLONE_ETA)
+    },
+}
+
+# The recorder's tables for states, with the columns and indexes it still uses.
+_RECORDER_SCHEMA = (
+    "CREATE TABLE state_attributes ("
+    " attributes_id INTEGER PRIMARY KEY, hash INTEGER, shared_attrs TEXT)",
+    "CREATE INDEX ix_state_attributes_hash ON state_attributes (hash)",
+    "CREATE TABLE states ("
+    " state_id INTEGER PRIMARY KEY, state VARCHAR(255), last_changed_ts FLOAT,"
+    " last_reported_ts FLOAT, last_updated_ts FLOAT, old_state_id INTEGER,"
+    " attributes_id INTEGER, origin_idx SMALLINT, context_id_bin BLOB,"
+    " context_user_id_bin BLOB, context_parent_id_bin BLOB, metadata_id INTEGER)",
+    "CREATE INDEX ix_states_metadata_id_last_updated_ts"
+    " ON states (metadata_id, last_updated_ts)",
+    "CREATE INDEX ix_states_context_id_bin ON states (context_id_bin)",
+    "CREATE INDEX ix_states_last_updated_ts ON states (last_updated_ts)",
+    "CREATE INDEX ix_states_old_state_id ON states (old_state_id)",
+    "CREATE INDEX ix_states_attributes_id ON states (attributes_id)",
+)
+
+
+class RecorderModel:
+    """The recorder's state tables, in an in-memory SQLite database.
+
+    Written to as the recorder would be by the sensors showing the published
+    values: a row per state change, and a row per distinct set of recorded
+    attributes, so that the database growth of a policy can be measured.
+    """
+
+    def __init__(self) -> None:
+        self._db = sqlite3.connect(":memory:")
+        for statement in _RECORDER_SCHEMA:
+            self._db.execute(statement)
+        self._empty_bytes = self._size()
+        # Entity -> metadata ID, and ID of its last state row.
+        self._metadata_ids: dict[str, int] = {}
+        self._last_state_ids: dict[str, int] = {}
+        # Shared attributes -> ID.
+        self._attributes_ids: dict[str, int] = {}
+        self.rows = 0
+
+    def _size(self) -> int:
+        (page_count,) = self._db.execute("PRAGMA page_count").fetchone()
+        (page_size,) = self._db.execute("PRAGMA page_size").fetchone()
+        return page_count * page_size
+
+    @property
+    def growth_bytes(self) -> int:
+        return self._size() - self._empty_bytes
+
+    def record(self, entity: str, state: Any, now: datetime) -> None:
+        """Write a state of the sensor showing the value `entity`."""
+        # The attributes that vary are excluded from the recorder, so what is
+        # left is the same for every state of a sensor.
+        shared_attrs = json.dumps({"friendly_name": entity}, separators=(",", ":"))
+        attributes_id = self._attributes_ids.get(shared_attrs)
+        if attributes_id is None:
+            attributes_id = self._db.execute(
+                "INSERT INTO state_attributes (hash, shared_attrs) VALUES (?, ?)",
+                (zlib.crc32(shared_attrs.encode()), shared_attrs),
+            ).lastrowid
+            self._attributes_ids[shared_attrs] = attributes_id
+            self.rows += 1
+        if state is None:
+            state = "unknown"
+        elif isinstance(state, datetime):
+            state = state.isoformat()
+        timestamp = now.timestamp()
+        metadata_id = self._metadata_ids.setdefault(entity, len(self._metadata_ids))
+        self._last_state_ids[entity] = self._db.execute(
+            "INSERT INTO states (state, last_changed_ts, last_updated_ts,"
+            " old_state_id, attributes_id, origin_idx, context_id_bin, metadata_id)"
+            " VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+            (
+                str(state)[:255],
+                timestamp,
+                timestamp,
+                self._last_state_ids.get(entity),
+                attributes_id,
+                # As long as a ULID: a millisecond timestamp and 80 bits, here
+                # a counter rather than random, so runs are reproducible.
+                int(timestamp * 1000).to_bytes(6, "big")
+                + self.rows.to_bytes(10, "big"),
+                metadata_id,
+            ),
+        ).lastrowid
+        self.rows += 1
+
+
+class SyntheticUpstream(ProviderBase):
+    """A deterministic upstream, driven by the simulation clock.
+
+    Terror zones rotate every `rotation_minutes`, but upstream only reports a new
+    zone after a random lag within `report_lag_minutes`, as community trackers
+    wait for player reports. DClone progress steps every `dclone_step_hours`.
+    """
+
+    NAME = "synthetic"
+    CAPABILITIES = ProviderCapabilities(regions=("Americas", "Europe", "Asia"))
+
+    def __init__(
+        self,
+        clock: Callable[[], datetime],
+        report_lag_minutes: tuple[float, float] = (0, 4),
+        dclone_step_hours: float = 3,
+        seed: int = 0,
+        rotation_minutes: int = ROTATION_MINUTES,
+    ) -> None:
+        self.clock = clock
+        self.rotation_minutes = rotation_minutes
+        self.report_lag_minutes = report_lag_minutes
+        self.dclone_step_hours = dclone_step_hours
+        self.seed = seed
+        self.requests: dict[str, int] = defaultdict(int)
+
+    def rotation(self, now: datetime) -> int:
+        return math.floor(now.timestamp() / (self.rotation_minutes * 60))
+
+    def rotation_start(self, rotation: int) -> datetime:
+        return datetime.fromtimestamp(
+            rotation * self.rotation_minutes * 60, timezone.utc
+        )
+
+    def zone(self, rotation: int) -> str:
+        return random.Random(self.seed * 1_000_003 + rotation).choice(SYNTHETIC_ZONES)
+
+    def report_lag(self, rotation: int) -> timedelta:
+        rng = random.Random(self.seed * 1_000_003 + rotation + 1_000_000_007)
+        return timedelta(minutes=rng.uniform(*self.report_lag_minutes))
+
+    def reported(self, now: datetime) -> tuple[str, datetime]:
+        """The zone upstream reports at `now`, and since when it does."""
+        rotation = self.rotation(now)
+        reported_at = self.rotation_start(rotation) + self.report_lag(rotation)
+        if now < reported_at:
+            rotation -= 1
+            reported_at = self.rotation_start(rotation) + self.report_lag(rotation)
+        return self.zone(rotation), reported_at
+
+    def dclone_progress_at(self, now: datetime) -> tuple[Progress, datetime]:
+        """DClone progress at `now`, and since when it holds."""
+        step = timedelta(hours=self.dclone_step_hours)
+        steps = math.floor((now - SIMULATION_START) / step)
+        return Progress(1 + steps % 6), SIMULATION_START + steps * step
+
+    def get_terror_zone(self) -> TerrorZoneResponse:
+        self.requests[DATA_TERROR_ZONE] += 1
+        now = self.clock()
+        zone, _ = self.reported(now)
+        next_zone = self.zone(self.rotation(now) + 1)
+        return TerrorZoneResponse(current=zone, next=next_zone, updated_at=now)
+
+    def get_dclone_progress(self) -> DCloneProgress:
+        self.requests[DATA_DCLONE_PROGRESS] += 1
+        progress, _ = self.dclone_progress_at(self.clock())
+
+        def ladder() -> DCloneLadderProgress:
+            return DCloneLadderProgress(
+                L=DCloneCoreProgress(HC=progress, SC=progress),
+                NL=DCloneCoreProgress(HC=progress, SC=progress),
+            )
+
+        return DCloneProgress(
+            Americas=ladder(), Europe=ladder(), Asia=ladder(), China=None
+        )
+
+    def get_attribution(self) -> str:
+        return "Synthetic data"
+
+
+class Refresher:
+    """Refreshes as the coordinator does, from a CachedProvider on a replay clock.
+
+    Each part is published on its own, through the coordinator's refresh, and
+    `on_changes` is called with each non-empty change set. As in the
+    coordinator, rotations are as long as the terror zone fetch interval.
+    """
+
+    def __init__(
+        self,
+        cached: CachedProvider,
+        plan: ValuePlan,
+        on_changes: Callable[[ChangeSet], None] | None = None,
+    ) -> None:
+        self.cached = cached
+        self.plan = plan
+        self.on_changes = on_changes
+        self.history = DCloneHistory()
+        self.timeline = TerrorZoneTimeline(
+            rotation_minutes=cached.terror_zone_interval_minutes
+        )
+        self.snapshot = EMPTY_SNAPSHOT
+        self.response = ProviderResponse(terror_zone=None, dclone_progress=None)
+        self.refreshes = 0
+        # Refreshes after which the coordinator schedules a write of its state.
+        self.state_writes = 0
+
+    async def _fetch_part(self, data_type: str) -> ProviderResponse:
+        return self.cached.collate_responses([data_type], self.plan.dclone_keys)
+
+    async def async_refresh(self, now: datetime) -> None:
+        changed = False
+
+        def publish(
+            part: ProviderResponse, response: ProviderResponse, remaining: int
+        ) -> None:
+            nonlocal changed
+            self.snapshot, changes, part_changed = publish_part(
+                part,
+                response,
+                self.plan,
+                self.history,
+                self.timeline,
+                self.snapshot,
+                now.timestamp(),
+            )
+            changed |= part_changed
+            if changes and self.on_changes is not None:
+                self.on_changes(changes)
+
+        self.response = await async_refresh(
+            self.response, self.plan, self._fetch_part, publish
+        )
+        self.refreshes += 1
+        self.state_writes += changed
+
+
+@dataclass(frozen=True)
+class SimulationReport:
+    simulated: timedelta
+    refreshes: int
+    # Per data type.
+    upstream_requests: dict[str, int]
+    cache_hits: dict[str, int]
+    # Refreshes after which the coordinator schedules a write of its state.
+    state_writes: int
+    # Per published value, how often it changed.
+    value_changes: dict[str, int]
+    # Rows the recorder writes for the sensors showing the values, and how
+    # much they grow its database, per RecorderModel.
+    recorder_rows: int
+    recorder_bytes: int
+    # Sampled at every refresh: how long upstream had been reporting something
+    # the published value did not show yet. 0 when up to date.
+    terror_zone_staleness: Distribution
+    dclone_staleness: Distribution
+    # From each rotation to the first refresh publishing its zone.
+    rotation_latency: Distribution
+    # Rotations whose zone was never published before the next rotation.
+    missed_rotations: int
+
+
+def simulate(
+    duration: timedelta = timedelta(days=1),
+    update_interval: timedelta = timedelta(seconds=60),
+    start: datetime = SIMULATION_START,
+    seed: int = 0,
+    rotation_minutes: int = ROTATION_MINUTES,
+    upstream_options: dict[str, Any] | None = None,
+    **cached_options: Any,
+) -> SimulationReport:
+    """Run the coordinator's refresh loop over a SyntheticUpstream.
+
+    `cached_options` are passed to CachedProvider, e.g. `dclone_ttl` or
+    `terror_zone_burst_minutes`, to evaluate scheduling policies. Upstream
+    rotates every `rotation_minutes`, which is also the fetch interval unless
+    `terror_zone_interval_minutes` says otherwise.
+    """
+    clock = ReplayClock(start)
+    upstream = SyntheticUpstream(
+        clock, seed=seed, rotation_minutes=rotation_minutes, **(upstream_options or {})
+    )
+    cached_options.setdefault("terror_zone_interval_minutes", rotation_minutes)
+    cached = CachedProvider(upstream, clock=clock, **cached_options)
+    # As if only the sampled DClone sensor were enabled.
+    plan = ValuePlan(cached.CAPABILITIES.data_types, (SAMPLED_DCLONE_KEY,))
+
+    value_changes: dict[str, int] = defaultdict(int)
+    recorder = RecorderModel()
+    zone_staleness: list[float] = []
+    dclone_staleness: list[float] = []
+    # Rotation -> seconds until its zone was first published.
+    latencies: dict[int, float] = {}
+    rotations: set[int] = set()
+    dclone_key = dclone_value_key(SAMPLED_DCLONE_KEY)
+
+    def record_changes(changes: ChangeSet) -> None:
+        values = refresher.snapshot.values
+        for key in changes.changes:
+            value_changes[key] += 1
+        for entity in sorted(
+            {ATTRIBUTE_VALUES.get(key, key) for key in changes.changes}
+        ):
+            recorder.record(entity, values.get(entity), clock())
+
+    refresher = Refresher(cached, plan, on_changes=record_changes)
+
+    def sample(now: datetime) -> None:
+        """How stale the published values are at `now`."""
+        values = refresher.snapshot.values
+        reported_zone, reported_since = upstream.reported(now)
+        shown = values.get(VALUE_TERROR_ZONE)
+        zone_staleness.append(
+            0.0 if shown == reported_zone else (now - reported_since).total_seconds()
+        )
+        rotation = upstream.rotation(now)
+        rotations.add(rotation)
+        if rotation not in latencies and shown == upstream.zone(rotation):
+            latencies[rotation] = (
+                now - upstream.rotation_start(rotation)
+            ).total_seconds()
+
+        progress, progress_since = upstream.dclone_progress_at(now)
+        dclone_staleness.append(
+            0.0
+            if values.get(dclone_key) == progress
+            else (now - progress_since).total_seconds()
+        )
+
+    async def run() -> None:
+        end = start + duration
+        while clock() < end:
+            await refresher.async_refresh(clock())
+            sample(clock())
+            clock.advance(update_interval)
+
+    asyncio.run(run())
+
+    return SimulationReport(
+        simulated=duration,
+        refreshes=refresher.refreshes,
+        upstream_requests=dict(upstream.requests),
+        cache_hits=dict(cached.hits),
+        state_writes=refresher.state_writes,
+        value_changes=dict(value_changes),
+        recorder_rows=recorder.rows,
+        recorder_bytes=recorder.growth_bytes,
+        terror_zone_staleness=Distribution.of(zone_staleness),
+        dclone_staleness=Distribution.of(dclone_staleness),
+        rotation_latency=Distribution.of(list(latencies.values())),
+        missed_rotations=len(rotations - latencies.keys()),
+    )
+
+
+@dataclass(frozen=True)
+class ReplayReport:
+    refreshes: int
+    # Per data type.
+    upstream_requests: dict[str, int]
+    cache_hits: dict[str, int]
+    # Refreshes that changed the DClone history or terror zone timeline, each
+    # of which schedules a write of the persisted state.
+    state_writes: int
+
+    def hit_rate(self, data_type: str) -> float:
+        total = self.cache_hits.get(data_type, 0) + self.upstream_requests.get(
+            data_type, 0
+        )
+        return self.cache_hits.get(data_type, 0) / total if total else 0.0
+
+
+def replay(
+    path: str | os.PathLike,
+    update_interval: timedelta = timedelta(seconds=60),
+    speed: float | None = None,
+    rotation_minutes: int = ROTATION_MINUTES,
+) -> ReplayReport:
+    """Replay a recording through CachedProvider, refreshing like the coordinator.
+
+    Runs as fast as possible, or with a `speed`, paced as ReplayClock does.
+    `rotation_minutes` is the terror zone rotation the recording was made with.
+    """
+    recording = [r for r in read_recording(path) if recorded_parser(r.url) is not None]
+    if not recording:
+        return ReplayReport(0, {}, {}, 0)
+    start = min(r.timestamp for r in recording)
+    end = max(r.timestamp for r in recording)
+    clock = ReplayClock(datetime.fromtimestamp(start, timezone.utc), speed)
+    provider = ReplayProvider(recording, clock)
+    cached = CachedProvider(
+        provider, clock=clock, terror_zone_interval_minutes=rotation_minutes
+    )
+    plan = ValuePlan.everything(cached.CAPABILITIES)
+    if provider.subscribed_keys is not None:
+        plan = ValuePlan(plan.data_types, provider.subscribed_keys)
+    refresher = Refresher(cached, plan)
+
+    async def run() -> None:
+        while clock().timestamp() <= end:
+            await refresher.async_refresh(clock())
+            clock.advance(update_interval)
+
+    asyncio.run(run())
+    return ReplayReport(
+        refreshes=refresher.refreshes,
+        upstream_requests=dict(provider.requests),
+        cache_hits=dict(cached.hits),
+        state_writes=refresher.state_writes,
+    )
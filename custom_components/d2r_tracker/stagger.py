@@ -0,0 +1,31 @@
+"""Deterministic per-entry refresh phases, to spread upstream requests."""
+
+from __future__ import annotations
+
+import hashlib
+
+# A slot closer than this is skipped: timers fire up to a second early, so it
+# is most likely the one just refreshed in.
+MIN_SLOT_DELAY_SECONDS = 5.0
+
+
+def refresh_phase(entry_id: str) -> float:
+    """Fraction of the update interval, in [0, 1), to offset an entry's refreshes.
+
+    Derived from the entry ID, so it is stable across restarts and spread
+    evenly across entries and Home Assistant instances.
+    """
+    digest = hashlib.sha256(entry_id.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def slot_delay(now: float, interval: float, phase: float) -> float:
+    """Seconds from the timestamp `now` to an entry's next refresh slot.
+
+    Slots are `phase` of an interval into each interval since the epoch, so
+    refreshes keep their offset however long each one takes.
+    """
+    delay = (phase * interval - now) % interval
+    if delay < min(MIN_SLOT_DELAY_SECONDS, interval / 2):
+        delay += interval
+    return delay
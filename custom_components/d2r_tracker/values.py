@@ -0,0 +1,236 @@
+"""Per-entity values published by the D2R coordinator."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Optional
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    DCloneKey,
+    ProviderCapabilities,
+    ProviderResponse,
+)
+from custom_components.d2r_tracker.providers.history import DCloneHistory
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneTimeline,
+)
+
+VALUE_TERROR_ZONE = "Terror Zone"
+VALUE_NEXT_TERROR_ZONE = "Next Terror Zone"
+VALUE_TERROR_ZONE_UPDATED_AT = "Terror Zone Last Updated"
+VALUE_TERROR_ZONE_TIMELINE = "Terror Zone Timeline"
+# The catalog entries of the current and next zones.
+VALUE_TERROR_ZONE_INFO = "Terror Zone Info"
+VALUE_NEXT_TERROR_ZONE_INFO = "Next Terror Zone Info"
+
+DCLONE_LAST_CHANGE = "Last Change"
+DCLONE_STEP_RATE = "Step Rate"
+DCLONE_ETA = "ETA"
+
+TIMELINE_LENGTH = 8
+
+# What an entity consumes: a data type and, for DClone progress, the
+# region/ladder/hardcore combo. Entities register it as their coordinator context.
+ValueContext = tuple[str, Optional[DCloneKey]]
+
+TERROR_ZONE_CONTEXT: ValueContext = (DATA_TERROR_ZONE, None)
+
+
+def dclone_context(key: DCloneKey) -> ValueContext:
+    return (DATA_DCLONE_PROGRESS, key)
+
+
+@dataclass(frozen=True)
+class ValuePlan:
+    """The data types to fetch and the DClone keys to materialize."""
+
+    data_types: frozenset[str]
+    dclone_keys: tuple[DCloneKey, ...]
+
+    @classmethod
+    def everything(cls, capabilities: ProviderCapabilities) -> ValuePlan:
+        return cls(capabilities.data_types, capabilities.dclone_keys())
+
+    def covers(self, context: Any) -> bool:
+        if not isinstance(context, tuple):
+            return True
+        data_type, key = context
+        if data_type not in self.data_types:
+            return False
+        return key is None or key in self.dclone_keys
+
+
+def plan_values(
+    contexts: Iterable[Any], capabilities: ProviderCapabilities
+) -> ValuePlan:
+    """Narrow the provider's capabilities to what subscribed entities consume.
+
+    Listeners without a ValueContext (e.g. a bare coordinator listener) want
+    everything, as do no listeners at all, e.g. on the first refresh.
+    """
+    data_types: set[str] = set()
+    keys: set[DCloneKey] = set()
+    seen = False
+    for context in contexts:
+        seen = True
+        if not isinstance(context, tuple):
+            return ValuePlan.everything(capabilities)
+        data_type, key = context
+        data_types.add(data_type)
+        if key is not None:
+            keys.add(key)
+    if not seen:
+        return ValuePlan.everything(capabilities)
+    return ValuePlan(
+        frozenset(data_types & capabilities.data_types),
+        # Keep the capabilities' order, so values are built deterministically.
+        tuple(key for key in capabilities.dclone_keys() if key in keys),
+    )
+
+
+def dclone_value_key(key: DCloneKey, suffix: str | None = None) -> str:
+    """Return the value key for a DClone region/ladder/hardcore combo."""
+    region, ladder, hardcore = key
+    name = f"DClone {region} {ladder} {hardcore}"
+    return f"{name} {suffix}" if suffix else name
+
+
+def build_values(
+    response: ProviderResponse,
+    dclone_keys: Iterable[DCloneKey],
+    history: DCloneHistory,
+    timeline: TerrorZoneTimeline,
+) -> Mapping[str, Any]:
+    """Flatten a provider response into an immutable value key -> value map.
+
+    Keys are only present for the requested DClone keys the provider actually
+    returned, e.g. there are no `China` keys for providers that do not report it.
+    """
+    values: dict[str, Any] = {}
+
+    for key, progress in response.dclone_progress_for(dclone_keys).items():
+        if progress is None:
+            continue
+        values[dclone_value_key(key)] = progress
+        if (stats := history.stats(key)) is not None:
+            values[dclone_value_key(key, DCLONE_LAST_CHANGE)] = stats.last_change
+            values[dclone_value_key(key, DCLONE_STEP_RATE)] = stats.step_rate
+            values[dclone_value_key(key, DCLONE_ETA)] = stats.eta
+
+    if (terror_zone := response.terror_zone) is not None:
+        values[VALUE_TERROR_ZONE] = terror_zone.current
+        values[VALUE_NEXT_TERROR_ZONE] = terror_zone.next
+        values[VALUE_TERROR_ZONE_INFO] = terror_zone.current_zone
+        values[VALUE_NEXT_TERROR_ZONE_INFO] = terror_zone.next_zone
+        values[VALUE_TERROR_ZONE_UPDATED_AT] = terror_zone.updated_at
+        values[VALUE_TERROR_ZONE_TIMELINE] = tuple(
+            {"start": rotation.start.isoformat(), "zone": rotation.zone}
+            for rotation in timeline.latest(TIMELINE_LENGTH)
+        )
+
+    return MappingProxyType(values)
+
+
+@dataclass(frozen=True)
+class ValueSnapshot:
+    """The published values, versioned. The version bumps on every change."""
+
+    version: int
+    values: Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    """What changed between two snapshots.
+
+    Maps each changed value key to its (old, new) value, None when absent.
+    """
+
+    version: int
+    changes: Mapping[str, tuple[Any, Any]]
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.changes
+
+    def touches(self, keys: Iterable[str]) -> bool:
+        changes = self.changes
+        return any(key in changes for key in keys)
+
+
+EMPTY_SNAPSHOT = ValueSnapshot(0, MappingProxyType({}))
+
+
+def diff_values(
+    old: Mapping[str, Any], new: Mapping[str, Any]
+) -> dict[str, tuple[Any, Any]]:
+    """Return key -> (old, new) for every key added, removed or changed."""
+    changes = {
+        key: (old.get(key), value)
+        for key, value in new.items()
+        if key not in old or old[key] != value
+    }
+    for key in old.keys() - new.keys():
+        changes[key] = (old[key], None)
+    return changes
+
+
+def next_snapshot(
+    snapshot: ValueSnapshot, values: Mapping[str, Any]
+) -> tuple[ValueSnapshot, ChangeSet]:
+    """Diff `values` against `snapshot`, returning the new snapshot and changes.
+
+    Unchanged values keep the previous snapshot and version.
+    """
+    changes = diff_values(snapshot.values, values)
+    if not changes:
+        return snapshot, ChangeSet(snapshot.version, MappingProxyType({}))
+    version = snapshot.version + 1
+    return ValueSnapshot(version, values), ChangeSet(version, MappingProxyType(changes))
+
+
+def observe_response(
+    response: ProviderResponse,
+    history: DCloneHistory,
+    timeline: TerrorZoneTimeline,
+    now: float,
+) -> bool:
+    """Record a response's parts in the history and timeline.
+
+    Returns whether either changed, i.e. whether the persisted state needs
+    writing.
+    """
+    changed = False
+    if response.dclone_progress is not None:
+        changed |= history.observe(response.dclone_progress, now)
+    elif response.dclone_values is not None:
+        changed |= history.observe_values(response.dclone_values, now)
+    if response.terror_zone is not None:
+        changed |= timeline.observe(response.terror_zone, now)
+    return changed
+
+
+def publish_part(
+    part: ProviderResponse,
+    response: ProviderResponse,
+    plan: ValuePlan,
+    history: DCloneHistory,
+    timeline: TerrorZoneTimeline,
+    snapshot: ValueSnapshot,
+    now: float,
+) -> tuple[ValueSnapshot, ChangeSet, bool]:
+    """Record a freshly fetched part and build the values of the merged `response`.
+
+    Returns the next snapshot, its changes, and whether the history or
+    timeline changed, i.e. whether the persisted state needs writing.
+    """
+    changed = observe_response(part, history, timeline, now)
+    values = build_values(response, plan.dclone_keys, history, timeline)
+    snapshot, changes = next_snapshot(snapshot, values)
+    return snapshot, changes, changed
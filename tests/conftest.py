@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timezone
+import threading
+from types import MappingProxyType
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.d2r_tracker import D2RDataUpdateCoordinator
+from custom_components.d2r_tracker.const import (
+    CONF_CONTACT_EMAIL,
+    CONF_ORIGIN,
+    DOMAIN,
+)
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+    ProviderBase,
+    TerrorZoneResponse,
+)
+from custom_components.d2r_tracker.providers import registry
+from custom_components.d2r_tracker.providers.registry import (
+    ProviderSpec,
+    register_provider,
+)
+
+FAKE_ORIGIN = "fake.example"
+
+
+class FakeProvider(ProviderBase):
+    """Reports the same progress everywhere; tests set what it returns."""
+
+    NAME = FAKE_ORIGIN
+
+    def __init__(self, api_key, contact_email):
+        self.progress = 1
+        self.zone = "Tristram"
+        # Data type -> exception to raise instead of returning.
+        self.errors: dict[str, Exception] = {}
+        # Data type -> event to wait for before returning.
+        self.holds: dict[str, threading.Event] = {}
+        self.requests: dict[str, int] = {DATA_DCLONE_PROGRESS: 0, DATA_TERROR_ZONE: 0}
+
+    def _fetch(self, data_type: str) -> None:
+        self.requests[data_type] += 1
+        if data_type in self.holds:
+            self.holds[data_type].wait(10)
+        if data_type in self.errors:
+            raise self.errors[data_type]
+
+    def get_dclone_progress(self) -> DCloneProgress:
+        self._fetch(DATA_DCLONE_PROGRESS)
+
+        def ladder() -> DCloneLadderProgress:
+            core = DCloneCoreProgress(
+                HC=Progress(self.progress), SC=Progress(self.progress)
+            )
+            return DCloneLadderProgress(L=core, NL=core)
+
+        return DCloneProgress(
+            Americas=ladder(), Europe=ladder(), Asia=ladder(), China=None
+        )
+
+    def get_terror_zone(self) -> TerrorZoneResponse:
+        self._fetch(DATA_TERROR_ZONE)
+        return TerrorZoneResponse(
+            current=self.zone, next=None, updated_at=datetime.now(timezone.utc)
+        )
+
+    def get_attribution(self) -> str:
+        return "Fake data"
+
+
+@pytest.fixture
+def fake_origin():
+    """Register FakeProvider for the duration of a test."""
+    saved = dict(registry._REGISTRY)
+    register_provider(ProviderSpec(name=FAKE_ORIGIN, target=f"{__name__}:FakeProvider"))
+    yield FAKE_ORIGIN
+    registry._REGISTRY.clear()
+    registry._REGISTRY.update(saved)
+
+
+@pytest.fixture
+def run_with_coordinator(tmp_path, fake_origin):
+    """Run `main(hass, coordinator)` on a coordinator for FakeProvider."""
+
+    def run(main, **options):
+        async def wrapper():
+            hass = HomeAssistant(str(tmp_path))
+            await dr.async_load(hass)
+            entry = ConfigEntry(
+                domain=DOMAIN,
+                data={CONF_ORIGIN: fake_origin, CONF_CONTACT_EMAIL: "a@example.com"},
+                options=options,
+                discovery_keys=MappingProxyType({}),
+                minor_version=1,
+                source="user",
+                title=fake_origin,
+                unique_id=f"d2r-{fake_origin}",
+                version=1,
+            )
+            coordinator = D2RDataUpdateCoordinator(hass, entry)
+            try:
+                return await main(hass, coordinator)
+            finally:
+                await coordinator.async_shutdown()
+                await hass.async_stop(force=True)
+
+        return asyncio.run(wrapper())
+
+    return run
@@ -0,0 +1,80 @@
+import pstats
+import time
+
+import pytest
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+)
+from custom_components.d2r_tracker.providers.bench import (
+    bench,
+    main,
+    replay_provider,
+    stub_recording,
+)
+from custom_components.d2r_tracker.providers.recording import TrafficRecorder
+
+
+def test_bench_stub_through_cache():
+    provider = replay_provider(stub_recording(time.time()))
+
+    report = bench(provider, calls=20, concurrency=4, trace_allocations=True)
+
+    for data_type in (DATA_TERROR_ZONE, DATA_DCLONE_PROGRESS):
+        assert report.latency[data_type].count == 20
+        assert report.parse_time[data_type].count == 20
+        # Only the first call, made alone, misses.
+        assert report.cache_misses[data_type] == 1
+        assert report.cache_hits[data_type] == 19
+    assert provider.requests == {DATA_TERROR_ZONE: 1, DATA_DCLONE_PROGRESS: 1}
+    assert report.cache.entries == 2
+    assert report.allocations.peak_bytes > 0
+
+
+def test_bench_uncached_writes_profiles(tmp_path):
+    provider = replay_provider(stub_recording(time.time()))
+
+    report = bench(
+        provider,
+        [DATA_DCLONE_PROGRESS],
+        calls=5,
+        cached=False,
+        profile_path=tmp_path / "bench.prof",
+        flamegraph_path=tmp_path / "bench.folded",
+    )
+
+    assert provider.requests == {DATA_DCLONE_PROGRESS: 5}
+    assert report.cache is None
+    assert DATA_TERROR_ZONE not in report.latency
+    assert pstats.Stats(str(tmp_path / "bench.prof")).total_calls > 0
+    folded = (tmp_path / "bench.folded").read_text().splitlines()
+    assert any("get_dclone_progress" in line for line in folded)
+    for line in folded:
+        stack, microseconds = line.rsplit(" ", 1)
+        assert int(microseconds) > 0
+
+
+def test_bench_rejects_profiling_threads():
+    provider = replay_provider(stub_recording(time.time()))
+    with pytest.raises(ValueError):
+        bench(provider, concurrency=2, profile_path="bench.prof")
+
+
+def test_main_replays_recording(tmp_path, capsys):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(path)
+    for response in stub_recording(time.time()):
+        recorder.record(response.origin, response.url, response.payload)
+
+    assert main(["--recording", str(path), "-n", "3"]) == 0
+
+    out = capsys.readouterr().out
+    assert "terror_zone:" in out
+    assert "hits=2 misses=1" in out
+
+
+def test_main_refuses_uncached_calls_to_an_api(capsys):
+    with pytest.raises(SystemExit):
+        main(["--origin", "diablo2.io", "--no-cache", "-n", "2"])
+    assert "--calls 1" in capsys.readouterr().err
@@ -0,0 +1,66 @@
+import pytest
+
+from custom_components.d2r_tracker.providers import (
+    DCloneCoreProgress,
+    Progress,
+)
+from custom_components.d2r_tracker.providers.cache import (
+    ResponseCache,
+    estimate_size,
+)
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_estimate_size():
+    assert estimate_size("x" * 1000) > 1000
+    # Nested values count, shared ones once.
+    shared = "y" * 1000
+    assert estimate_size([shared, shared]) < estimate_size(["y" * 1000, "z" * 1000])
+    assert estimate_size(DCloneCoreProgress(HC=Progress(1), SC=Progress(2))) > 0
+
+
+def test_ttl_expiry():
+    timer = FakeTimer()
+    cache = ResponseCache(timer=timer)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    timer.now = 60
+    with pytest.raises(KeyError):
+        cache.get("a")
+    # No TTL, so only evicted for space.
+    assert cache.get("b") == 2
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.expirations) == (2, 1, 1)
+    assert stats.entries == 1
+
+
+def test_lru_eviction_under_byte_ceiling():
+    value_size = estimate_size("x" * 1000)
+    cache = ResponseCache(max_bytes=value_size * 2)
+    cache.set("a", "a" * 1000)
+    cache.set("b", "b" * 1000)
+    cache.get("a")
+    cache.set("c", "c" * 1000)
+
+    # "b" was the least recently used.
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None
+    assert cache.stats.evictions == 1
+    assert cache.stats.bytes <= cache.max_bytes
+
+    cache.set("huge", "h" * 10_000)
+    assert cache.peek("huge") is None
+    assert cache.stats.rejected == 1
+
+    cache.resize(value_size)
+    assert cache.stats.entries == 1
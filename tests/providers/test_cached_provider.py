@@ -1,17 +1,21 @@
 # filepath: /workspaces/d2r-tracker-ha-custom-component/tests/providers/test_cached_provider.py
 from unittest.mock import patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pytest
 
 from custom_components.d2r_tracker.providers.cached import CachedProvider
 from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
     DCloneProgress,
     DCloneCoreProgress,
     DCloneLadderProgress,
     Progress,
     ProviderBase,
+    ProviderCapabilities,
     TerrorZoneResponse,
 )
+from custom_components.d2r_tracker.providers.schema import SchemaError
 
 
 class MockProvider(ProviderBase):
@@ -42,6 +46,10 @@ class MockProvider(ProviderBase):
             China=None,
         )
 
+    def fetches_all_dclone_progress(self, keys) -> bool:
+        # As if upstream filtered on any subset of keys.
+        return keys.issuperset(self.CAPABILITIES.dclone_keys())
+
     def get_terror_zone(self) -> TerrorZoneResponse:
         self.get_terror_zone_call_count += 1
         return TerrorZoneResponse(
@@ -82,6 +90,45 @@ def test_get_dclone_progress_caching(cached_provider, mock_provider):
     assert result1 is result2
 
 
+def test_get_dclone_values_queries_and_caches_keys(cached_provider, mock_provider):
+    """Test that a partial query is cached per set of keys."""
+    keys = [("Europe", "L", "SC"), ("Asia", "NL", "HC")]
+    with patch.object(
+        mock_provider, "get_dclone_values", wraps=mock_provider.get_dclone_values
+    ) as get_values:
+        assert cached_provider.get_dclone_values(keys) == {
+            ("Europe", "L", "SC"): Progress(2),
+            ("Asia", "NL", "HC"): Progress(3),
+        }
+        assert cached_provider.get_dclone_values(reversed(keys)) == {
+            ("Europe", "L", "SC"): Progress(2),
+            ("Asia", "NL", "HC"): Progress(3),
+        }
+        get_values.assert_called_once()
+    assert cached_provider.hits[DATA_DCLONE_PROGRESS] == 1
+
+
+def test_get_dclone_values_uses_cached_progress(cached_provider, mock_provider):
+    """Test that a cached full progress answers partial queries."""
+    cached_provider.get_dclone_progress()
+    assert cached_provider.get_dclone_values([("Americas", "NL", "SC")]) == {
+        ("Americas", "NL", "SC"): Progress(4)
+    }
+    assert mock_provider.get_dclone_progress_call_count == 1
+
+
+def test_unfiltered_query_is_cached_as_progress(cached_provider, mock_provider):
+    """Test that a query the provider cannot filter caches the full progress."""
+    with patch.object(mock_provider, "fetches_all_dclone_progress", return_value=True):
+        assert cached_provider.get_dclone_values([("Americas", "NL", "SC")]) == {
+            ("Americas", "NL", "SC"): Progress(4)
+        }
+    assert cached_provider.get_dclone_values([("Europe", "L", "HC")]) == {
+        ("Europe", "L", "HC"): Progress(1)
+    }
+    assert mock_provider.get_dclone_progress_call_count == 1
+
+
 @patch("custom_components.d2r_tracker.providers.cached.dt")
 def test_get_terror_zone_fast_caching(mock_dt, cached_provider, mock_provider):
     """Test that get_terror_zone caches results for 1 minute in the first few minutes of the hour."""
@@ -102,12 +149,13 @@ def test_get_terror_zone_fast_caching(mock_dt, cached_provider, mock_provider):
     mock_dt.now.return_value = initial_time + timedelta(seconds=61)
     result3 = cached_provider.get_terror_zone()
     assert mock_provider.get_terror_zone_call_count == 2
-    assert result1 is not result3
+    # Upstream reports the same zones, so the first response stands.
+    assert result1 is result3
 
 
 @patch("custom_components.d2r_tracker.providers.cached.dt")
 def test_get_terror_zone_slow_caching(mock_dt, cached_provider, mock_provider):
-    """Test that get_terror_zone caches results for until next whole hour after 5 minutes."""
+    """Test that get_terror_zone caches results until the next rotation after 5 minutes."""
     # Set current time to 10:10 AM.
     initial_time = datetime(2025, 1, 1, 10, 10, 0)
     mock_dt.now.return_value = initial_time
@@ -115,14 +163,227 @@ def test_get_terror_zone_slow_caching(mock_dt, cached_provider, mock_provider):
     result1 = cached_provider.get_terror_zone()
     assert mock_provider.get_terror_zone_call_count == 1
 
-    # Call at 10:59 (still before next hour) should hit the cache.
-    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 59, 0)
+    # Call at 10:29 (still before the next rotation) should hit the cache.
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 29, 0)
     result2 = cached_provider.get_terror_zone()
     assert mock_provider.get_terror_zone_call_count == 1
     assert result1 is result2
 
-    # Call at 11:00 should refresh the cache.
-    mock_dt.now.return_value = datetime(2025, 1, 1, 11, 0, 0)
+    # Call at 10:31 should refresh the cache.
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 31, 0)
     result3 = cached_provider.get_terror_zone()
     assert mock_provider.get_terror_zone_call_count == 2
-    assert result1 is not result3
+    # Upstream reports the same zones, so the first response stands.
+    assert result1 is result3
+
+
+def test_collate_responses_skips_unsupported_data(mock_provider):
+    """Test that data types the provider does not support are never requested."""
+    mock_provider.CAPABILITIES = ProviderCapabilities(
+        data_types=frozenset({DATA_DCLONE_PROGRESS})
+    )
+    cached_provider = CachedProvider(mock_provider)
+
+    response = cached_provider.collate_responses()
+
+    assert response.terror_zone is None
+    assert response.dclone_progress is not None
+    assert mock_provider.get_terror_zone_call_count == 0
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_collate_responses_only_requested_data(mock_dt, cached_provider, mock_provider):
+    """Test that only the requested data types are fetched."""
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 0, 0)
+
+    response = cached_provider.collate_responses([DATA_TERROR_ZONE])
+
+    assert response.dclone_progress is None
+    assert response.terror_zone is not None
+    assert mock_provider.get_dclone_progress_call_count == 0
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_get_terror_zone_slow_caching_second_half_hour(
+    mock_dt, cached_provider, mock_provider
+):
+    """Test that fetches in the second half hour wait for the next whole hour."""
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 40, 0)
+    cached_provider.get_terror_zone()
+
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 59, 0)
+    cached_provider.get_terror_zone()
+    assert mock_provider.get_terror_zone_call_count == 1
+
+    mock_dt.now.return_value = datetime(2025, 1, 1, 11, 0, 2)
+    cached_provider.get_terror_zone()
+    assert mock_provider.get_terror_zone_call_count == 2
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_configure(mock_dt, cached_provider, mock_provider):
+    """Test that tunables apply to a live provider."""
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 10, 0)
+    cached_provider.get_terror_zone()
+    cached_provider.get_dclone_progress()
+
+    cached_provider.configure(
+        dclone_ttl=120,
+        terror_zone_interval_minutes=60,
+        terror_zone_burst_minutes=15,
+        request_timeout=5,
+    )
+
+    assert mock_provider.timeout == 5
+    # Cached values are kept: a longer TTL does not call for a refetch.
+    cached_provider.get_dclone_progress()
+    assert mock_provider.get_dclone_progress_call_count == 1
+    # 10:10 is now within the burst window, so fetch every minute.
+    assert cached_provider.next_terror_zone_update_after == datetime(
+        2025, 1, 1, 10, 11, 1
+    )
+    cached_provider.get_terror_zone()
+    assert mock_provider.get_terror_zone_call_count == 1
+
+
+def test_configure_shorter_ttl(cached_provider, mock_provider):
+    """Test that a shorter TTL expires cached values sooner, not right away."""
+    now = datetime(2025, 1, 1, 10, 10, 0, tzinfo=timezone.utc)
+    cached_provider.clock = lambda: now
+    cached_provider.cache.timer = lambda: now.timestamp()
+    cached_provider.dclone_ttl = 300
+    cached_provider.get_dclone_progress()
+
+    now += timedelta(seconds=30)
+    cached_provider.configure(dclone_ttl=60)
+    cached_provider.get_dclone_progress()
+    assert mock_provider.get_dclone_progress_call_count == 1
+
+    now += timedelta(seconds=31)
+    cached_provider.get_dclone_progress()
+    assert mock_provider.get_dclone_progress_call_count == 2
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_seed(mock_dt, cached_provider, mock_provider):
+    """Test that values fetched elsewhere are served until due again."""
+    now = datetime(2025, 1, 1, 10, 10, 0)
+    mock_dt.now.return_value = now
+    progress = MockProvider().get_dclone_progress()
+    zone = MockProvider().get_terror_zone()
+
+    cached_provider.seed(DATA_DCLONE_PROGRESS, progress, now - timedelta(seconds=10))
+    cached_provider.seed(DATA_TERROR_ZONE, zone, now - timedelta(seconds=10))
+    assert cached_provider.get_dclone_progress() is progress
+    assert cached_provider.get_terror_zone() is zone
+    assert mock_provider.get_dclone_progress_call_count == 0
+    assert mock_provider.get_terror_zone_call_count == 0
+    assert cached_provider.fetched_at[DATA_DCLONE_PROGRESS] == now - timedelta(
+        seconds=10
+    )
+
+    # Too old to serve.
+    fresh = CachedProvider(mock_provider)
+    fresh.seed(DATA_DCLONE_PROGRESS, progress, now - timedelta(minutes=5))
+    fresh.get_dclone_progress()
+    assert mock_provider.get_dclone_progress_call_count == 1
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_collate_responses_isolates_failures(mock_dt, cached_provider, mock_provider):
+    """Test that a failing data type does not fail the others."""
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 10, 0)
+    with patch.object(
+        mock_provider, "get_terror_zone", side_effect=OSError("Bad gateway")
+    ):
+        response = cached_provider.collate_responses()
+
+    assert response.terror_zone is None
+    assert not response.part_ok(DATA_TERROR_ZONE)
+    assert "Bad gateway" in response.status[DATA_TERROR_ZONE].error
+    assert response.dclone_progress is not None
+    assert response.part_ok(DATA_DCLONE_PROGRESS)
+    assert response.status[DATA_DCLONE_PROGRESS].age(
+        datetime(2025, 1, 1, 10, 11, 0)
+    ) == pytest.approx(60)
+    assert cached_provider.errors[DATA_TERROR_ZONE] == 1
+
+
+def test_shared_cache_spares_other_instances(tmp_path):
+    """Test that instances sharing a cache file fetch once per TTL window."""
+    from custom_components.d2r_tracker.providers.shared_cache import SharedCache
+
+    providers = [MockProvider(), MockProvider()]
+    cached_providers = [CachedProvider(provider) for provider in providers]
+    for cached_provider in cached_providers:
+        cached_provider.shared = SharedCache(str(tmp_path / "shared.db"))
+
+    first = cached_providers[0].get_dclone_progress()
+    second = cached_providers[1].get_dclone_progress()
+
+    assert first == second
+    assert [p.get_dclone_progress_call_count for p in providers] == [1, 0]
+    assert cached_providers[1].shared_hits[DATA_DCLONE_PROGRESS] == 1
+
+
+def test_invalid_payload_keeps_last_good_data(mock_provider):
+    """Test that a payload failing validation is not retried every refresh."""
+    now = [datetime(2025, 1, 1, 10, 0, 0, tzinfo=timezone.utc)]
+    cached_provider = CachedProvider(mock_provider, clock=lambda: now[0])
+    good = cached_provider.get_dclone_progress()
+    invalid = SchemaError("test", "$.servers", "expected a list, got NoneType")
+
+    with patch.object(mock_provider, "get_dclone_progress", side_effect=invalid):
+        now[0] += timedelta(minutes=1)
+        assert cached_provider.get_dclone_progress() is good
+        # Served from the last good data until the retry time.
+        now[0] += timedelta(minutes=1)
+        assert cached_provider.get_dclone_progress() is good
+        assert mock_provider.get_dclone_progress.call_count == 1
+        # Retries back off.
+        now[0] += timedelta(minutes=4)
+        cached_provider.get_dclone_progress()
+        assert cached_provider.invalid[DATA_DCLONE_PROGRESS].failures == 2
+        assert cached_provider.invalid[DATA_DCLONE_PROGRESS].retry_after == now[
+            0
+        ] + timedelta(minutes=10)
+
+    assert cached_provider.validation_failures[DATA_DCLONE_PROGRESS] == 2
+    # The status tells the data is held, and since when, but it is still ok.
+    response = cached_provider.collate_responses([DATA_DCLONE_PROGRESS])
+    assert response.dclone_progress is good
+    assert response.part_ok(DATA_DCLONE_PROGRESS)
+    assert "expected a list" in response.status[DATA_DCLONE_PROGRESS].held
+    assert response.status[DATA_DCLONE_PROGRESS].age(now[0]) == pytest.approx(360)
+
+    now[0] += timedelta(minutes=10)
+    response = cached_provider.collate_responses([DATA_DCLONE_PROGRESS])
+    assert response.status[DATA_DCLONE_PROGRESS].held is None
+
+
+def test_invalid_payload_without_good_data_fails(cached_provider, mock_provider):
+    invalid = SchemaError("test", "$", "expected an object, got list")
+    with patch.object(mock_provider, "get_terror_zone", side_effect=invalid):
+        response = cached_provider.collate_responses([DATA_TERROR_ZONE])
+    assert not response.part_ok(DATA_TERROR_ZONE)
+    assert "expected an object" in response.status[DATA_TERROR_ZONE].error
+
+
+@patch("custom_components.d2r_tracker.providers.cached.dt")
+def test_get_terror_zone_keeps_update_time_when_unchanged(
+    mock_dt, cached_provider, mock_provider
+):
+    """Test that refetching the same zones keeps the previous response."""
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 1, 0)
+    first = cached_provider.get_terror_zone()
+    mock_dt.now.return_value = datetime(2025, 1, 1, 10, 2, 30)
+    assert cached_provider.get_terror_zone() is first
+    assert mock_provider.get_terror_zone_call_count == 2
+
+    with patch.object(
+        mock_provider,
+        "get_terror_zone",
+        return_value=TerrorZoneResponse("New Zone", "Next Test Zone", datetime.now()),
+    ):
+        mock_dt.now.return_value = datetime(2025, 1, 1, 10, 3, 30)
+        assert cached_provider.get_terror_zone().current == "New Zone"
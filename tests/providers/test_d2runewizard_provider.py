@@ -5,6 +5,7 @@ import pytest
 
 from custom_components.d2r_tracker.providers.d2runewizard import (
     D2RuneWizardProvider,
+    group_dclone_response,
 )
 from custom_components.d2r_tracker.providers import (
     DCloneProgress,
@@ -181,6 +182,8 @@ def test_get_dclone_progress(mock_api_response, mock_dclone_response):
         "https://d2runewizard.com/api/diablo-clone-progress/all",
         "test_key",
         "test@example.com",
+        timeout=60,
+        recorder=None,
     )
 
     assert progress == DCloneProgress(
@@ -284,6 +287,13 @@ def test_get_terror_zone_response(mock_requests_get, mock_terror_zone_response):
     )
 
 
+def test_non_object_rows_are_skipped(mock_dclone_response):
+    servers = mock_dclone_response["servers"]
+    assert group_dclone_response(
+        {"servers": [*servers, "Europe", None]}
+    ) == group_dclone_response(mock_dclone_response)
+
+
 def test_attribution():
     provider = D2RuneWizardProvider(
         api_key="test_key", contact_email="test@example.com"
@@ -5,6 +5,7 @@ import pytest
 
 from custom_components.d2r_tracker.providers.diablo2io import (
     Diablo2IOProvider,
+    group_diablo2io_response,
 )
 from custom_components.d2r_tracker.providers import (
     DCloneProgress,
@@ -159,6 +160,50 @@ def test_get_dclone(mock_requests_get, mock_dclone_response):
     )
 
 
+@patch("requests.get")
+def test_get_dclone_values_filters_upstream(mock_requests_get, mock_dclone_response):
+    """Test that keys sharing a region and ladder are filtered upstream."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = [
+        row
+        for row in mock_dclone_response
+        if row["region"] == "2" and row["ladder"] == "1"
+    ]
+    mock_requests_get.return_value = mock_response
+
+    provider = Diablo2IOProvider(api_key="test_key", contact_email="test@example.com")
+
+    values = provider.get_dclone_values(
+        [("Europe", "L", "HC"), ("Europe", "L", "SC"), ("China", "L", "SC")]
+    )
+
+    _, kwargs = mock_requests_get.call_args
+    assert kwargs["params"] == {"region": "2", "ladder": "1"}
+    assert values == {
+        ("Europe", "L", "HC"): Progress(1),
+        ("Europe", "L", "SC"): Progress(4),
+        ("China", "L", "SC"): None,
+    }
+
+
+def test_fetches_all_dclone_progress():
+    provider = Diablo2IOProvider(api_key="test_key", contact_email="test@example.com")
+    assert not provider.fetches_all_dclone_progress(
+        frozenset({("Europe", "L", "HC"), ("Europe", "NL", "SC")})
+    )
+    assert provider.fetches_all_dclone_progress(
+        frozenset({("Europe", "L", "HC"), ("Asia", "NL", "SC")})
+    )
+    # Nothing is fetched for unsupported regions.
+    assert not provider.fetches_all_dclone_progress(frozenset({("China", "L", "SC")}))
+
+
+def test_non_object_rows_are_skipped(mock_dclone_response):
+    assert group_diablo2io_response(
+        [*mock_dclone_response, "Europe", None]
+    ) == group_diablo2io_response(mock_dclone_response)
+
+
 def test_terror_zone_unimplemented():
     """Test that TerrorZone is unimplemented and raises NotImplementedError."""
     provider = Diablo2IOProvider(api_key="test_key", contact_email="test@example.com")
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.d2r_tracker.providers import (
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+)
+from custom_components.d2r_tracker.providers.history import (
+    DCloneHistory,
+    ProgressRingBuffer,
+)
+
+HOUR = 3600.0
+
+
+def make_progress(europe_l_sc: int) -> DCloneProgress:
+    def ladder():
+        return DCloneLadderProgress(
+            L=DCloneCoreProgress(HC=Progress(1), SC=Progress(1)),
+            NL=DCloneCoreProgress(HC=Progress(1), SC=Progress(1)),
+        )
+
+    europe = ladder()
+    europe.L.SC = Progress(europe_l_sc)
+    return DCloneProgress(Americas=ladder(), Europe=europe, Asia=ladder(), China=None)
+
+
+def test_ring_buffer_evicts_oldest():
+    buffer = ProgressRingBuffer(capacity=3)
+    for i, progress in enumerate([1, 2, 3, 4]):
+        buffer.append(i * HOUR, progress)
+
+    assert len(buffer) == 3
+    assert list(buffer) == [(1 * HOUR, 2), (2 * HOUR, 3), (3 * HOUR, 4)]
+    assert buffer.steps == 2
+
+
+def test_ring_buffer_steps_ignore_resets():
+    buffer = ProgressRingBuffer(capacity=4)
+    for i, progress in enumerate([5, 6, 1, 2]):
+        buffer.append(i * HOUR, progress)
+
+    assert buffer.steps == 2
+
+    # Evicting 5 drops the 5->6 step.
+    buffer.append(4 * HOUR, 3)
+    assert buffer.steps == 2
+
+
+def test_ring_buffer_rejects_tiny_capacity():
+    with pytest.raises(ValueError):
+        ProgressRingBuffer(capacity=1)
+
+
+def test_history_records_only_transitions():
+    history = DCloneHistory()
+    key = ("Europe", "L", "SC")
+
+    assert history.observe(make_progress(1), 0.0)
+    assert not history.observe(make_progress(1), HOUR)
+    assert history.observe(make_progress(2), 2 * HOUR)
+
+    assert history.transitions(key) == [(0.0, 1), (2 * HOUR, 2)]
+    assert history.transitions(("Americas", "L", "SC")) == [(0.0, 1)]
+    assert history.transitions(("China", "L", "SC")) == []
+
+
+def test_history_stats():
+    history = DCloneHistory()
+    key = ("Europe", "L", "SC")
+
+    history.observe(make_progress(1), 0.0)
+    stats = history.stats(key)
+    assert stats.last_change == datetime.fromtimestamp(0, tz=timezone.utc)
+    assert stats.step_rate is None
+    assert stats.eta is None
+
+    history.observe(make_progress(2), 2 * HOUR)
+    history.observe(make_progress(3), 4 * HOUR)
+    stats = history.stats(key)
+    assert stats.last_change == datetime.fromtimestamp(4 * HOUR, tz=timezone.utc)
+    assert stats.step_rate == pytest.approx(0.5)
+    # 3 steps left at 0.5 steps/h.
+    assert stats.eta == datetime.fromtimestamp(10 * HOUR, tz=timezone.utc)
+
+
+def test_history_round_trip():
+    history = DCloneHistory(capacity=8)
+    history.observe(make_progress(1), 0.0)
+    history.observe(make_progress(3), HOUR)
+
+    restored = DCloneHistory.from_dict(history.as_dict())
+
+    key = ("Europe", "L", "SC")
+    assert restored.capacity == 8
+    assert restored.transitions(key) == history.transitions(key)
+    assert restored.stats(key) == history.stats(key)
+    # Same progress after a restart is not a new transition.
+    assert not restored.observe(make_progress(3), 2 * HOUR)
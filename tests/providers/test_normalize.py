@@ -0,0 +1,104 @@
+import pytest
+
+from custom_components.d2r_tracker.providers import Progress
+from custom_components.d2r_tracker.providers.d2runewizard import (
+    DCLONE_ROW_SCHEMA as D2RUNEWIZARD_SCHEMA,
+    group_dclone_response,
+)
+from custom_components.d2r_tracker.providers.diablo2io import (
+    DCLONE_ROW_SCHEMA as DIABLO2IO_SCHEMA,
+    group_diablo2io_response,
+)
+from custom_components.d2r_tracker.providers.normalize import (
+    DCLONE_INDEX,
+    MISSING,
+    TABLE_SIZE,
+    is_complete,
+    normalize_dclone_rows,
+    table_progress,
+    table_to_progress,
+)
+
+
+def test_index_layout():
+    assert sorted(DCLONE_INDEX.values()) == list(range(TABLE_SIZE))
+    assert DCLONE_INDEX[("Americas", "L", "HC")] == 0
+    assert DCLONE_INDEX[("China", "NL", "SC")] == TABLE_SIZE - 1
+
+
+def test_normalize_reports_bad_rows():
+    rows = [
+        {"region": "2", "ladder": "1", "hc": "2", "progress": "4"},
+        {"region": "9", "ladder": "1", "hc": "2", "progress": "4"},
+        {"region": "1", "ladder": "3", "hc": "2", "progress": "4"},
+        {"region": "1", "ladder": "1", "hc": "2", "progress": "7"},
+        {"region": "1", "ladder": "1", "progress": "1"},
+        {"region": ["1"], "ladder": "1", "hc": "2", "progress": "1"},
+    ]
+
+    normalized = normalize_dclone_rows(rows, DIABLO2IO_SCHEMA)
+
+    assert table_progress(normalized.table, ("Europe", "L", "SC")) == 4
+    assert table_progress(normalized.table, ("Americas", "L", "SC")) is None
+    assert list(normalized.table).count(MISSING) == TABLE_SIZE - 1
+    assert normalized.errors[:4] == [
+        "row 1: unknown region '9'",
+        "row 2: invalid ladder value '3'",
+        "row 3: invalid progress '7'",
+        "row 4: missing field 'hc'",
+    ]
+    assert normalized.errors[4].startswith("row 5: invalid row")
+
+
+def test_normalize_case_insensitive():
+    rows = [
+        {"region": "Asia", "ladder": "TRUE", "hardcore": False, "progress": 2},
+        {"region": "Asia", "ladder": "False", "hardcore": "true", "progress": 3},
+    ]
+
+    normalized = normalize_dclone_rows(rows, D2RUNEWIZARD_SCHEMA)
+
+    assert normalized.errors == []
+    assert table_progress(normalized.table, ("Asia", "L", "SC")) == 2
+    assert table_progress(normalized.table, ("Asia", "NL", "HC")) == 3
+
+
+def test_table_to_progress_defaults_missing():
+    normalized = normalize_dclone_rows(
+        [{"region": "3", "ladder": "2", "hc": "1", "progress": "5"}],
+        DIABLO2IO_SCHEMA,
+    )
+
+    progress = table_to_progress(normalized.table, ["Asia"], default=Progress(0))
+
+    assert progress.Asia.NL.HC == 5
+    assert progress.Asia.L.SC == 0
+    assert progress.Americas is None
+    assert not is_complete(normalized.table, ["Asia"])
+    assert is_complete(normalized.table, [])
+
+
+def test_group_diablo2io_response_rejects_incomplete_payloads():
+    with pytest.raises(ValueError):
+        group_diablo2io_response({"not": "a list"})
+    with pytest.raises(ValueError):
+        group_diablo2io_response(
+            [{"region": "1", "ladder": "1", "hc": "1", "progress": "1"}]
+        )
+
+
+def test_group_dclone_response_defaults_missing_servers():
+    progress = group_dclone_response(
+        {
+            "servers": [
+                {"region": "Europe", "ladder": True, "hardcore": True, "progress": 6},
+                {"region": "Mars", "ladder": True, "hardcore": True, "progress": 6},
+            ]
+        }
+    )
+
+    assert progress.Europe.L.HC == 6
+    assert progress.Americas.NL.SC == 0
+    assert progress.China is None
+    with pytest.raises(ValueError):
+        group_dclone_response({"servers": None})
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from custom_components.d2r_tracker.providers.pipeline import FetchPipeline
+from custom_components.d2r_tracker.providers.worker import WorkerShutDownError
+
+
+def test_slow_origin_does_not_hold_up_others():
+    pipeline = FetchPipeline(threads=1)
+    pipeline.acquire("slow")
+    pipeline.acquire("fast")
+    release = threading.Event()
+
+    async def main():
+        slow = asyncio.ensure_future(pipeline.run("slow", 10, release.wait))
+        # Queued behind the hanging request on its own lane only.
+        queued = asyncio.ensure_future(pipeline.run("slow", 10, lambda: "queued"))
+        assert await pipeline.run("fast", 1, lambda: "fast") == "fast"
+        assert not queued.done()
+        release.set()
+        assert await queued == "queued"
+        await slow
+
+    try:
+        asyncio.run(main())
+    finally:
+        pipeline.release("slow")
+        pipeline.release("fast")
+
+
+def test_timeout_includes_queueing():
+    pipeline = FetchPipeline(threads=1)
+    pipeline.acquire("origin")
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(pipeline.run("origin", 10, release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await pipeline.run("origin", 0.05, lambda: None)
+        release.set()
+        await blocked
+
+    try:
+        asyncio.run(main())
+    finally:
+        pipeline.release("origin")
+
+
+def test_timed_out_jobs_leave_the_queue():
+    pipeline = FetchPipeline(threads=1, max_pending=2)
+    pipeline.acquire("origin")
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(pipeline.run("origin", 10, release.wait))
+        await asyncio.sleep(0)
+        # Queued behind the blocked job, so cancelled before ever running.
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                await pipeline.run("origin", 0.01, lambda: None)
+        assert pipeline.metrics["origin"].queue_depth == 1
+        release.set()
+        await blocked
+        assert await pipeline.run("origin", 1, lambda: "accepted") == "accepted"
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        pipeline.release("origin")
+
+
+def test_lanes_are_shared_and_released():
+    pipeline = FetchPipeline(max_pending=2)
+    pipeline.acquire("origin")
+    pipeline.acquire("origin")
+    assert pipeline._lanes["origin"].max_pending == 4
+
+    pipeline.release("origin")
+    assert pipeline._lanes["origin"].max_pending == 2
+    pipeline.release("origin")
+    assert pipeline.metrics == {}
+
+
+def test_released_lanes_reject_jobs():
+    pipeline = FetchPipeline()
+    pipeline.acquire("origin")
+    pipeline.release("origin")
+
+    with pytest.raises(WorkerShutDownError):
+        asyncio.run(pipeline.run("origin", 1, lambda: None))
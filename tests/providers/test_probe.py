@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from custom_components.d2r_tracker.providers import DATA_DCLONE_PROGRESS, ProviderBase
+from custom_components.d2r_tracker.providers.probe import (
+    PROBE_CANNOT_CONNECT,
+    PROBE_INVALID_AUTH,
+    PROBE_INVALID_RESPONSE,
+    PROBE_MISSING_API_KEY,
+    ProbeResult,
+    probe_provider,
+    recommend_provider,
+)
+from custom_components.d2r_tracker.providers.registry import ProviderSpec
+
+
+class FakeProvider(ProviderBase):
+    NAME = "fake"
+    # Set by each test.
+    error: Exception | None = None
+
+    def __init__(self, api_key, contact_email):
+        pass
+
+    def get_dclone_progress(self):
+        if self.error is not None:
+            raise self.error
+        return "progress"
+
+
+SPEC = ProviderSpec(name="fake", target=f"{__name__}:FakeProvider")
+
+
+@pytest.fixture(autouse=True)
+def reset_error():
+    yield
+    FakeProvider.error = None
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    return requests.HTTPError(response=MagicMock(status_code=status_code))
+
+
+def test_probe_healthy():
+    result = probe_provider(SPEC, None, "test@example.com", timeout=5)
+    assert result.healthy
+    assert result.latency is not None and result.latency >= 0
+    # Kept to seed the new entry's cache.
+    assert result.data_type == DATA_DCLONE_PROGRESS
+    assert result.value == "progress"
+    assert result.fetched_at is not None
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (http_error(401), PROBE_INVALID_AUTH),
+        (http_error(403), PROBE_INVALID_AUTH),
+        (http_error(500), PROBE_CANNOT_CONNECT),
+        (requests.ConnectionError(), PROBE_CANNOT_CONNECT),
+        (requests.JSONDecodeError("Expecting value", "", 0), PROBE_INVALID_RESPONSE),
+        (KeyError("servers"), PROBE_INVALID_RESPONSE),
+    ],
+)
+def test_probe_errors(error, expected):
+    FakeProvider.error = error
+    result = probe_provider(SPEC, None, "test@example.com")
+    assert result == ProbeResult("fake", None, expected)
+    assert not result.healthy
+
+
+def test_probe_missing_api_key():
+    spec = ProviderSpec(
+        name="fake", target=f"{__name__}:FakeProvider", requires_api_key=True
+    )
+    assert probe_provider(spec, None, "test@example.com") == ProbeResult(
+        "fake", None, PROBE_MISSING_API_KEY
+    )
+
+
+def test_recommend_provider():
+    results = [
+        ProbeResult("slow", 0.5),
+        ProbeResult("broken", None, PROBE_CANNOT_CONNECT),
+        ProbeResult("fast", 0.1),
+    ]
+    assert recommend_provider(results) == "fast"
+    assert recommend_provider(results[1:2]) is None
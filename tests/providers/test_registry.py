@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.d2r_tracker.providers import ProviderBase
+from custom_components.d2r_tracker.providers import registry
+from custom_components.d2r_tracker.providers.diablo2io import Diablo2IOProvider
+from custom_components.d2r_tracker.providers.registry import (
+    ProviderSpec,
+    RateLimit,
+    get_provider_spec,
+    load_entry_points,
+    provider_specs,
+    register_provider,
+)
+
+
+class MirrorProvider(ProviderBase):
+    NAME = "mirror.example"
+
+    def __init__(self, api_key, contact_email):
+        self.api_key = api_key
+        self.contact_email = contact_email
+
+
+MIRROR_SPEC = ProviderSpec(
+    name="mirror.example",
+    target=f"{__name__}:MirrorProvider",
+    rate_limit=RateLimit(min_request_interval=30),
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    saved = dict(registry._REGISTRY)
+    yield
+    registry._REGISTRY.clear()
+    registry._REGISTRY.update(saved)
+
+
+def test_builtin_providers():
+    assert [spec.name for spec in provider_specs()] == [
+        "diablo2.io",
+        "d2runewizard.com",
+    ]
+    assert not get_provider_spec("diablo2.io").requires_api_key
+    assert get_provider_spec("d2runewizard.com").requires_api_key
+
+
+def test_builtin_specs_match_their_providers():
+    for spec in provider_specs():
+        assert spec.capabilities == spec.load().CAPABILITIES
+
+
+def test_describing_a_provider_does_not_import_it():
+    spec = ProviderSpec(name="missing.example", target="missing_module:Provider")
+
+    assert spec.capabilities == ProviderBase.CAPABILITIES
+    assert spec.min_request_interval == 60
+    with pytest.raises(ModuleNotFoundError):
+        spec.create(None, "test@example.com")
+
+
+def test_create():
+    provider = get_provider_spec("diablo2.io").create(None, "test@example.com")
+    assert isinstance(provider, Diablo2IOProvider)
+    assert provider.contact_email == "test@example.com"
+
+
+def test_create_requires_api_key():
+    with pytest.raises(ValueError, match="API key is required"):
+        get_provider_spec("d2runewizard.com").create(None, "test@example.com")
+
+
+def test_unknown_origin():
+    with pytest.raises(ValueError, match="Invalid origin"):
+        get_provider_spec("unknown.example")
+
+
+def test_register_provider():
+    register_provider(MIRROR_SPEC)
+
+    spec = get_provider_spec("mirror.example")
+    assert spec.min_request_interval == 30
+    assert isinstance(spec.create("key", "test@example.com"), MirrorProvider)
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_provider(MIRROR_SPEC)
+
+
+@patch("custom_components.d2r_tracker.providers.registry.entry_points")
+def test_load_entry_points(mock_entry_points):
+    good = MagicMock()
+    good.load.return_value = MIRROR_SPEC
+    bad = MagicMock()
+    bad.load.return_value = object()
+    mock_entry_points.return_value = [bad, good]
+
+    load_entry_points()
+    # Loading again is a no-op.
+    load_entry_points()
+
+    mock_entry_points.assert_called_with(group="d2r_tracker.providers")
+    assert get_provider_spec("mirror.example") is MIRROR_SPEC
+    assert len(provider_specs()) == 3
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from custom_components.d2r_tracker.const import ORIGIN_DIABLO2IO
+from custom_components.d2r_tracker.providers import Progress
+from custom_components.d2r_tracker.providers.cached import CachedProvider
+from custom_components.d2r_tracker.providers.diablo2io import Diablo2IOProvider
+from custom_components.d2r_tracker.providers.recording import (
+    TrafficRecorder,
+    read_recording,
+)
+from custom_components.d2r_tracker.providers.replay import (
+    Distribution,
+    ReplayProvider,
+)
+
+
+def dclone_rows(progress: int) -> list[dict]:
+    return [
+        {"region": r, "ladder": ladder, "hc": hc, "progress": str(progress)}
+        for r in "123"
+        for ladder in "12"
+        for hc in "12"
+    ]
+
+
+@patch("requests.get")
+def test_provider_records_payloads(mock_requests_get, tmp_path):
+    mock_response = MagicMock()
+    mock_response.json.return_value = dclone_rows(2)
+    mock_requests_get.return_value = mock_response
+    provider = Diablo2IOProvider(api_key=None, contact_email="test@example.com")
+    provider.recorder = TrafficRecorder(tmp_path / "traffic.jsonl")
+
+    provider.get_dclone_progress()
+
+    (recorded,) = read_recording(tmp_path / "traffic.jsonl")
+    assert recorded.origin == ORIGIN_DIABLO2IO
+    assert recorded.payload == dclone_rows(2)
+
+
+@patch("requests.get")
+def test_replays_partial_subscription(mock_requests_get, tmp_path):
+    keys = [("Europe", "L", "HC"), ("Europe", "L", "SC")]
+    mock_response = MagicMock()
+    mock_requests_get.return_value = mock_response
+    provider = Diablo2IOProvider(api_key=None, contact_email="test@example.com")
+    provider.recorder = TrafficRecorder(tmp_path / "traffic.jsonl")
+    for progress in (2, 3):
+        mock_response.json.return_value = [
+            row for row in dclone_rows(progress) if row["region"] == "2"
+        ]
+        provider.get_dclone_values(keys)
+
+    recording = list(read_recording(tmp_path / "traffic.jsonl"))
+    assert all("?" in r.url for r in recording)
+    after = datetime.fromtimestamp(recording[-1].timestamp, timezone.utc)
+    replayed = ReplayProvider(recording, lambda: after + timedelta(seconds=1))
+    cached = CachedProvider(replayed)
+
+    # Every Europe server was in the payload, though only two were asked for.
+    assert replayed.subscribed_keys == tuple(
+        ("Europe", ladder, hardcore)
+        for ladder in ("L", "NL")
+        for hardcore in ("HC", "SC")
+    )
+    assert cached.get_dclone_values(keys) == dict.fromkeys(keys, Progress(3))
+    assert cached.get_dclone_values([("Asia", "L", "HC")]) == {
+        ("Asia", "L", "HC"): None
+    }
+
+
+def test_read_recording_skips_truncated_lines(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(path)
+    recorder.record("origin", "url", {"a": 1})
+    with open(path, "a") as f:
+        f.write('{"t": 1, "o"')
+
+    assert [r.payload for r in read_recording(path)] == [{"a": 1}]
+
+
+def test_distribution():
+    distribution = Distribution.of([float(n) for n in range(1, 101)])
+    assert distribution.count == 100
+    assert distribution.p50 == 50
+    assert distribution.p90 == 90
+    assert distribution.max == 100
+    assert Distribution.of([]).count == 0
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pytest
+
+from custom_components.d2r_tracker.providers.d2runewizard import (
+    group_dclone_response,
+    parse_terror_zone_response,
+)
+from custom_components.d2r_tracker.providers.diablo2io import (
+    group_diablo2io_response,
+)
+from custom_components.d2r_tracker.providers.schema import (
+    SchemaError,
+    compile_schema,
+    is_type,
+    list_of,
+    nullable,
+    obj,
+)
+
+check = compile_schema(
+    "test",
+    obj(
+        name=is_type(str),
+        count=nullable(is_type(int)),
+        rows=list_of(obj(value=is_type(int, str))),
+    ),
+)
+
+
+def test_valid_payload_is_returned():
+    payload = {"name": "a", "count": None, "rows": [{"value": 1}, {"value": "2"}]}
+    assert check(payload) is payload
+
+
+@pytest.mark.parametrize(
+    ("payload", "path", "message"),
+    [
+        ([], "$", "expected an object, got list"),
+        ({"count": 1, "rows": []}, "$", "missing field 'name'"),
+        ({"name": "a", "count": True, "rows": []}, "$.count", "expected int"),
+        (
+            {"name": "a", "count": 1, "rows": [{"value": 1}, {"value": None}]},
+            "$.rows[1].value",
+            "expected int or str, got NoneType",
+        ),
+    ],
+)
+def test_invalid_payload_reports_path(payload, path, message):
+    with pytest.raises(SchemaError) as e:
+        check(payload)
+    assert e.value.schema == "test"
+    assert e.value.path == path
+    assert e.value.message.startswith(message)
+
+
+def test_upstream_payloads_are_validated():
+    with pytest.raises(SchemaError, match=r"\$\.nextTerrorZone: missing field"):
+        parse_terror_zone_response(
+            {"currentTerrorZone": {"zone": "Tristram"}, "nextTerrorZone": {}},
+            datetime.now(),
+        )
+    with pytest.raises(SchemaError, match=r"\$\.servers: expected a list"):
+        group_dclone_response({"servers": {"Europe": 1}})
+    with pytest.raises(SchemaError, match=r"\$: expected a list"):
+        group_diablo2io_response({"error": "rate limited"})
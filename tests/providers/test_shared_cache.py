@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.d2r_tracker.providers import (
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    Progress,
+    TerrorZoneResponse,
+)
+from custom_components.d2r_tracker.providers import shared_cache
+from custom_components.d2r_tracker.providers.shared_cache import CODECS, SharedCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.db")
+
+
+def make_progress() -> DCloneProgress:
+    ladder = DCloneLadderProgress(
+        L=DCloneCoreProgress(HC=Progress(1), SC=Progress(2)),
+        NL=DCloneCoreProgress(HC=Progress(3), SC=Progress(4)),
+    )
+    return DCloneProgress(Americas=ladder, Europe=ladder, Asia=ladder, China=None)
+
+
+@pytest.mark.parametrize(
+    ("codec_name", "value"),
+    [
+        ("dclone_progress", make_progress()),
+        (
+            "dclone_values",
+            {("Europe", "L", "SC"): Progress(2), ("China", "L", "SC"): None},
+        ),
+        (
+            "terror_zone",
+            TerrorZoneResponse(
+                "Chaos Sanctuary", None, datetime(2025, 1, 1, tzinfo=timezone.utc)
+            ),
+        ),
+    ],
+)
+def test_codecs_round_trip(codec_name, value):
+    codec = CODECS[codec_name]
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_second_process_reuses_fetch(path):
+    first, second = SharedCache(path), SharedCache(path)
+    now = time.time()
+
+    value, _, fetched = first.get_or_fetch(
+        "origin/dclone_progress", now - 60, make_progress, "dclone_progress"
+    )
+    assert fetched
+
+    def fail():
+        raise AssertionError("should not fetch")
+
+    shared, _, fetched = second.get_or_fetch(
+        "origin/dclone_progress", now - 60, fail, "dclone_progress"
+    )
+    assert not fetched
+    assert shared == value
+
+    # Too old for this caller.
+    _, _, fetched = second.get_or_fetch(
+        "origin/dclone_progress", time.time() + 1, make_progress, "dclone_progress"
+    )
+    assert fetched
+
+
+def test_only_one_process_fetches_concurrently(path):
+    caches = [SharedCache(path) for _ in range(4)]
+    fetches = []
+
+    def slow_fetch():
+        fetches.append(1)
+        time.sleep(0.3)
+        return make_progress()
+
+    results = []
+    not_before = time.time() - 60
+    threads = [
+        threading.Thread(
+            target=lambda cache=cache: results.append(
+                cache.get_or_fetch("key", not_before, slow_fetch, "dclone_progress")
+            )
+        )
+        for cache in caches
+    ]
+    with patch.object(shared_cache, "POLL_INTERVAL_SECONDS", 0.05):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(fetches) == 1
+    assert [fetched for _, _, fetched in results].count(True) == 1
+    assert all(value == make_progress() for value, _, _ in results)
+
+
+def test_expired_lease_is_taken_over(path):
+    holder, waiter = SharedCache(path, lease_seconds=0.2), SharedCache(path)
+    assert holder._try_lease("key")
+
+    with patch.object(shared_cache, "POLL_INTERVAL_SECONDS", 0.05):
+        _, _, fetched = waiter.get_or_fetch("key", 0, make_progress, "dclone_progress")
+    assert fetched
+
+
+def test_waiting_is_bounded(path):
+    holder = SharedCache(path)
+    waiter = SharedCache(path, wait_seconds=0.2)
+    assert holder._try_lease("key")
+    fetches = []
+
+    with patch.object(shared_cache, "POLL_INTERVAL_SECONDS", 0.05):
+        with pytest.raises(TimeoutError):
+            waiter.get_or_fetch("key", 0, lambda: fetches.append(1), "dclone_progress")
+    assert fetches == []
+
+
+def test_closed_cache_fetches_directly(path):
+    cache = SharedCache(path)
+    cache.close()
+    _, _, fetched = cache.get_or_fetch("key", 0, make_progress, "dclone_progress")
+    assert fetched
+    assert cache._connection is None
+
+
+def test_unusable_database_fetches_directly(tmp_path):
+    cache = SharedCache(str(tmp_path / "missing" / "shared.db"))
+    value, _, fetched = cache.get_or_fetch("key", 0, make_progress, "dclone_progress")
+    assert fetched
+    assert value == make_progress()
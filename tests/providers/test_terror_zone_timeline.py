@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+
+from custom_components.d2r_tracker.providers import TerrorZoneResponse
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneRotation,
+    TerrorZoneTimeline,
+)
+
+# 2025-01-01 10:00 UTC.
+T0 = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+MINUTE = 60.0
+
+
+def at(minutes: float) -> datetime:
+    return datetime.fromtimestamp(T0 + minutes * MINUTE, tz=timezone.utc)
+
+
+def response(current: str, next: str | None = None) -> TerrorZoneResponse:
+    return TerrorZoneResponse(current=current, next=next, updated_at=at(0))
+
+
+def test_observe_records_rotations():
+    timeline = TerrorZoneTimeline()
+
+    assert timeline.observe(response("Tristram", "The Pit"), T0 + 1 * MINUTE)
+    # Same zone later in the rotation.
+    assert not timeline.observe(response("Tristram", "The Pit"), T0 + 10 * MINUTE)
+    assert timeline.observe(response("The Pit", "Tristram"), T0 + 31 * MINUTE)
+
+    assert timeline.rotations() == [
+        TerrorZoneRotation(start=at(0), end=at(30), zone="Tristram"),
+        TerrorZoneRotation(start=at(30), end=at(60), zone="The Pit"),
+    ]
+    assert timeline.forecast() == TerrorZoneRotation(
+        start=at(60), end=at(90), zone="Tristram"
+    )
+
+
+def test_rotation_length():
+    timeline = TerrorZoneTimeline(rotation_minutes=60)
+
+    assert timeline.observe(response("Tristram", "The Pit"), T0 + 31 * MINUTE)
+    assert timeline.observe(response("The Pit", "Tristram"), T0 + 61 * MINUTE)
+
+    assert timeline.rotations() == [
+        TerrorZoneRotation(start=at(0), end=at(60), zone="Tristram"),
+        TerrorZoneRotation(start=at(60), end=at(120), zone="The Pit"),
+    ]
+    assert timeline.forecast() == TerrorZoneRotation(
+        start=at(120), end=at(180), zone="Tristram"
+    )
+
+
+def test_stale_zone_is_corrected_within_rotation():
+    timeline = TerrorZoneTimeline()
+    timeline.observe(response("Tristram"), T0)
+    timeline.observe(response("Tristram"), T0 + 30 * MINUTE)
+    timeline.observe(response("The Pit"), T0 + 60 * MINUTE)
+    # Upstream reported the wrong zone first, then corrected it.
+    timeline.observe(response("Arcane Sanctuary"), T0 + 61 * MINUTE)
+
+    assert [rotation.zone for rotation in timeline.rotations()] == [
+        "Tristram",
+        "Arcane Sanctuary",
+    ]
+    assert timeline.count("The Pit") == 0
+    assert timeline.last_seen("The Pit") is None
+    assert timeline.last_seen("Arcane Sanctuary") == at(60)
+
+
+def test_index_queries():
+    timeline = TerrorZoneTimeline()
+    for i, zone in enumerate(["Tristram", "The Pit", "Tristram", "Travincal"]):
+        timeline.observe(response(zone), T0 + i * 30 * MINUTE)
+
+    assert timeline.last_seen("Tristram") == at(60)
+    assert timeline.count("Tristram") == 2
+    assert timeline.count("Unknown Zone") == 0
+    assert timeline.last_seen("Unknown Zone") is None
+
+
+def test_eviction_updates_index():
+    timeline = TerrorZoneTimeline(capacity=2)
+    for i, zone in enumerate(["Tristram", "The Pit", "Travincal"]):
+        timeline.observe(response(zone), T0 + i * 30 * MINUTE)
+
+    assert len(timeline) == 2
+    assert timeline.count("Tristram") == 0
+    assert timeline.last_seen("Tristram") is None
+    assert timeline.last_seen("Travincal") == at(60)
+
+
+def test_rotations_range():
+    timeline = TerrorZoneTimeline()
+    for i, zone in enumerate(["Tristram", "The Pit", "Travincal"]):
+        timeline.observe(response(zone), T0 + i * 30 * MINUTE)
+
+    assert [r.zone for r in timeline.rotations(at(45), at(61))] == [
+        "The Pit",
+        "Travincal",
+    ]
+
+
+def test_round_trip():
+    timeline = TerrorZoneTimeline()
+    for i, zone in enumerate(["Tristram", "The Pit", "Tristram"]):
+        timeline.observe(response(zone, "Travincal"), T0 + i * 30 * MINUTE)
+
+    restored = TerrorZoneTimeline.from_dict(timeline.as_dict())
+
+    assert restored.rotations() == timeline.rotations()
+    assert restored.forecast() == timeline.forecast()
+    assert restored.count("Tristram") == 2
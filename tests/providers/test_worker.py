@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from custom_components.d2r_tracker.providers.worker import (
+    ProviderWorker,
+    WorkerBusyError,
+    WorkerShutDownError,
+)
+
+
+def test_run_on_dedicated_thread():
+    worker = ProviderWorker("test")
+
+    async def main():
+        return await worker.run(lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(main()).startswith("d2r_tracker_test")
+    finally:
+        worker.shutdown()
+
+    metrics = worker.metrics
+    assert metrics.submitted == metrics.completed == 1
+    assert metrics.queue_depth == 0
+    assert metrics.max_queue_depth == 1
+    assert metrics.last_run is not None and metrics.avg_run is not None
+
+
+def test_failures_are_counted():
+    worker = ProviderWorker("test")
+
+    def fail():
+        raise OSError("boom")
+
+    with pytest.raises(OSError):
+        asyncio.run(worker.run(fail))
+    worker.shutdown()
+
+    assert worker.metrics.failed == 1
+    assert worker.metrics.queue_depth == 0
+
+
+def test_rejects_when_full():
+    worker = ProviderWorker("test", threads=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(worker.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(WorkerBusyError):
+            await worker.run(lambda: None)
+        release.set()
+        await blocked
+
+    asyncio.run(main())
+    worker.shutdown()
+
+    assert worker.metrics.rejected == 1
+    assert worker.metrics.completed == 1
+
+
+def test_rejects_when_shut_down():
+    worker = ProviderWorker("test")
+    worker.shutdown()
+
+    with pytest.raises(WorkerShutDownError):
+        asyncio.run(worker.run(lambda: None))
+
+    assert worker.metrics.queue_depth == 0
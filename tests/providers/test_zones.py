@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+from custom_components.d2r_tracker.providers import zones
+from custom_components.d2r_tracker.providers.zones import CATALOG, lookup_zone, zone_key
+
+INTEGRATION = Path(zones.__file__).parents[1]
+
+
+def test_zone_key_ignores_spelling():
+    assert zone_key("Tal Rasha's Tombs") == zone_key("tal rashas tombs")
+    assert zone_key("Burial Grounds, The Crypt, and the Mausoleum") == (
+        "burial grounds crypt mausoleum"
+    )
+
+
+def test_lookup_zone_is_canonical():
+    zone = lookup_zone("chaos sanctuary")
+    assert zone is CATALOG["chaos_sanctuary"]
+    assert zone.act == 4
+    assert lookup_zone(zone.name) is zone
+
+
+def test_lookup_zone_by_level():
+    assert lookup_zone("River of Flame") is CATALOG["city_of_the_damned"]
+    assert lookup_zone("The Pit") is CATALOG["the_pit"]
+
+
+def test_lookup_unknown_zone_is_interned():
+    zone = lookup_zone("Uber Tristram")
+    assert zone.id == "uber_tristram"
+    assert zone.act is None
+    assert zone.name == "Uber Tristram"
+    assert lookup_zone("Uber Tristram") is zone
+
+
+def test_unknown_zones_past_the_cap_compare_equal(monkeypatch):
+    monkeypatch.setattr(zones, "MAX_UNKNOWN_ZONES", 0)
+    zone = lookup_zone("Cow King's Pasture")
+    assert lookup_zone("Cow King's Pasture") == zone
+
+
+def test_zone_names_are_translated_by_id():
+    names = {zone.id: zone.name for zone in CATALOG.values()}
+    for path in ("strings.json", "translations/en.json"):
+        sensors = json.loads((INTEGRATION / path).read_text())["entity"]["sensor"]
+        for key in ("terror_zone", "next_terror_zone"):
+            assert sensors[key]["state_attributes"]["zone_id"]["state"] == names
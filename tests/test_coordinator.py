@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import threading
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+)
+from custom_components.d2r_tracker.const import CONF_TERROR_ZONE_FETCH_INTERVAL
+from custom_components.d2r_tracker.providers.history import DCloneHistory
+from custom_components.d2r_tracker.providers.schema import SchemaError
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneTimeline,
+)
+from custom_components.d2r_tracker.values import VALUE_TERROR_ZONE, dclone_value_key
+
+EUROPE = ("Europe", "L", "SC")
+
+
+def test_failed_part_publishes_the_others(run_with_coordinator):
+    async def main(hass, coordinator):
+        provider = coordinator.cached_provider.provider
+        provider.errors[DATA_TERROR_ZONE] = OSError("Bad gateway")
+
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        assert coordinator.data.part_ok(DATA_DCLONE_PROGRESS)
+        assert not coordinator.data.part_ok(DATA_TERROR_ZONE)
+        assert coordinator.values[dclone_value_key(EUROPE)] == 1
+        assert VALUE_TERROR_ZONE not in coordinator.values
+
+    run_with_coordinator(main)
+
+
+def test_all_parts_failed(run_with_coordinator):
+    async def main(hass, coordinator):
+        provider = coordinator.cached_provider.provider
+        provider.errors[DATA_TERROR_ZONE] = OSError("Bad gateway")
+        provider.errors[DATA_DCLONE_PROGRESS] = OSError("Bad gateway")
+
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        assert isinstance(coordinator.last_exception, UpdateFailed)
+        assert "Bad gateway" in str(coordinator.last_exception)
+
+    run_with_coordinator(main)
+
+
+def test_held_parts_stay_ok(run_with_coordinator):
+    async def main(hass, coordinator):
+        cached = coordinator.cached_provider
+        provider = cached.provider
+        await coordinator.async_refresh()
+
+        invalid = SchemaError("test", "$", "expected an object, got list")
+        provider.errors[DATA_TERROR_ZONE] = invalid
+        provider.errors[DATA_DCLONE_PROGRESS] = invalid
+        cached.cache.pop(DATA_DCLONE_PROGRESS)
+        cached.next_terror_zone_update_after = None
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        for data_type in (DATA_TERROR_ZONE, DATA_DCLONE_PROGRESS):
+            assert coordinator.data.part_ok(data_type)
+            assert "expected an object" in coordinator.data.status[data_type].held
+        assert coordinator.values[VALUE_TERROR_ZONE] == "Tristram"
+
+    run_with_coordinator(main)
+
+
+def test_failed_part_carries_over_its_last_value(run_with_coordinator):
+    async def main(hass, coordinator):
+        cached = coordinator.cached_provider
+        provider = cached.provider
+        changes = []
+        coordinator.async_add_change_listener(changes.append)
+        await coordinator.async_refresh()
+        assert coordinator.values[VALUE_TERROR_ZONE] == "Tristram"
+
+        # The zone rotates while a fetch fails.
+        provider.zone = "The Pit"
+        provider.errors[DATA_TERROR_ZONE] = OSError("Bad gateway")
+        cached.next_terror_zone_update_after = None
+        await coordinator.async_refresh()
+        assert not coordinator.data.part_ok(DATA_TERROR_ZONE)
+        assert coordinator.values[VALUE_TERROR_ZONE] == "Tristram"
+
+        del provider.errors[DATA_TERROR_ZONE]
+        cached.next_terror_zone_update_after = None
+        await coordinator.async_refresh()
+        assert coordinator.data.part_ok(DATA_TERROR_ZONE)
+        # One transition, which events fire for, rather than through None.
+        assert [
+            change.changes[VALUE_TERROR_ZONE]
+            for change in changes
+            if VALUE_TERROR_ZONE in change.changes
+        ] == [(None, "Tristram"), ("Tristram", "The Pit")]
+
+    run_with_coordinator(main)
+
+
+def test_raising_part_cancels_the_others(run_with_coordinator):
+    async def main(hass, coordinator):
+        provider = coordinator.cached_provider.provider
+        provider.errors[DATA_DCLONE_PROGRESS] = RuntimeError("Bug")
+        provider.holds[DATA_TERROR_ZONE] = hold = threading.Event()
+
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        assert isinstance(coordinator.last_exception, RuntimeError)
+        # The terror zone fetch is not left running unawaited.
+        assert not [
+            task
+            for task in asyncio.all_tasks()
+            if "_async_fetch_part" in task.get_coro().__qualname__
+        ]
+        hold.set()
+
+    run_with_coordinator(main)
+
+
+def test_shut_down_lane_fails_the_refresh(run_with_coordinator):
+    async def main(hass, coordinator):
+        coordinator.pipeline._lanes[coordinator.provider_spec.name].shutdown()
+
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        assert isinstance(coordinator.last_exception, UpdateFailed)
+
+    run_with_coordinator(main)
+
+
+def test_rotation_follows_the_terror_zone_interval(run_with_coordinator):
+    async def main(hass, coordinator):
+        assert coordinator.terror_zone_timeline.rotation_minutes == 60
+        coordinator._store.async_load = AsyncMock(
+            return_value={
+                "dclone_history": DCloneHistory().as_dict(),
+                "terror_zone_timeline": TerrorZoneTimeline().as_dict(),
+            }
+        )
+        await coordinator.async_load_history()
+        assert coordinator.terror_zone_timeline.rotation_minutes == 60
+
+    run_with_coordinator(main, **{CONF_TERROR_ZONE_FETCH_INTERVAL: 60})
+
+
+def test_refreshes_are_scheduled_in_the_entry_slot(run_with_coordinator):
+    async def main(hass, coordinator):
+        coordinator.refresh_phase = 0.25
+        now = [datetime(2025, 1, 1, 10, 0, 10, tzinfo=timezone.utc)]
+        with (
+            patch.object(dt_util, "utcnow", lambda: now[0]),
+            patch.object(hass.loop, "call_at", wraps=hass.loop.call_at) as call_at,
+        ):
+
+            def scheduled_in() -> float:
+                # Other timers, e.g. of the fetch timeouts, use call_at too.
+                (when, *_), _ = [
+                    call
+                    for call in call_at.call_args_list
+                    if "refresh_interval" in call.args[1].__name__
+                ][-1]
+                return when - hass.loop.time()
+
+            # The first refresh, once an entity listens, 15 seconds into the
+            # minute rather than right away.
+            remove_listener = coordinator.async_add_listener(lambda: None)
+            assert 4 < scheduled_in() <= 5.5
+            assert coordinator.cached_provider.provider.requests[DATA_TERROR_ZONE] == 0
+
+            # Later refreshes keep the offset, however long each one took.
+            now[0] += timedelta(seconds=6)
+            await coordinator.async_refresh()
+            assert 58 < scheduled_in() <= 59.5
+            remove_listener()
+
+    run_with_coordinator(main, update_interval=60)
@@ -0,0 +1,130 @@
+from types import MappingProxyType
+
+from homeassistant.const import CONF_TYPE
+from homeassistant.core import callback
+
+from custom_components.d2r_tracker.const import (
+    EVENT_DCLONE_PROGRESS,
+    EVENT_DCLONE_THRESHOLD,
+    EVENT_TERROR_ZONE_CHANGED,
+)
+from custom_components.d2r_tracker.device_trigger import _trigger_contexts
+from custom_components.d2r_tracker.events import (
+    async_setup_events,
+    async_subscribe_events,
+    changes_to_events,
+)
+from custom_components.d2r_tracker.providers import ProviderCapabilities
+from custom_components.d2r_tracker.values import (
+    TERROR_ZONE_CONTEXT,
+    VALUE_TERROR_ZONE,
+    ChangeSet,
+    dclone_context,
+    dclone_value_key,
+)
+
+EUROPE = ("Europe", "L", "SC")
+ASIA = ("Asia", "NL", "HC")
+
+
+def change_set(changes: dict) -> ChangeSet:
+    return ChangeSet(1, MappingProxyType(changes))
+
+
+def test_dclone_step_and_thresholds():
+    events = changes_to_events(
+        change_set({dclone_value_key(EUROPE): (3, 5)}), [EUROPE, ASIA]
+    )
+
+    assert [event_type for event_type, _ in events] == [
+        EVENT_DCLONE_PROGRESS,
+        EVENT_DCLONE_THRESHOLD,
+        EVENT_DCLONE_THRESHOLD,
+    ]
+    assert events[0][1] == {
+        "region": "Europe",
+        "ladder": "L",
+        "hardcore": "SC",
+        "previous": 3,
+        "progress": 5,
+    }
+    assert [data["threshold"] for _, data in events[1:]] == [4, 5]
+
+
+def test_dclone_reset_crosses_no_threshold():
+    events = changes_to_events(change_set({dclone_value_key(ASIA): (6, 1)}), [ASIA])
+    assert [event_type for event_type, _ in events] == [EVENT_DCLONE_PROGRESS]
+
+
+def test_appearing_values_are_not_transitions():
+    events = changes_to_events(
+        change_set(
+            {
+                dclone_value_key(EUROPE): (None, 2),
+                VALUE_TERROR_ZONE: (None, "Tristram"),
+            }
+        ),
+        [EUROPE],
+    )
+    assert events == []
+
+
+def test_terror_zone_changed():
+    events = changes_to_events(
+        change_set({VALUE_TERROR_ZONE: ("Tristram", "The Pit")}), []
+    )
+    assert events == [
+        (
+            EVENT_TERROR_ZONE_CHANGED,
+            {"previous": "Tristram", "zone": "The Pit", "zone_id": "the_pit"},
+        )
+    ]
+
+
+def test_subscriptions_fetch_with_sensors_disabled(run_with_coordinator):
+    async def main(hass, coordinator):
+        fired = []
+        hass.bus.async_listen(
+            EVENT_DCLONE_PROGRESS, callback(lambda event: fired.append(event.data))
+        )
+        # Every sensor disabled: no entity listens to the coordinator.
+        stop = async_setup_events(hass, coordinator)
+        unsubscribe = async_subscribe_events(
+            hass, coordinator.config_entry.entry_id, [dclone_context(EUROPE)]
+        )
+        # The subscription is fetched, and polled for, like an entity.
+        assert list(coordinator.async_contexts()) == [dclone_context(EUROPE)]
+        assert coordinator._unsub_refresh is not None
+
+        provider = coordinator.cached_provider.provider
+        coordinator.cached_provider.dclone_ttl = 0
+        await coordinator.async_refresh()
+        assert coordinator.plan.dclone_keys == (EUROPE,)
+        provider.progress = 2
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert [(event["region"], event["progress"]) for event in fired] == [
+            ("Europe", 2)
+        ]
+
+        unsubscribe()
+        assert list(coordinator.async_contexts()) == []
+        assert coordinator._unsub_refresh is None
+        stop()
+
+    run_with_coordinator(main)
+
+
+def test_trigger_contexts():
+    capabilities = ProviderCapabilities()
+    assert _trigger_contexts({CONF_TYPE: "terror_zone_changed"}, capabilities) == [
+        TERROR_ZONE_CONTEXT
+    ]
+    contexts = _trigger_contexts(
+        {CONF_TYPE: "dclone_threshold", "region": "Europe", "ladder": "L"},
+        capabilities,
+    )
+    assert contexts == [
+        dclone_context(("Europe", "L", "HC")),
+        dclone_context(EUROPE),
+    ]
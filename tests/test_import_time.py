@@ -0,0 +1,51 @@
+from pathlib import Path
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).parent.parent
+
+PACKAGE = "custom_components.d2r_tracker"
+
+# Our own modules that importing the integration may load. A count rather than
+# a time budget, which would depend on the machine.
+MAX_OWN_MODULES = 16
+
+# Loaded on first use, e.g. by options that enable them, or by the tools.
+LAZY_MODULES = (
+    f"{PACKAGE}.providers.d2runewizard",
+    f"{PACKAGE}.providers.diablo2io",
+    f"{PACKAGE}.providers.recording",
+    f"{PACKAGE}.providers.worker",
+    f"{PACKAGE}.providers.pipeline",
+    f"{PACKAGE}.providers.shared_cache",
+    f"{PACKAGE}.providers.replay",
+    f"{PACKAGE}.simulation",
+)
+
+
+def imported_modules(statement: str) -> list[str]:
+    """Run `statement` with `-X importtime`, returning the modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        modules.append(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def test_integration_import_is_lazy_and_bounded():
+    """Importing the integration and its sensor platform loads only the core."""
+    modules = imported_modules(f"import {PACKAGE}, {PACKAGE}.sensor")
+
+    assert f"{PACKAGE}.sensor" in modules
+    for module in LAZY_MODULES:
+        assert module not in modules
+    own = [module for module in modules if module.startswith(PACKAGE)]
+    assert len(own) <= MAX_OWN_MODULES, own
@@ -0,0 +1,42 @@
+from custom_components.d2r_tracker.const import (
+    CONF_DCLONE_CACHE_TTL,
+    CONF_TERROR_ZONE_BURST_WINDOW,
+    CONF_TERROR_ZONE_FETCH_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.d2r_tracker.options import (
+    DEFAULT_OPTIONS,
+    OPTIONS_SCHEMA,
+    validate_options,
+)
+from custom_components.d2r_tracker.providers.registry import get_provider_spec
+
+
+def test_defaults_are_valid():
+    spec = get_provider_spec("diablo2.io")
+    assert validate_options(OPTIONS_SCHEMA(dict(DEFAULT_OPTIONS)), spec) == {}
+
+
+def test_rate_limits():
+    spec = get_provider_spec("diablo2.io")
+    options = {
+        **DEFAULT_OPTIONS,
+        CONF_UPDATE_INTERVAL: 30,
+        CONF_DCLONE_CACHE_TTL: 10,
+    }
+    assert validate_options(options, spec) == {
+        CONF_UPDATE_INTERVAL: "below_rate_limit",
+        CONF_DCLONE_CACHE_TTL: "below_rate_limit",
+    }
+
+
+def test_burst_window_must_be_shorter_than_interval():
+    spec = get_provider_spec("diablo2.io")
+    options = {
+        **DEFAULT_OPTIONS,
+        CONF_TERROR_ZONE_FETCH_INTERVAL: 15,
+        CONF_TERROR_ZONE_BURST_WINDOW: 15,
+    }
+    assert validate_options(options, spec) == {
+        CONF_TERROR_ZONE_BURST_WINDOW: "burst_too_long"
+    }
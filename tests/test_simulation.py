@@ -0,0 +1,101 @@
+from datetime import timedelta
+import json
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+)
+from custom_components.d2r_tracker.providers import d2runewizard
+from custom_components.d2r_tracker.simulation import replay, simulate
+from custom_components.d2r_tracker.values import (
+    VALUE_NEXT_TERROR_ZONE,
+    VALUE_TERROR_ZONE,
+    VALUE_TERROR_ZONE_UPDATED_AT,
+)
+
+
+def rows_d2rw(progress: int) -> list[dict]:
+    return [
+        {"region": region, "ladder": ladder, "hardcore": hc, "progress": progress}
+        for region in ("Americas", "Europe", "Asia")
+        for ladder in (True, False)
+        for hc in (True, False)
+    ]
+
+
+def terror_zone(zone: str) -> dict:
+    return {"currentTerrorZone": {"zone": zone}, "nextTerrorZone": {"zone": "Next"}}
+
+
+def test_simulate_day():
+    report = simulate(timedelta(days=1))
+
+    assert report.refreshes == 24 * 60
+    # Every rotation is eventually published, within its burst window since
+    # upstream reports within 4 minutes.
+    assert report.missed_rotations == 0
+    assert report.rotation_latency.max <= 5 * 60
+    # One request per minute of each burst, until upstream reports the new
+    # zone, plus one per rotation.
+    assert report.upstream_requests[DATA_TERROR_ZONE] == 145
+    assert report.upstream_requests[DATA_DCLONE_PROGRESS] == 24 * 60
+    assert report.dclone_staleness.max <= 60
+    assert report.terror_zone_staleness.max <= 60
+    # The update time only moves when the current or next zone does, not on
+    # each of the 145 fetches.
+    changes = report.value_changes
+    assert changes[VALUE_TERROR_ZONE] == 44
+    assert changes[VALUE_NEXT_TERROR_ZONE] == 43
+    assert changes[VALUE_TERROR_ZONE_UPDATED_AT] == 76
+    # A state row per change of the 4 sensors, plus their attributes once. The
+    # DClone trends change along with the progress they are attributes of.
+    assert report.recorder_rows == 44 + 43 + 76 + 8 + 4
+    assert report.recorder_bytes > 0
+
+
+def test_simulate_hourly_rotations():
+    report = simulate(timedelta(days=1), rotation_minutes=60)
+
+    assert report.missed_rotations == 0
+    assert report.rotation_latency.max <= 5 * 60
+    assert report.upstream_requests[DATA_TERROR_ZONE] < 145
+    assert report.value_changes[VALUE_TERROR_ZONE] <= 24
+
+
+def test_simulate_without_burst_misses_late_reports():
+    report = simulate(timedelta(days=1), terror_zone_burst_minutes=0)
+
+    # A single fetch per rotation, at the boundary, before upstream reports.
+    assert report.upstream_requests[DATA_TERROR_ZONE] == 48
+    assert report.missed_rotations > 0
+    assert report.terror_zone_staleness.max > 60
+
+
+def test_replay(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    # Two hours of a d2runewizard.com recording: DClone progress every minute,
+    # terror zones every half hour.
+    lines = []
+    start = 1_735_725_600  # 2025-01-01 10:00 UTC.
+    for minute in range(120):
+        t = start + minute * 60
+        progress = 1 if minute < 60 else 2
+        lines.append(
+            (t, d2runewizard.DCLONE_PROGRESS_URL, {"servers": rows_d2rw(progress)})
+        )
+        if minute % 30 == 0:
+            lines.append((t, d2runewizard.TERROR_ZONE_URL, terror_zone(f"Z{minute}")))
+    with open(path, "w") as f:
+        for t, url, payload in lines:
+            f.write(json.dumps({"t": t, "o": "d2rw", "u": url, "p": payload}) + "\n")
+
+    report = replay(path)
+
+    assert report.refreshes == 120
+    # The DClone TTL matches the update interval, so every refresh fetches.
+    assert report.upstream_requests[DATA_DCLONE_PROGRESS] == 120
+    # One fetch per rotation, plus each rotation's burst window.
+    assert report.upstream_requests[DATA_TERROR_ZONE] < 30
+    assert report.hit_rate(DATA_TERROR_ZONE) > 0.75
+    # Initial observation, the DClone step, and three more rotations.
+    assert report.state_writes == 5
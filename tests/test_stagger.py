@@ -0,0 +1,29 @@
+import pytest
+
+from custom_components.d2r_tracker.stagger import refresh_phase, slot_delay
+
+
+def test_refresh_phase_is_deterministic():
+    assert refresh_phase("01JABCDEF") == refresh_phase("01JABCDEF")
+    assert refresh_phase("01JABCDEF") != refresh_phase("01JABCDEG")
+
+
+def test_refresh_phases_spread_evenly():
+    phases = [refresh_phase(f"entry-{i}") for i in range(1000)]
+    assert all(0 <= phase < 1 for phase in phases)
+    # Roughly a tenth of the entries in each tenth of the interval.
+    for decile in range(10):
+        count = sum(decile / 10 <= phase < (decile + 1) / 10 for phase in phases)
+        assert 70 < count < 130
+
+
+def test_slot_delay_offsets_by_the_phase():
+    # 10 seconds into an interval, the slot 15 seconds into it is 5 seconds away.
+    assert slot_delay(1_735_725_610, 60, 0.25) == pytest.approx(5)
+    assert slot_delay(1_735_725_616, 60, 0.25) == pytest.approx(59)
+
+
+def test_slot_delay_skips_the_slot_just_refreshed_in():
+    # Timers fire a little early, so this is the refresh of the coming slot.
+    assert slot_delay(1_735_725_614.5, 60, 0.25) == pytest.approx(60.5)
+    assert slot_delay(1_735_725_614.5, 4, 0.25) == pytest.approx(2.5)
@@ -0,0 +1,235 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.d2r_tracker.providers import (
+    DATA_DCLONE_PROGRESS,
+    DATA_TERROR_ZONE,
+    DCloneCoreProgress,
+    DCloneLadderProgress,
+    DCloneProgress,
+    PartStatus,
+    Progress,
+    ProviderCapabilities,
+    ProviderResponse,
+    TerrorZoneResponse,
+)
+from custom_components.d2r_tracker.providers.history import DCloneHistory
+from custom_components.d2r_tracker.providers.zones import CATALOG
+from custom_components.d2r_tracker.providers.terror_zone_timeline import (
+    TerrorZoneTimeline,
+)
+from custom_components.d2r_tracker.values import (
+    DCLONE_LAST_CHANGE,
+    VALUE_NEXT_TERROR_ZONE,
+    VALUE_NEXT_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE,
+    VALUE_TERROR_ZONE_INFO,
+    VALUE_TERROR_ZONE_TIMELINE,
+    TERROR_ZONE_CONTEXT,
+    EMPTY_SNAPSHOT,
+    ValuePlan,
+    build_values,
+    diff_values,
+    next_snapshot,
+    dclone_context,
+    dclone_value_key,
+    plan_values,
+    publish_part,
+)
+
+UPDATED_AT = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def make_dclone_progress() -> DCloneProgress:
+    def ladder():
+        return DCloneLadderProgress(
+            L=DCloneCoreProgress(HC=Progress(1), SC=Progress(2)),
+            NL=DCloneCoreProgress(HC=Progress(3), SC=Progress(4)),
+        )
+
+    return DCloneProgress(Americas=ladder(), Europe=ladder(), Asia=ladder(), China=None)
+
+
+def test_build_values_dclone_only():
+    response = ProviderResponse(
+        terror_zone=None, dclone_progress=make_dclone_progress()
+    )
+    history = DCloneHistory()
+    history.observe(response.dclone_progress, UPDATED_AT.timestamp())
+
+    values = build_values(
+        response, ProviderCapabilities().dclone_keys(), history, TerrorZoneTimeline()
+    )
+
+    assert values[dclone_value_key(("Europe", "NL", "SC"))] == 4
+    assert values[dclone_value_key(("Asia", "L", "HC"))] == 1
+    assert values[dclone_value_key(("Asia", "L", "HC"), DCLONE_LAST_CHANGE)] == (
+        UPDATED_AT
+    )
+    # Not returned by the provider, so not published.
+    assert dclone_value_key(("China", "L", "SC")) not in values
+    assert VALUE_TERROR_ZONE not in values
+    # 3 regions * 4 combos * (progress + 3 stats).
+    assert len(values) == 48
+
+
+def test_build_values_only_supported_keys():
+    response = ProviderResponse(
+        terror_zone=None, dclone_progress=make_dclone_progress()
+    )
+    capabilities = ProviderCapabilities(regions=("Europe",), hardcore=("SC",))
+
+    values = build_values(
+        response, capabilities.dclone_keys(), DCloneHistory(), TerrorZoneTimeline()
+    )
+
+    assert dict(values) == {
+        dclone_value_key(("Europe", "L", "SC")): 2,
+        dclone_value_key(("Europe", "NL", "SC")): 4,
+    }
+
+
+def test_publish_part_partial_dclone_values():
+    key = ("Europe", "L", "SC")
+    response = ProviderResponse(
+        terror_zone=None,
+        dclone_progress=None,
+        dclone_values={key: Progress(5), ("China", "L", "SC"): None},
+    )
+    history = DCloneHistory()
+
+    snapshot, changes, changed = publish_part(
+        response,
+        response,
+        ValuePlan(frozenset({DATA_DCLONE_PROGRESS}), (key, ("China", "L", "SC"))),
+        history,
+        TerrorZoneTimeline(),
+        EMPTY_SNAPSHOT,
+        UPDATED_AT.timestamp(),
+    )
+
+    assert changed
+    assert changes.version == snapshot.version == 1
+    values = snapshot.values
+    assert values[dclone_value_key(key)] == 5
+    assert values[dclone_value_key(key, DCLONE_LAST_CHANGE)] == UPDATED_AT
+    assert dclone_value_key(("China", "L", "SC")) not in values
+    assert history.transitions(("Asia", "L", "SC")) == []
+
+
+def test_build_values_terror_zone():
+    response = ProviderResponse(
+        terror_zone=TerrorZoneResponse(
+            current="Tristram", next="The Pit", updated_at=UPDATED_AT
+        ),
+        dclone_progress=None,
+    )
+    timeline = TerrorZoneTimeline()
+    timeline.observe(response.terror_zone, UPDATED_AT.timestamp())
+
+    values = build_values(response, (), DCloneHistory(), timeline)
+
+    assert values[VALUE_TERROR_ZONE] == "Tristram"
+    # States stay upstream's names; the catalog entries go alongside.
+    assert values[VALUE_NEXT_TERROR_ZONE] == "The Pit"
+    assert values[VALUE_TERROR_ZONE_INFO] is CATALOG["tristram"]
+    assert values[VALUE_NEXT_TERROR_ZONE_INFO] is CATALOG["the_pit"]
+    assert values[VALUE_TERROR_ZONE_TIMELINE] == (
+        {"start": UPDATED_AT.isoformat(), "zone": "Tristram"},
+    )
+
+
+def test_build_values_is_immutable():
+    values = build_values(
+        ProviderResponse(terror_zone=None, dclone_progress=None),
+        (),
+        DCloneHistory(),
+        TerrorZoneTimeline(),
+    )
+    with pytest.raises(TypeError):
+        values["foo"] = 1  # type: ignore[index]
+
+
+def test_plan_values_without_subscribers_fetches_everything():
+    capabilities = ProviderCapabilities()
+    assert plan_values([], capabilities) == ValuePlan.everything(capabilities)
+
+
+def test_plan_values_only_subscribed():
+    capabilities = ProviderCapabilities(data_types=frozenset({DATA_DCLONE_PROGRESS}))
+    americas = ("Americas", "L", "SC")
+    plan = plan_values(
+        [dclone_context(americas), dclone_context(americas), TERROR_ZONE_CONTEXT],
+        capabilities,
+    )
+
+    # Terror zones are not supported, so never fetched.
+    assert plan == ValuePlan(frozenset({DATA_DCLONE_PROGRESS}), (americas,))
+    assert plan.covers(dclone_context(americas))
+    assert not plan.covers(dclone_context(("Europe", "L", "SC")))
+    assert not plan.covers(TERROR_ZONE_CONTEXT)
+
+
+def test_build_values_only_planned_keys():
+    response = ProviderResponse(
+        terror_zone=None, dclone_progress=make_dclone_progress()
+    )
+    plan = plan_values(
+        [(DATA_TERROR_ZONE, None), dclone_context(("Asia", "NL", "HC"))],
+        ProviderCapabilities(),
+    )
+
+    values = build_values(
+        response, plan.dclone_keys, DCloneHistory(), TerrorZoneTimeline()
+    )
+
+    assert dict(values) == {dclone_value_key(("Asia", "NL", "HC")): 3}
+
+
+def test_diff_values():
+    assert diff_values({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 4, "d": 5}) == {
+        "b": (2, 4),
+        "c": (3, None),
+        "d": (None, 5),
+    }
+
+
+def test_next_snapshot_versions_only_on_change():
+    snapshot, changes = next_snapshot(EMPTY_SNAPSHOT, {"a": 1})
+    assert snapshot.version == changes.version == 1
+    assert "a" in changes
+    assert changes.touches(["b", "a"])
+
+    same, no_changes = next_snapshot(snapshot, {"a": 1})
+    assert same is snapshot
+    assert not no_changes
+    assert no_changes.version == 1
+
+    newer, changes = next_snapshot(snapshot, {"a": 2})
+    assert newer.version == 2
+    assert dict(changes.changes) == {"a": (1, 2)}
+
+
+def test_provider_response_merge_overlays_fetched_parts():
+    previous = ProviderResponse(
+        terror_zone=TerrorZoneResponse("Tristram", None, UPDATED_AT),
+        dclone_progress=make_dclone_progress(),
+        status={
+            DATA_TERROR_ZONE: PartStatus(UPDATED_AT),
+            DATA_DCLONE_PROGRESS: PartStatus(UPDATED_AT),
+        },
+    )
+    failed = ProviderResponse(
+        terror_zone=None,
+        dclone_progress=None,
+        status={DATA_TERROR_ZONE: PartStatus(UPDATED_AT, "OSError()")},
+    )
+
+    merged = previous.merge(failed)
+
+    # The failed part keeps its last value, and is marked failed.
+    assert merged.terror_zone is previous.terror_zone
+    assert not merged.part_ok(DATA_TERROR_ZONE)
+    assert merged.dclone_progress is previous.dclone_progress
+    assert merged.part_ok(DATA_DCLONE_PROGRESS)